@@ -134,6 +134,8 @@ module "alb" {
   vpc_id            = module.network.vpc_id
   public_subnet_ids = module.network.public_subnet_ids
   alb_sg_id         = aws_security_group.alb.id
+
+  enable_access_logs = var.enable_alb_access_logs
 }
 
 ############################################
@@ -35,6 +35,11 @@ output "target_group_arn" {
   value       = module.alb.target_group_arn
 }
 
+output "alb_access_logs_s3_uri" {
+  description = "ALB access log S3 URI (null when disabled)"
+  value       = module.alb.access_logs_s3_uri
+}
+
 ############################################
 # ASG
 ############################################
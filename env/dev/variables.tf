@@ -91,3 +91,9 @@ variable "runner_labels" {
   description = "Runner labels"
   default     = "monitoring,linux,x64"
 }
+
+variable "enable_alb_access_logs" {
+  type        = bool
+  description = "Enable ALB access logs to a dedicated S3 bucket"
+  default     = false
+}
@@ -1,3 +1,8 @@
+locals {
+  create_access_logs_bucket = var.enable_access_logs && var.access_logs_bucket == ""
+  access_logs_bucket        = local.create_access_logs_bucket ? aws_s3_bucket.access_logs[0].id : var.access_logs_bucket
+}
+
 resource "aws_lb" "this" {
   name               = "${var.project_name}-alb"
   internal           = false
@@ -5,9 +10,21 @@ resource "aws_lb" "this" {
   security_groups    = [var.alb_sg_id]
   subnets            = var.public_subnet_ids
 
+  dynamic "access_logs" {
+    for_each = var.enable_access_logs ? [1] : []
+    content {
+      enabled = true
+      bucket  = local.access_logs_bucket
+      prefix  = var.access_logs_prefix
+    }
+  }
+
   tags = {
     Name = "${var.project_name}-alb"
   }
+
+  # ALB는 access log 활성화 시점에 bucket 쓰기 권한을 검증함
+  depends_on = [aws_s3_bucket_policy.access_logs]
 }
 
 resource "aws_lb_target_group" "this" {
@@ -44,3 +61,82 @@ resource "aws_lb_listener" "http" {
     target_group_arn = aws_lb_target_group.this.arn
   }
 }
+
+############################################
+# Access logs (S3)
+############################################
+
+data "aws_caller_identity" "current" {}
+
+# 리전별 ELB 서비스 계정 (ap-northeast-2 등 2022-08 이전 리전은 이 계정에 PutObject 허용 필요)
+data "aws_elb_service_account" "this" {}
+
+resource "aws_s3_bucket" "access_logs" {
+  count         = local.create_access_logs_bucket ? 1 : 0
+  bucket        = lower("${var.project_name}-alb-logs-${data.aws_caller_identity.current.account_id}")
+  force_destroy = true
+
+  tags = {
+    Name = "${var.project_name}-alb-logs"
+  }
+}
+
+resource "aws_s3_bucket_public_access_block" "access_logs" {
+  count                   = local.create_access_logs_bucket ? 1 : 0
+  bucket                  = aws_s3_bucket.access_logs[0].id
+  block_public_acls       = true
+  block_public_policy     = true
+  ignore_public_acls      = true
+  restrict_public_buckets = true
+}
+
+# ALB access log는 SSE-S3(AES256)만 지원
+resource "aws_s3_bucket_server_side_encryption_configuration" "access_logs" {
+  count  = local.create_access_logs_bucket ? 1 : 0
+  bucket = aws_s3_bucket.access_logs[0].id
+
+  rule {
+    apply_server_side_encryption_by_default {
+      sse_algorithm = "AES256"
+    }
+  }
+}
+
+resource "aws_s3_bucket_lifecycle_configuration" "access_logs" {
+  count  = local.create_access_logs_bucket ? 1 : 0
+  bucket = aws_s3_bucket.access_logs[0].id
+
+  rule {
+    id     = "expire-access-logs"
+    status = "Enabled"
+
+    filter {}
+
+    expiration {
+      days = var.access_logs_expiration_days
+    }
+  }
+}
+
+data "aws_iam_policy_document" "access_logs" {
+  count = local.create_access_logs_bucket ? 1 : 0
+
+  statement {
+    effect    = "Allow"
+    actions   = ["s3:PutObject"]
+    resources = ["${aws_s3_bucket.access_logs[0].arn}/${var.access_logs_prefix}/AWSLogs/${data.aws_caller_identity.current.account_id}/*"]
+
+    principals {
+      type        = "AWS"
+      identifiers = [data.aws_elb_service_account.this.arn]
+    }
+  }
+}
+
+resource "aws_s3_bucket_policy" "access_logs" {
+  count  = local.create_access_logs_bucket ? 1 : 0
+  bucket = aws_s3_bucket.access_logs[0].id
+  policy = data.aws_iam_policy_document.access_logs[0].json
+
+  depends_on = [aws_s3_bucket_public_access_block.access_logs]
+}
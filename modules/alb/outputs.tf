@@ -8,3 +8,7 @@ output "target_group_arn" {
   description = "ARN of the target group"
 }
 
+output "access_logs_s3_uri" {
+  value       = var.enable_access_logs ? "s3://${local.access_logs_bucket}/${var.access_logs_prefix}/AWSLogs/${data.aws_caller_identity.current.account_id}/elasticloadbalancing/" : null
+  description = "S3 URI of ALB access logs (null when disabled)"
+}
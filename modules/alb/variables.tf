@@ -17,3 +17,27 @@ variable "alb_sg_id" {
   type        = string
   description = "Security group ID for the ALB"
 }
+
+variable "enable_access_logs" {
+  type        = bool
+  description = "Enable ALB access logs to S3 (for trace replay / log analysis)"
+  default     = false
+}
+
+variable "access_logs_bucket" {
+  type        = string
+  description = "Existing S3 bucket for access logs. Empty = create a dedicated bucket"
+  default     = ""
+}
+
+variable "access_logs_prefix" {
+  type        = string
+  description = "S3 key prefix for access logs"
+  default     = "alb"
+}
+
+variable "access_logs_expiration_days" {
+  type        = number
+  description = "Days to keep access logs in the created bucket"
+  default     = 14
+}
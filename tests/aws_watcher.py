@@ -0,0 +1,298 @@
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from tests.utils import BackoffSchedule, is_throttling_error
+
+# ---- Constants
+# polling 주기: 변화 직후/expect() 구간은 최소값, 변화가 없으면 최대값까지 점점 늘림
+DEFAULT_HEALTH_INTERVAL = 2          # TG health / ASG capacity 최소 주기 (초)
+DEFAULT_HEALTH_MAX_INTERVAL = 15
+DEFAULT_ACTIVITY_INTERVAL = 5        # scaling activity 최소 주기 (초)
+DEFAULT_ACTIVITY_MAX_INTERVAL = 60
+DEFAULT_FAST_WINDOW = 60             # 한 probe에서 변화 감지 시 모든 probe를 빠르게 돌리는 시간 (초)
+
+# ts: 변화를 처음 관측한 poll 시각 (API 요청/응답의 중간 시점)
+# prev_ts: 직전 poll 시각 → 실제 변화는 (prev_ts, ts] 구간에서 발생
+WatchEvent = namedtuple("WatchEvent", "ts prev_ts kind data")
+
+
+def fmt_change(start, ts, prev_ts):
+    """watcher 이벤트 시각 → '12.3s (between 10.1s and 12.3s)' 형태 (start 기준 경과 시간)"""
+    if prev_ts is None:
+        return f"{ts - start:.1f}s"
+    return f"{ts - start:.1f}s (between {max(0.0, prev_ts - start):.1f}s and {ts - start:.1f}s)"
+
+
+class WatchState:
+    """watcher가 관측한 최신 AWS 상태 (snapshot)"""
+
+    def __init__(self):
+        self.target_states = {}     # {instance_id: "healthy" | "unhealthy" | "draining" | ...}
+        self.desired = None         # ASG DesiredCapacity
+        self.in_service_ids = None  # ASG LifecycleState == InService
+        self.activities = {}        # {activity_id: {"status", "description", "start", "end"}}
+
+    @property
+    def healthy_ids(self):
+        return sorted(i for i, st in self.target_states.items() if st == "healthy")
+
+    def copy(self):
+        s = WatchState()
+        s.target_states = dict(self.target_states)
+        s.desired = self.desired
+        s.in_service_ids = list(self.in_service_ids) if self.in_service_ids is not None else None
+        s.activities = {k: dict(v) for k, v in self.activities.items()}
+        return s
+
+
+class Watch:
+    """
+    watcher.watch(predicate)가 반환하는 handle.
+    background poll에서 predicate가 처음 참이 된 순간을 기록하므로, 호출 측이 다른 일을 하는 동안
+    조건이 만족돼도 시각이 호출 주기로 양자화되지 않음.
+    """
+
+    def __init__(self, watcher, predicate):
+        self._watcher = watcher
+        self.predicate = predicate
+        self.result = None  # (ts, prev_ts, state)
+
+    def wait(self, timeout):
+        """조건 만족 시 (ts, prev_ts, state), timeout이면 None"""
+        return self._watcher._wait_watch(self, timeout)
+
+    def cancel(self):
+        self._watcher._remove_watch(self)
+
+
+class AwsStateWatcher:
+    """
+    Target Group health, ASG desired/in-service, scaling activity를 background thread에서 동시 polling.
+    - 상태가 바뀔 때만 timestamp가 찍힌 이벤트(WatchEvent)를 쌓음
+    - watch(predicate) / wait_for(predicate): 조건이 처음 참이 된 poll의 시각과 상태를 반환 (poll 주기로 양자화되지 않도록
+      각 probe가 독립적으로 돌고, 시각은 API 호출 중간 시점으로 기록)
+    - 주기는 adaptive: 변화가 감지되거나 expect()로 예고된 구간은 촘촘히, 조용하면 backoff, throttling이면 물러남
+    """
+
+    def __init__(self, elbv2_client=None, asg_client=None, tg_arn=None, asg_name=None,
+                 health_interval=DEFAULT_HEALTH_INTERVAL, activity_interval=DEFAULT_ACTIVITY_INTERVAL,
+                 health_max_interval=DEFAULT_HEALTH_MAX_INTERVAL,
+                 activity_max_interval=DEFAULT_ACTIVITY_MAX_INTERVAL,
+                 fast_window=DEFAULT_FAST_WINDOW):
+        self.elbv2_client = elbv2_client
+        self.asg_client = asg_client
+        self.tg_arn = tg_arn
+        self.asg_name = asg_name
+        self.health_interval = health_interval
+        self.activity_interval = activity_interval
+        self.health_max_interval = health_max_interval
+        self.activity_max_interval = activity_max_interval
+        self.fast_window = fast_window
+        self._schedules = {}  # {probe: BackoffSchedule}
+        self._wake_gen = 0    # 증가 시 sleep 중인 probe를 깨움
+
+        self.state = WatchState()
+        self.events = []
+        self._last_poll = {}  # {probe: ts}
+        self._ready = set()   # 최소 1회 poll 완료한 probe
+        self._waiters = []
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._pool = None
+
+    # ---- lifecycle
+    def _probes(self):
+        probes = []
+        health = (self.health_interval, self.health_max_interval)
+        activity = (self.activity_interval, self.activity_max_interval)
+        if self.elbv2_client is not None and self.tg_arn:
+            probes.append(("tg_health", self._poll_tg_health, health))
+        if self.asg_client is not None and self.asg_name:
+            probes.append(("asg_capacity", self._poll_asg_capacity, health))
+            probes.append(("scaling_activity", self._poll_scaling_activities, activity))
+        return probes
+
+    def start(self):
+        probes = self._probes()
+        for name, _, (lo, hi) in probes:
+            self._schedules[name] = BackoffSchedule(min_interval=lo, max_interval=hi, fast_window=self.fast_window)
+        self._pool = ThreadPoolExecutor(max_workers=max(1, len(probes)), thread_name_prefix="aws-watch")
+        for name, fn, _ in probes:
+            self._pool.submit(self._run_probe, name, fn)
+        # 첫 poll 결과가 모두 모일 때까지 대기 (초기 상태 없이 predicate를 평가하지 않도록)
+        with self._cond:
+            self._cond.wait_for(lambda: len(self._ready) >= len(probes) or self._stop.is_set(), timeout=30)
+        return self
+
+    def stop(self):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def expect(self, within_sec):
+        """앞으로 within_sec 동안 상태 변화가 예상됨 (예: 장애 주입 직후) → 모든 probe를 최소 주기로"""
+        with self._cond:
+            for sched in self._schedules.values():
+                sched.expect(within_sec)
+            self._wake_gen += 1
+            self._cond.notify_all()
+
+    def _sleep(self, delay):
+        with self._cond:
+            gen = self._wake_gen
+            self._cond.wait_for(lambda: self._stop.is_set() or self._wake_gen != gen, timeout=delay)
+
+    def _run_probe(self, name, fn):
+        sched = self._schedules[name]
+        while not self._stop.is_set():
+            t_req = time.time()
+            try:
+                result = fn()
+            except Exception as e:
+                throttled = is_throttling_error(e)
+                self._emit(time.time(), None, "error", {"probe": name, "error": str(e), "throttled": throttled})
+                self._sleep(sched.next_delay(throttled=throttled))
+                continue
+            ts = (t_req + time.time()) / 2.0
+            changed = self._apply(name, ts, result)
+            self._sleep(sched.next_delay(changed=changed))
+
+    # ---- probes (API 호출만, 상태 반영은 _apply에서)
+    def _poll_tg_health(self):
+        resp = self.elbv2_client.describe_target_health(TargetGroupArn=self.tg_arn)
+        return {
+            t["Target"]["Id"]: t["TargetHealth"]["State"]
+            for t in resp["TargetHealthDescriptions"]
+        }
+
+    def _poll_asg_capacity(self):
+        resp = self.asg_client.describe_auto_scaling_groups(AutoScalingGroupNames=[self.asg_name])
+        if not resp["AutoScalingGroups"]:
+            return 0, []
+        group = resp["AutoScalingGroups"][0]
+        in_service = sorted(
+            i["InstanceId"] for i in group.get("Instances", []) if i.get("LifecycleState") == "InService"
+        )
+        return group["DesiredCapacity"], in_service
+
+    def _poll_scaling_activities(self):
+        resp = self.asg_client.describe_scaling_activities(AutoScalingGroupName=self.asg_name, MaxRecords=20)
+        return {
+            a["ActivityId"]: {
+                "status": a.get("StatusCode"),
+                "description": a.get("Description", ""),
+                "start": a["StartTime"].timestamp() if a.get("StartTime") else None,
+                "end": a["EndTime"].timestamp() if a.get("EndTime") else None,
+            }
+            for a in resp.get("Activities", [])
+        }
+
+    # ---- state update / events
+    def _emit(self, ts, prev_ts, kind, data):
+        with self._cond:
+            self.events.append(WatchEvent(ts, prev_ts, kind, data))
+
+    def _apply(self, name, ts, result):
+        with self._cond:
+            first = name not in self._ready
+            prev_ts = self._last_poll.get(name)
+            self._last_poll[name] = ts
+            st = self.state
+            changed = None
+
+            if name == "tg_health":
+                if result != st.target_states:
+                    changed = {
+                        "healthy": sorted(i for i, s in result.items() if s == "healthy"),
+                        "states": dict(result),
+                        "previous": dict(st.target_states),
+                    }
+                    st.target_states = result
+            elif name == "asg_capacity":
+                desired, in_service = result
+                if desired != st.desired or in_service != st.in_service_ids:
+                    changed = {
+                        "desired": desired,
+                        "in_service": in_service,
+                        "previous_desired": st.desired,
+                        "previous_in_service": st.in_service_ids,
+                    }
+                    st.desired, st.in_service_ids = desired, in_service
+            elif name == "scaling_activity":
+                updates = {k: v for k, v in result.items() if st.activities.get(k) != v}
+                if updates:
+                    changed = {"activities": updates}
+                    st.activities.update(updates)
+
+            is_change = changed is not None and not first
+            if is_change:
+                self.events.append(WatchEvent(ts, prev_ts, name, changed))
+                # 한 곳이 바뀌면 연관 상태도 곧 바뀜 (예: desired 증가 → 곧 TG target 추가) → 전체 가속
+                for other, sched in self._schedules.items():
+                    if other != name:
+                        sched.expect(self.fast_window)
+                self._wake_gen += 1
+            self._ready.add(name)
+
+            for w in list(self._waiters):
+                if w.result is None and w.predicate(st):
+                    w.result = (ts, prev_ts, st.copy())
+            self._cond.notify_all()
+        return is_change
+
+    # ---- waiting
+    def watch(self, predicate):
+        """
+        predicate(WatchState)를 poll마다 평가하는 handle 등록.
+        이미 참이면 현재 시각으로 즉시 만족 처리.
+        """
+        w = Watch(self, predicate)
+        with self._cond:
+            if predicate(self.state):
+                w.result = (time.time(), None, self.state.copy())
+            else:
+                self._waiters.append(w)
+        return w
+
+    def _remove_watch(self, w):
+        with self._cond:
+            if w in self._waiters:
+                self._waiters.remove(w)
+
+    def _wait_watch(self, w, timeout):
+        deadline = time.time() + timeout
+        with self._cond:
+            while w.result is None and not self._stop.is_set():
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            if w.result is not None and w in self._waiters:
+                self._waiters.remove(w)
+        return w.result
+
+    def wait_for(self, predicate, timeout):
+        """
+        predicate(WatchState)가 참이 될 때까지 대기.
+        반환: (ts, prev_ts, state) — 조건을 처음 만족한 poll 시각/직전 poll 시각/그 시점 상태. timeout이면 None.
+        """
+        w = self.watch(predicate)
+        try:
+            return w.wait(timeout)
+        finally:
+            w.cancel()
+
+    def events_since(self, ts, kind=None):
+        with self._cond:
+            return [e for e in self.events if e.ts >= ts and (kind is None or e.kind == kind)]
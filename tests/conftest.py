@@ -1,13 +1,19 @@
 import pytest
-import boto3
 import json
 import os
 from dotenv import load_dotenv
 
+from tests.aws_watcher import AwsStateWatcher
+from tests.performance.aws_clients import get_client
+from tests.performance.results_store import ResultsStore
+from tests.prober import AvailabilityProber, DEFAULT_RATE_HZ
+from tests.utils import API_CALL_STATS
+
 load_dotenv()
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 CONFIG_PATH = os.path.join(BASE_DIR, "infra_config.json")
+RESULTS_DB = os.getenv("RESULTS_DB", os.path.join(BASE_DIR, "results", "results.db")).strip()
 
 def get_option(request, key, cli_opt):
     val = request.config.getoption(cli_opt)
@@ -51,12 +57,91 @@ def tg_arn(request):
 
 @pytest.fixture(scope="session")
 def asg_client():
-    return boto3.client("autoscaling", region_name="ap-northeast-2")
+    return get_client("autoscaling", on_create=API_CALL_STATS.instrument)
 
 @pytest.fixture(scope="session")
 def elbv2_client():
-    return boto3.client("elbv2", region_name="ap-northeast-2")
+    return get_client("elbv2", on_create=API_CALL_STATS.instrument)
 
 @pytest.fixture(scope="session")
 def ec2_client():
-    return boto3.client("ec2", region_name="ap-northeast-2")
\ No newline at end of file
+    return get_client("ec2", on_create=API_CALL_STATS.instrument)
+
+@pytest.fixture(scope="session")
+def cloudwatch_client():
+    return get_client("cloudwatch", on_create=API_CALL_STATS.instrument)
+
+@pytest.fixture
+def aws_watcher(elbv2_client, asg_client, tg_arn, asg_name):
+    """TG health / ASG capacity / scaling activity를 background에서 동시 polling"""
+    watcher = AwsStateWatcher(elbv2_client, asg_client, tg_arn=tg_arn, asg_name=asg_name)
+    watcher.start()
+    yield watcher
+    watcher.stop()
+
+@pytest.fixture
+def availability_prober(alb_url):
+    """ALB에 고빈도 probe (PROBE_RATE_HZ, 기본 20Hz). 시작은 각 테스트에서 start() 호출 시점"""
+    rate = float(os.getenv("PROBE_RATE_HZ", DEFAULT_RATE_HZ))
+    prober = AvailabilityProber(alb_url, rate_hz=rate)
+    yield prober
+    prober.stop()
+
+def pytest_terminal_summary(terminalreporter):
+    """세션 종료 시 AWS API 호출 수/latency 요약"""
+    for line in API_CALL_STATS.report_lines():
+        terminalreporter.write_line(line)
+
+
+# ---- Results store (RESULTS_DB, 빈 값이면 비활성)
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    rep = outcome.get_result()
+    setattr(item, f"rep_{rep.when}", rep)
+
+
+@pytest.fixture(scope="session")
+def results_store():
+    if not RESULTS_DB:
+        yield None
+        return
+    store = ResultsStore(RESULTS_DB)
+    yield store
+    store.close()
+
+
+class _NullRun:
+    """RESULTS_DB 비활성 시 대체 (기록 호출을 무시)"""
+
+    def record_metrics(self, **metrics):
+        pass
+
+    def record_outages(self, intervals):
+        pass
+
+    def record_hosts(self, hits, first_seen=None):
+        pass
+
+
+@pytest.fixture
+def results_run(request, results_store, alb_url, asg_name):
+    """테스트 1개 = run 1개. 테스트 안에서 record_metrics(...) 등으로 결과 기록"""
+    if results_store is None:
+        yield _NullRun()
+        return
+    run = results_store.start_run(
+        request.node.name,
+        "pytest",
+        config={"ALB_URL": str(alb_url), "ASG_NAME": str(asg_name), "NODEID": request.node.nodeid},
+        target=alb_url,
+    )
+    yield run
+    rep = getattr(request.node, "rep_call", None)
+    if rep is None:
+        status = "error"
+    elif rep.skipped:
+        status = "skipped"
+    else:
+        status = "passed" if rep.passed else "failed"
+    run.finish(status=status)
@@ -26,6 +26,12 @@ const port = 8080;
 
 let isAlive = true;
 
+// 모든 응답에 인스턴스 식별 header 추가 (부하 테스트 클라이언트가 body 파싱 없이 server id 확인)
+app.use((req, res, next) => {
+  res.set('X-Instance-Id', os.hostname());
+  next();
+});
+
 app.get('/', (req, res) => {
   if (!isAlive) {
     return res.status(500).send(`<h1>CRITICAL ERROR: Service on ${os.hostname()} is BROKEN!</h1>`);
@@ -1,20 +1,29 @@
+import time
+
 import pytest
-import requests
-from collections import Counter
-from tests.utils import now_str, extract_response_host
+from tests.stats import chi_square_uniform, wilson_interval, required_sample_size
+from tests.utils import (
+    now_str,
+    get_http_client,
+    get_healthy_instance_ids,
+    get_instance_hostnames,
+    sample_response_hosts,
+)
 
 pytestmark = pytest.mark.connectivity
 
 # ---- Constants
-SAMPLE_COUNT = 20
-IMBALANCE_THRESHOLD_PERCENT = 80
-REQUEST_TIMEOUT = 2
+SAMPLE_COUNT = 2000
+SAMPLE_CONCURRENCY = 32
+SIGNIFICANCE = 0.001   # chi-square p-value가 이보다 작으면 불균등으로 판정
+CONFIDENCE = 0.95      # host별 점유율 신뢰구간
+SHARE_MARGIN = 0.02    # 필요 표본 수 계산용 점유율 허용 오차 (±2%p)
 
 # ---- Tests
 def test_alb_http_access(alb_url):
     """[Smoke] ALB HTTP 접근 가능 여부 확인"""
     try:
-        resp = requests.get(alb_url, timeout=5) # ALB에 접속 자체가 가능한지? 
+        resp = get_http_client().get(alb_url, timeout=5) # ALB에 접속 자체가 가능한지? 
         assert resp.status_code == 200, "Non-200 HTTP status code returned"
     except Exception as e:
         pytest.fail(f"Failed to connect to ALB: {e}")
@@ -33,45 +42,56 @@ def test_target_group_has_healthy_instances(elbv2_client, tg_arn):
     print(f"\n[{now_str()}] [INFO] [TG] Healthy instances: {healthy_count}")
     assert healthy_count >= 2, "Less than 2 healthy instances detected"
 
-def test_load_is_distributed_across_instances(alb_url):
-    """[Smoke] Response가 여러 인스턴스로부터 균형되게 오는지 """
-    hosts = []
+def test_load_is_distributed_across_instances(alb_url, elbv2_client, ec2_client, tg_arn):
+    """
+    [Smoke] Response가 healthy 인스턴스들에 균등하게 분배되는지 (chi-square 적합도 검정)
+    - 요청마다 새 connection으로 동시에 SAMPLE_COUNT회 호출
+    - 기대 분포: 현재 healthy target 수(k)에 대한 균등 분배(1/k)
+    """
+    healthy_ids = get_healthy_instance_ids(elbv2_client, tg_arn) if tg_arn else []
+    id_to_host = get_instance_hostnames(ec2_client, healthy_ids)
 
     print(
         f"\n[{now_str()}] [INFO] [LB] Load distribution test started "
-        f"(samples={SAMPLE_COUNT})",
-        end=" ",
-        flush=True,
+        f"(samples={SAMPLE_COUNT}, concurrency={SAMPLE_CONCURRENCY}, healthy_targets={len(healthy_ids)})"
+    )
+
+    t0 = time.time()
+    counts, failed, conn_stats = sample_response_hosts(alb_url, SAMPLE_COUNT, concurrency=SAMPLE_CONCURRENCY)
+    elapsed = time.time() - t0
+    total = sum(counts.values())
+
+    print(
+        f"[{now_str()}] [INFO] [LB] {total} ok / {failed} failed in {elapsed:.1f}s "
+        f"(connections={conn_stats['connections']})"
+    )
+    assert total > 0, "No successful responses from ALB."
+    assert len(counts) >= 2, "Responses were generated by a single instance."
+
+    # healthy target 중 한 번도 응답하지 않은 host도 0으로 포함해야 검정이 의미 있음
+    expected_hosts = set(id_to_host.values())
+    if expected_hosts and set(counts) <= expected_hosts:
+        hosts = sorted(expected_hosts)
+    else:
+        hosts = sorted(counts)  # hostname 매핑 불가(다른 인프라 등) → 관측된 host 기준
+    k = len(hosts)
+    observed = [counts.get(h, 0) for h in hosts]
+    stat, dof, p_value = chi_square_uniform(observed)
+
+    print(f"[{now_str()}] [REPORT] [LB] Response distribution (expected {100 / k:.1f}% each, {CONFIDENCE:.0%} CI):")
+    for host, c in zip(hosts, observed):
+        lo, hi = wilson_interval(c, total, CONFIDENCE)
+        print(f"   {host}: {c} ({c / total:.1%}, CI {lo:.1%} ~ {hi:.1%})")
+    print(
+        f"   chi2={stat:.2f} dof={dof} p={p_value:.4f} "
+        f"(samples needed for ±{SHARE_MARGIN:.0%} share at {CONFIDENCE:.0%}: "
+        f"{required_sample_size(k, SHARE_MARGIN, CONFIDENCE)})"
     )
 
-    for _ in range(SAMPLE_COUNT):
-        try:
-            resp = requests.get(
-                alb_url,
-                headers={"Connection": "close"},
-                timeout=REQUEST_TIMEOUT,
-            )
-            host = extract_response_host(resp.text)
-            if host:
-                hosts.append(host)
-                print(".", end="", flush=True)
-        except Exception:
-            print("x", end="", flush=True)
-
-    assert len(hosts)>0, "No successful responses from ALB."
-    unique_hosts = set(hosts)
-    assert len(unique_hosts) >= 2, "Responses were generated by a single instance."
-
-    counts = Counter(hosts)
-    total = len(hosts)
-
-    print(f"\n[{now_str()}] [REPORT] [LB] Response distribution: {dict(counts)}")
-
-    for host, count in counts.items():
-        pct = (count / total) * 100
-        assert pct < IMBALANCE_THRESHOLD_PERCENT, (
-            f"Traffic imbalance detected: {host} received {pct:.0f}%"
-        )
+    assert all(observed), f"Some healthy targets received no traffic: {dict(zip(hosts, observed))}"
+    assert p_value >= SIGNIFICANCE, (
+        f"Traffic is not evenly distributed (chi2={stat:.2f}, dof={dof}, p={p_value:.2e} < {SIGNIFICANCE})"
+    )
 
 def test_instances_are_distributed_across_multiple_azs(elbv2_client, ec2_client, tg_arn):
     """[Smoke] Healthy 인스턴스가 Multi-AZ로 배포되어 있는지 검증"""
@@ -1,11 +1,9 @@
 import time
 import pytest
-import requests
 
-from tests.utils import (
-    get_healthy_instance_ids,
-    is_service_available,
-)
+from tests.aws_watcher import fmt_change
+from tests.prober import format_probe_report
+from tests.utils import get_http_client
 
 pytestmark = pytest.mark.fault
 
@@ -16,15 +14,45 @@ SETUP_WAIT_SECONDS = 300            # 5 min
 DETECT_TIMEOUT_SECONDS = 180        # 3 min
 RECOVERY_TIMEOUT_SECONDS = 600      # 10 min
 
-POLL_INTERVAL_SHORT = 5     # 상태변화 감지용
-POLL_INTERVAL_LONG = 10     # 느린 복구 대기용 
+POLL_INTERVAL_SHORT = 5     # 진행 표시('.') 주기 — 감지는 watcher, 가용성은 prober가 background에서 측정
+POLL_INTERVAL_LONG = 10
 
 AVAILABILITY_THRESHOLD_PERCENT = 95
 
 
+# ---- Helpers
+def report_availability(prober, windows, origin):
+    """구간별 prober 결과 출력 후 전체 구간 availability 판정 (전체 구간 report 반환)"""
+    for label, t_start, t_end in windows:
+        for line in format_probe_report(label, prober.report(t_start, t_end), origin=origin):
+            print(line)
+
+    total = prober.report(windows[0][1], windows[-1][2])
+    if total["availability"] is None:
+        return total
+    if total["availability"] < AVAILABILITY_THRESHOLD_PERCENT:
+        print("   [WARN] Some requests failed during recovery.")
+    else:
+        print("   [PASS] High availability maintained.")
+    return total
+
+
+def record_fault_result(results_run, total, **durations):
+    """감지/복구 소요 시간 + probe 가용성/outage를 results store에 기록"""
+    results_run.record_metrics(
+        availability_pct=total["availability"],
+        outage_count=len(total["outages"]),
+        outage_total_sec=total["outage_sec"],
+        outage_max_sec=total["longest_outage_sec"],
+        probe_p95_ms=total["p95_ms"],
+        **durations,
+    )
+    results_run.record_outages(total["outages"])
+
+
 # ---- Fixtures
 @pytest.fixture(autouse=True)
-def wait_for_stable_state(elbv2_client, tg_arn):
+def wait_for_stable_state(aws_watcher, tg_arn):
     """
     테스트 시작 전 시스템 안정화 대기
     - Target Group 내 healthy 인스턴스가 최소 2대 이상일 때까지 대기
@@ -33,16 +61,13 @@ def wait_for_stable_state(elbv2_client, tg_arn):
         return
 
     print("\n[Setup] Waiting for stable system state...", end="", flush=True)
-    start = time.time()
-
-    while time.time() - start < SETUP_WAIT_SECONDS:
-        healthy_ids = get_healthy_instance_ids(elbv2_client, tg_arn)
-        if len(healthy_ids) >= MIN_HEALTHY_INSTANCES:
-            print(" done.")
-            return
-
-        time.sleep(POLL_INTERVAL_LONG)
-        print(".", end="", flush=True)
+    result = aws_watcher.wait_for(
+        lambda s: len(s.healthy_ids) >= MIN_HEALTHY_INSTANCES,
+        timeout=SETUP_WAIT_SECONDS,
+    )
+    if result is not None:
+        print(" done.")
+        return
 
     pytest.skip(
         f"System is unstable: healthy instances < {MIN_HEALTHY_INSTANCES} "
@@ -51,7 +76,7 @@ def wait_for_stable_state(elbv2_client, tg_arn):
 
 
 # ---- Tests
-def test_app_fault_recovery(alb_url, elbv2_client, tg_arn):
+def test_app_fault_recovery(alb_url, aws_watcher, tg_arn, availability_prober, results_run):
     """
     [Scenario A] Application fault recovery (/kill)
 
@@ -63,17 +88,20 @@ def test_app_fault_recovery(alb_url, elbv2_client, tg_arn):
     print("\n[Scenario A] Application fault recovery (/kill)")
 
     # ---- Initial healthy check
-    initial_ids = get_healthy_instance_ids(elbv2_client, tg_arn)
+    initial_ids = aws_watcher.state.healthy_ids
     print(f"[Step 1] Initial healthy instances: {len(initial_ids)} {initial_ids}")
 
     # ---- Inject App fault
-    print("[Step 2] Injecting fault via /kill")
+    availability_prober.start()
+    print(f"[Step 2] Injecting fault via /kill (probing at {availability_prober.rate_hz:.0f}Hz)")
+    fault_ts = time.time()
     try:
-        requests.get(f"{alb_url}/kill", timeout=1)
+        get_http_client().get(f"{alb_url}/kill", timeout=1)
     except Exception:
         pass  # fault injection 목적이므로 예외 무시
+    aws_watcher.expect(DETECT_TIMEOUT_SECONDS)
 
-    # Step 3: ALB 장애 감지 + 가용성 측정
+    # Step 3: ALB 장애 감지
     print(
         f"[Step 3] Waiting for ALB to detect unhealthy target "
         f"(timeout={DETECT_TIMEOUT_SECONDS}s)...",
@@ -81,23 +109,14 @@ def test_app_fault_recovery(alb_url, elbv2_client, tg_arn):
         flush=True,
     )
 
-    start_detect = time.time()
-    success_rate = 0
-    check_rate = 0
-
-    while time.time() - start_detect < DETECT_TIMEOUT_SECONDS:
-        current_ids = get_healthy_instance_ids(elbv2_client, tg_arn)
-
-        if len(current_ids) < len(initial_ids):
-            print("\n-> Fault detected by ALB.")
+    # 감지 여부는 watcher, 가용성은 prober가 background에서 측정 → 이 루프는 진행 표시만 담당
+    detect = aws_watcher.watch(lambda s: len(s.healthy_ids) < len(initial_ids))
+    while time.time() - fault_ts < DETECT_TIMEOUT_SECONDS:
+        detected = detect.wait(POLL_INTERVAL_SHORT)
+        if detected is not None:
+            detect_ts, prev_ts, _ = detected
+            print(f"\n-> Fault detected by ALB at +{fmt_change(fault_ts, detect_ts, prev_ts)}.")
             break
-
-        # ---- availability check
-        if is_service_available(alb_url):
-            success_rate += POLL_INTERVAL_SHORT 
-        check_rate += POLL_INTERVAL_SHORT
-
-        time.sleep(POLL_INTERVAL_SHORT)
         print(".", end="", flush=True)
     else:
         pytest.fail(
@@ -113,35 +132,32 @@ def test_app_fault_recovery(alb_url, elbv2_client, tg_arn):
         flush=True,
     )
 
-    start_recover = time.time()                 
+    start_recover = time.time()
+    recovery = aws_watcher.watch(lambda s: len(s.healthy_ids) >= len(initial_ids))
 
     while time.time() - start_recover < RECOVERY_TIMEOUT_SECONDS:
-        current_ids = get_healthy_instance_ids(elbv2_client, tg_arn)
-
-        if len(current_ids) >= len(initial_ids):
-            elapsed = int(time.time() - start_recover)
-            print(f"\n-> Recovery completed in {elapsed}s")
-
-            if check_rate > 0:
-                availability = (success_rate / check_rate) * 100
-                print(
-                    f"   Availability during recovery: "
-                    f"{availability:.1f}%" #({success_rate}/{check_rate})"
-                )   
-
-                if availability < AVAILABILITY_THRESHOLD_PERCENT:
-                    print("   [WARN] Some requests failed during recovery.")
-                else:
-                    print("   [PASS] High availability maintained.")
-
+        recovered = recovery.wait(POLL_INTERVAL_LONG)
+
+        if recovered is not None:
+            recover_ts, prev_ts, _ = recovered
+            print(f"\n-> Recovery completed in {fmt_change(start_recover, recover_ts, prev_ts)}")
+            availability_prober.stop()
+
+            print("   Availability (probe):")
+            total = report_availability(
+                availability_prober,
+                [("detection", fault_ts, detect_ts), ("recovery", detect_ts, recover_ts)],
+                origin=fault_ts,
+            )
+            record_fault_result(
+                results_run,
+                total,
+                detect_sec=detect_ts - fault_ts,
+                recovery_sec=recover_ts - detect_ts,
+                total_sec=recover_ts - fault_ts,
+            )
             return
 
-        #---- availability check
-        if is_service_available(alb_url):
-            success_rate += POLL_INTERVAL_LONG
-        check_rate += POLL_INTERVAL_LONG
-
-        time.sleep(POLL_INTERVAL_LONG)
         print(".", end="", flush=True)
 
     pytest.fail(
@@ -150,7 +166,7 @@ def test_app_fault_recovery(alb_url, elbv2_client, tg_arn):
 
 
 
-def test_infra_fault_recovery(asg_client, elbv2_client, tg_arn, alb_url):
+def test_infra_fault_recovery(asg_client, aws_watcher, tg_arn, alb_url, availability_prober, results_run):
     """
     [Scenario B] Infrastructure fault recovery (Terminate Instance)
 
@@ -161,14 +177,17 @@ def test_infra_fault_recovery(asg_client, elbv2_client, tg_arn, alb_url):
     print("\n[Scenario B] Infrastructure fault recovery (Terminate Instance)")
 
     # Step 1: 희생 인스턴스 선정 및 종료
-    initial_ids = get_healthy_instance_ids(elbv2_client, tg_arn)
+    initial_ids = aws_watcher.state.healthy_ids
     victim_id = initial_ids[0]
     print(f"[Step 1] Terminating instance: {victim_id}")
 
+    availability_prober.start()
+    start = time.time()
     asg_client.terminate_instance_in_auto_scaling_group(
         InstanceId=victim_id,
         ShouldDecrementDesiredCapacity=False,
     )
+    aws_watcher.expect(DETECT_TIMEOUT_SECONDS)
 
     # Step 2: 복구 및 가용성 모니터링
     print(
@@ -178,38 +197,37 @@ def test_infra_fault_recovery(asg_client, elbv2_client, tg_arn, alb_url):
         flush=True,
     )
 
-    start = time.time()
-    success_count = 0
-    check_count = 0
+    # Self-healing 완료 조건
+    healing = aws_watcher.watch(
+        lambda s: victim_id not in s.healthy_ids and len(s.healthy_ids) >= len(initial_ids)
+    )
 
     while time.time() - start < RECOVERY_TIMEOUT_SECONDS:
-        current_ids = get_healthy_instance_ids(elbv2_client, tg_arn)
-
-        # Self-healing 완료 조건
-        if victim_id not in current_ids and len(current_ids) >= len(initial_ids):
-            elapsed = int(time.time() - start)
-            print(f"\n-> Self-healing completed in {elapsed}s")
-
-            if check_count > 0:
-                availability = (success_count / check_count) * 100
-                print(
-                    f"   Availability during recovery: "
-                    f"{availability:.1f}% ({success_count}/{check_count})"
-                )
-
-                if availability < AVAILABILITY_THRESHOLD_PERCENT:
-                    print("   [WARN] Some requests failed during recovery.")
-                else:
-                    print("   [PASS] High availability maintained.")
-
+        healed = healing.wait(POLL_INTERVAL_SHORT)
+
+        if healed is not None:
+            healed_ts, prev_ts, _ = healed
+            print(f"\n-> Self-healing completed in {fmt_change(start, healed_ts, prev_ts)}")
+            availability_prober.stop()
+
+            lost = aws_watcher.events_since(start, kind="tg_health")
+            victim_out = next((e for e in lost if victim_id not in e.data["healthy"]), None)
+            windows = [("recovery", start, healed_ts)]
+            if victim_out is not None:
+                print(f"   Victim left healthy set at +{fmt_change(start, victim_out.ts, victim_out.prev_ts)}")
+                windows = [("detection", start, victim_out.ts), ("recovery", victim_out.ts, healed_ts)]
+
+            print("   Availability (probe):")
+            total = report_availability(availability_prober, windows, origin=start)
+            record_fault_result(
+                results_run,
+                total,
+                detect_sec=victim_out.ts - start if victim_out is not None else None,
+                recovery_sec=healed_ts - (victim_out.ts if victim_out is not None else start),
+                total_sec=healed_ts - start,
+            )
             return
 
-        # 가용성 체크
-        if is_service_available(alb_url):
-            success_count += 1
-        check_count += 1
-
-        time.sleep(POLL_INTERVAL_SHORT)
         print(".", end="", flush=True)
 
     pytest.fail(
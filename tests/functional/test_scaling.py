@@ -1,42 +1,96 @@
+import os
 import time
-import threading
 
 import pytest
-import requests
 
-from tests.utils import now_str, get_asg_desired_capacity, get_healthy_target_instance_ids
+from tests.aws_watcher import fmt_change
+from tests.load_controller import CloudWatchCpuReader, CpuTargetController, NodeExporterCpuReader
+from tests.scaling_timeline import (
+    ScaleOutTimelineCollector,
+    append_run,
+    load_first_seen,
+    load_runs,
+    phase_durations,
+    phase_report_lines,
+    timeline_lines,
+)
+from tests.utils import now_str, get_asg_private_ips, get_instance_hostnames, get_instance_vcpus
 
 
 pytestmark = pytest.mark.scaling
 
 # ---- Constants
-LOAD_THREAD_COUNT = 4 
-LOAD_SEC = 40
-RETRIGGER_EVERY = 50 
+TARGET_CPU_PERCENT = 75   # cpu_high alarm(60%)보다 확실히 높게 유지
+WORK_SEC = 10             # /work 1회당 CPU burn 시간
+CPU_SOURCE = os.getenv("CPU_SOURCE", "cloudwatch").lower()  # cloudwatch | node_exporter
 
 SCALE_OUT_TIMEOUT_SECONDS = 900   # 15 min
 SCALE_IN_TIMEOUT_SECONDS = 1500    # 25 min
 
-SCALE_OUT_POLL_INTERVAL = 15
+SCALE_OUT_POLL_INTERVAL = 15   # 진행 표시('.') 주기 (상태 감지는 watcher가 background에서 수행)
 SCALE_IN_POLL_INTERVAL = 30
 
-WORK_REQUEST_TIMEOUT = 5
+FIRST_HIT_WAIT_SECONDS = 60    # 새 인스턴스가 healthy 된 뒤 첫 응답까지 대기
+_TESTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCALE_TIMELINE_PATH = os.getenv(
+    "SCALE_TIMELINE_PATH", os.path.join(_TESTS_DIR, "results", "scale_timelines.jsonl")
+)
+LOCUST_FIRST_SEEN_PATH = os.getenv("LOCUST_FIRST_SEEN_PATH", "")  # (선택) Locust <TIMESERIES_PATH>_first_seen.json
 
 # ---- Test-only Load Generator
-def load_generator(base_url, stop_event):
-    """
-    /work 엔드포인트를 호출하여 부하 생성
-    """
-    while not stop_event.is_set():
-        try:
-            requests.get(f"{base_url}/work",params={'sec':LOAD_SEC},timeout=WORK_REQUEST_TIMEOUT)
-        except Exception:
-            pass
-        stop_event.wait(RETRIGGER_EVERY) # Check the position 
+def make_cpu_reader(cloudwatch_client, asg_client, ec2_client, asg_name):
+    """CPU_SOURCE에 따라 CloudWatch(기본) 또는 node_exporter(:9100, VPC 내부 실행 시) reader"""
+    if CPU_SOURCE == "node_exporter":
+        return NodeExporterCpuReader(lambda: get_asg_private_ips(asg_client, ec2_client, asg_name))
+    return CloudWatchCpuReader(cloudwatch_client, asg_name)
+
+
+def record_scale_out_timeline(collector, since_ts, prober, new_hostnames):
+    """새 인스턴스의 첫 응답을 잠시 기다린 뒤 timeline 수집/저장, 누적 phase 통계 출력 (timelines 반환)"""
+    deadline = time.time() + FIRST_HIT_WAIT_SECONDS
+    while time.time() < deadline and not set(new_hostnames) <= set(prober.first_seen):
+        time.sleep(1)
+
+    first_seen = dict(prober.first_seen)
+    if LOCUST_FIRST_SEEN_PATH and os.path.exists(LOCUST_FIRST_SEEN_PATH):
+        for host, ts in load_first_seen(LOCUST_FIRST_SEEN_PATH).items():
+            first_seen[host] = min(ts, first_seen.get(host, ts))
+
+    timelines = collector.collect(since_ts, first_seen=first_seen)
+    print(f"[{now_str()}] [INFO] Scale-out timeline ({len(timelines)} instances):")
+    for line in timeline_lines(timelines):
+        print(line)
+
+    if timelines:
+        append_run(SCALE_TIMELINE_PATH, timelines, scenario="scaling", asg=collector.asg_name, since=since_ts)
+        for line in phase_report_lines(load_runs(SCALE_TIMELINE_PATH)):
+            print(line)
+    return timelines
+
+
+def phase_metrics(timelines):
+    """phase별 가장 느린 인스턴스의 소요 시간 → {phase_<from>_<to>_sec: sec}"""
+    return {
+        f"phase_{a}_{b}_sec": max(vals)
+        for (a, b), vals in phase_durations(timelines).items()
+        if vals
+    }
+
+
+def wait_with_progress(watch, timeout, interval):
+    """watch handle이 만족될 때까지 interval마다 '.' 출력하며 대기. (ts, prev_ts, state) 또는 None"""
+    start = time.time()
+    while time.time() - start < timeout:
+        result = watch.wait(min(interval, max(0.0, timeout - (time.time() - start))))
+        if result is not None:
+            return result
+        print(".", end="", flush=True)
+    return None
 
 
 # ---- Tests
-def test_asg_scaling_lifecycle(alb_url, asg_client, asg_name, elbv2_client, tg_arn):
+def test_asg_scaling_lifecycle(alb_url, asg_name, aws_watcher, asg_client, ec2_client, cloudwatch_client,
+                               availability_prober, results_run):
     """
     ASG Scaling Lifecycle 검증
     - Scale-out 발생 여부
@@ -46,28 +100,32 @@ def test_asg_scaling_lifecycle(alb_url, asg_client, asg_name, elbv2_client, tg_a
         pytest.skip("ASG name is not configured.")
 
     # ---- Step 1. Initial state
-    initial_capacity = get_asg_desired_capacity(asg_client, asg_name)
-    initial_healthy_ids = get_healthy_target_instance_ids(elbv2_client, tg_arn)
+    initial_capacity = aws_watcher.state.desired
+    initial_healthy_ids = aws_watcher.state.healthy_ids
 
     print(f"\n[{now_str()}] [INFO] Initial capacity: {initial_capacity}")
     print(f"[{now_str()}] [INFO] Initial healthy targets: {initial_healthy_ids}")
     print(f"[{now_str()}] [INFO] Target URL: {alb_url}/work")
 
-    # ---- Step 2. Start load
-    stop_event = threading.Event()
-    threads = [
-        threading.Thread(
-            target=load_generator,
-            args=(alb_url, stop_event),
-            daemon=True,
-        )
-        for _ in range(LOAD_THREAD_COUNT)
-    ]
+    # ---- Step 2. Start load (fleet 평균 CPU를 TARGET_CPU_PERCENT로 유지하는 closed-loop)
+    controller = CpuTargetController(
+        alb_url,
+        reader=make_cpu_reader(cloudwatch_client, asg_client, ec2_client, asg_name),
+        fleet_size_fn=lambda: len(aws_watcher.state.healthy_ids),
+        target_cpu=TARGET_CPU_PERCENT,
+        vcpus_per_instance=get_instance_vcpus(ec2_client, initial_healthy_ids) or 2,
+        work_sec=WORK_SEC,
+    )
+
+    load_start = time.time()
+    controller.start()
+    availability_prober.start()  # 새 인스턴스의 첫 응답 시각(first_hit) 측정용
 
-    for t in threads:
-        t.start()
+    print(f"[{now_str()}] [INFO] Load started (cpu source={CPU_SOURCE})")
 
-    print(f"[{now_str()}] [INFO] Load started ({LOAD_THREAD_COUNT} threads)")
+    # 각 단계 조건은 미리 등록 → 다른 단계를 기다리는 동안 만족돼도 최초 시각이 기록됨
+    scale_out_decision = aws_watcher.watch(lambda s: s.desired > initial_capacity)
+    new_healthy = aws_watcher.watch(lambda s: len(s.healthy_ids) > len(initial_healthy_ids))
 
     try:
         # ---- Step 3. Scale-out decision check
@@ -77,95 +135,92 @@ def test_asg_scaling_lifecycle(alb_url, asg_client, asg_name, elbv2_client, tg_a
             end="",
             flush=True,
         )
-        scale_out_capacity = None
-        current_capacity = initial_capacity
-        start_out = time.time()
-        while time.time() - start_out < SCALE_OUT_TIMEOUT_SECONDS:
-            current_capacity = get_asg_desired_capacity(asg_client, asg_name)
-
-            if current_capacity > initial_capacity:
-                scale_out_capacity = current_capacity
-                print(
-                    f"\n[{now_str()}] [PASS] Scale-out decision detected "
-                    f"({initial_capacity} -> {current_capacity})"
-                )
-                break
-
-            time.sleep(SCALE_OUT_POLL_INTERVAL)
-            print(".", end="", flush=True)
-
-        if scale_out_capacity is None:
-            pytest.fail(f"Scale-out not detected within {SCALE_OUT_TIMEOUT_SECONDS}s (current={current_capacity})")
-        
-    # ---- Step 4. Load Stop    
+        result = wait_with_progress(scale_out_decision, SCALE_OUT_TIMEOUT_SECONDS, SCALE_OUT_POLL_INTERVAL)
+        if result is None:
+            pytest.fail(
+                f"Scale-out not detected within {SCALE_OUT_TIMEOUT_SECONDS}s "
+                f"(current={aws_watcher.state.desired})"
+            )
+
+        ts, prev_ts, state = result
+        scale_out_capacity = state.desired
+        results_run.record_metrics(scale_out_decision_sec=ts - load_start)
+        print(
+            f"\n[{now_str()}] [PASS] Scale-out decision detected "
+            f"({initial_capacity} -> {scale_out_capacity}) at +{fmt_change(load_start, ts, prev_ts)}"
+        )
+
+    # ---- Step 4. Load Stop
     finally:
         print(f"[{now_str()}] [INFO] Stopping load generation")
-        stop_event.set()
-        for t in threads:
-            t.join()
+        controller.stop()
+        scale_out_decision.cancel()
+        load_stats = controller.client.stats()
+        controller.client.close()
+        print(
+            f"[{now_str()}] [INFO] Load requests={load_stats['requests']} (failed={controller.failed}) "
+            f"connections={load_stats['connections']}"
+        )
+        results_run.record_metrics(load_requests=controller.sent, load_failures=controller.failed)
 
     # ---- Step 5. Scale-out check (Healthy target 실제로 증가하는지)
     print(f"[{now_str()}] [CHECK] Waiting for new healthy targets...", end="",flush=True,)
-    scale_out_healthy_ids = None
-    start_health = time.time()
-    while time.time() - start_health < SCALE_OUT_TIMEOUT_SECONDS:
-        current_ids = get_healthy_target_instance_ids(elbv2_client, tg_arn)
-
-        if len(current_ids) > len(initial_healthy_ids):
-            scale_out_healthy_ids = current_ids
-            new_ids = set(current_ids) - set(initial_healthy_ids)
-            print(
-                f"\n[{now_str()}] [PASS] New healthy targets detected: {list(new_ids)}"
-            )
-            break
-
-        time.sleep(SCALE_OUT_POLL_INTERVAL)
-        print(".", end="", flush=True)
-    if scale_out_healthy_ids is None:
+    result = wait_with_progress(new_healthy, SCALE_OUT_TIMEOUT_SECONDS, SCALE_OUT_POLL_INTERVAL)
+    if result is None:
         pytest.fail(
             "Scale-out detected but no new healthy targets joined ALB "
             f"within {SCALE_OUT_TIMEOUT_SECONDS}s"
         )
-    
+    ts, prev_ts, state = result
+    scale_out_healthy_ids = state.healthy_ids
+    new_ids = set(scale_out_healthy_ids) - set(initial_healthy_ids)
+    results_run.record_metrics(new_healthy_sec=ts - load_start)
+    print(
+        f"\n[{now_str()}] [PASS] New healthy targets detected: {list(new_ids)} "
+        f"at +{fmt_change(load_start, ts, prev_ts)}"
+    )
+
+    collector = ScaleOutTimelineCollector(asg_client, ec2_client, cloudwatch_client, asg_name, watcher=aws_watcher)
+    new_hostnames = get_instance_hostnames(ec2_client, new_ids).values()
+    timelines = record_scale_out_timeline(collector, load_start, availability_prober, new_hostnames)
+    results_run.record_metrics(**phase_metrics(timelines))
+    availability_prober.stop()
 
     # ---- Step 6. Scale-in decision check (DesiredCapacity 감소)
     print(
         f"\n[{now_str()}] [CHECK] Waiting for scale-in decision (timeout={SCALE_IN_TIMEOUT_SECONDS}s)...",
         end="", flush=True,
     )
-    start_in = time.time()
-    scale_in_capacity = None
-    while time.time() - start_in < SCALE_IN_TIMEOUT_SECONDS:
-        current_capacity = get_asg_desired_capacity (asg_client, asg_name)
-        if current_capacity < scale_out_capacity:
-            scale_in_capacity = current_capacity
-            print(
-                f"\n[{now_str()}] [PASS] Scale-in decision detected "
-                f"({scale_out_capacity} -> {current_capacity})"
-            )
-            break
-        time.sleep(SCALE_IN_POLL_INTERVAL)
-        print(".", end="", flush=True)
-    if scale_in_capacity is None:
+    scale_in_decision = aws_watcher.watch(lambda s: s.desired < scale_out_capacity)
+    healthy_drop = aws_watcher.watch(lambda s: len(s.healthy_ids) < len(scale_out_healthy_ids))
+
+    result = wait_with_progress(scale_in_decision, SCALE_IN_TIMEOUT_SECONDS, SCALE_IN_POLL_INTERVAL)
+    if result is None:
         pytest.fail(f"Scale-in decision was not detected within {SCALE_IN_TIMEOUT_SECONDS}")
-    
+    ts, prev_ts, state = result
+    print(
+        f"\n[{now_str()}] [PASS] Scale-in decision detected "
+        f"({scale_out_capacity} -> {state.desired}) at +{fmt_change(load_start, ts, prev_ts)}"
+    )
+    results_run.record_metrics(scale_in_decision_sec=ts - load_start)
+
     # ---- Step 7. Scale-in check (Healthy target 감소)
     print(
         f"[{now_str()}] [CHECK] Waiting for # of healthy targets to drop (timeout={SCALE_IN_TIMEOUT_SECONDS}s)...",
         end="", flush=True,
     )
-    start_health_in = time.time()
-
-    while time.time() - start_health_in < SCALE_IN_TIMEOUT_SECONDS:
-        current_ids = get_healthy_target_instance_ids(elbv2_client, tg_arn)
+    result = wait_with_progress(healthy_drop, SCALE_IN_TIMEOUT_SECONDS, SCALE_IN_POLL_INTERVAL)
+    if result is None:
+        pytest.fail(f"Scale-in decision happened, but healthy targets did not decrease within {SCALE_IN_TIMEOUT_SECONDS}")
+    ts, prev_ts, state = result
+    removed_ids = set(scale_out_healthy_ids) - set(state.healthy_ids)
+    results_run.record_metrics(scale_in_sec=ts - load_start)
+    print(
+        f"\n[{now_str()}] [PASS] Scale-in detected removed_targets={list(removed_ids)}) "
+        f"at +{fmt_change(load_start, ts, prev_ts)}"
+    )
 
-        if (len(current_ids) < len(scale_out_healthy_ids)):
-            removed_ids = set(scale_out_healthy_ids) - set(current_ids)
-            print(
-                f"\n[{now_str()}] [PASS] Scale-in detected removed_targets={list(removed_ids)})"
-            )
-            return
-        time.sleep(SCALE_IN_POLL_INTERVAL)
-        print(".", end="", flush=True)
-    pytest.fail(f"Scale-in decision happened, but healthy targets did not decrease within {SCALE_IN_TIMEOUT_SECONDS}")
-    
\ No newline at end of file
+    # ---- Scaling activity 요약 (watcher가 관측한 ASG activity 변화)
+    for e in aws_watcher.events_since(load_start, kind="scaling_activity"):
+        for act in e.data["activities"].values():
+            print(f"   [ACTIVITY] +{fmt_change(load_start, e.ts, e.prev_ts)} {act['status']}: {act['description']}")
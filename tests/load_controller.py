@@ -0,0 +1,228 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from tests.performance.node_scraper import parse_node_metrics
+from tests.utils import HttpClient, now_str
+
+# ---- Constants
+DEFAULT_TARGET_CPU = 75.0       # cpu_high alarm(60%)을 확실히 넘기되 100% 포화는 피하는 값
+DEFAULT_WORK_SEC = 10           # /work 1회당 CPU burn 시간 (짧을수록 제어가 촘촘)
+DEFAULT_VCPUS = 2               # t3.micro/small
+NODE_EXPORTER_PORT = 9100
+
+
+# ==========================================
+# CPU readers (read() → (ts, cpu_percent) 또는 None)
+# ==========================================
+
+class CloudWatchCpuReader:
+    """
+    AWS/EC2 CPUUtilization (AutoScalingGroupName 차원, Average) — cpu_high alarm과 같은 지표.
+    CloudWatch 집계 지연(1~3분)이 있으므로 제어 주기도 길게(60s).
+    """
+    interval = 60
+
+    def __init__(self, cw_client, asg_name, period=60):
+        self.cw_client = cw_client
+        self.asg_name = asg_name
+        self.period = period
+
+    def read(self):
+        end = datetime.now(timezone.utc)
+        resp = self.cw_client.get_metric_data(
+            MetricDataQueries=[{
+                "Id": "cpu",
+                "MetricStat": {
+                    "Metric": {
+                        "Namespace": "AWS/EC2",
+                        "MetricName": "CPUUtilization",
+                        "Dimensions": [{"Name": "AutoScalingGroupName", "Value": self.asg_name}],
+                    },
+                    "Period": self.period,
+                    "Stat": "Average",
+                },
+            }],
+            StartTime=end - timedelta(seconds=self.period * 10),
+            EndTime=end,
+            ScanBy="TimestampDescending",
+        )
+        result = resp["MetricDataResults"][0]
+        if not result["Values"]:
+            return None
+        return result["Timestamps"][0].timestamp(), float(result["Values"][0])
+
+
+class NodeExporterCpuReader:
+    """
+    각 인스턴스 node_exporter(:9100)를 직접 scrape → 직전 scrape 대비 CPU 사용률의 인스턴스 평균.
+    테스트 실행 환경에서 인스턴스 private IP로 접근 가능해야 함 (VPC 내부 실행 등).
+    """
+    interval = 5
+
+    def __init__(self, targets_fn, port=NODE_EXPORTER_PORT, timeout=2, client=None):
+        self.targets_fn = targets_fn  # () → [ip, ...]
+        self.port = port
+        self.client = client or HttpClient(timeout=timeout)
+        self._prev = {}  # {ip: (idle, total)}
+
+    def read(self):
+        usages = []
+        seen = set()
+        for ip in self.targets_fn():
+            seen.add(ip)
+            try:
+                text = self.client.get(f"http://{ip}:{self.port}/metrics").text
+            except Exception:
+                continue
+            # CPU 사용률 정의(idle + iowait = idle)는 부하 테스트 node scrape와 같은 parser 사용
+            m = parse_node_metrics(text.splitlines())
+            idle, total = m["cpu_idle"] or 0.0, m["cpu_total"] or 0.0
+            prev = self._prev.get(ip)
+            self._prev[ip] = (idle, total)
+            if prev is not None and total > prev[1]:
+                usages.append(100.0 * (1 - (idle - prev[0]) / (total - prev[1])))
+        for ip in set(self._prev) - seen:
+            del self._prev[ip]
+        if not usages:
+            return None
+        return time.time(), sum(usages) / len(usages)
+
+
+# ==========================================
+# Controller
+# ==========================================
+
+class CpuTargetController:
+    """
+    fleet 평균 CPU를 target_cpu로 유지하도록 /work 호출 rate(req/s)를 조절하는 closed-loop controller.
+
+    - feedforward: /work 1회 = vCPU 1개를 work_sec 동안 점유 →
+      목표 rate = target/100 * vcpus * fleet / work_sec  (fleet이 늘면 자동으로 rate 증가)
+    - feedback (PI): CPU 측정값과 목표의 오차로 feedforward를 보정 (인스턴스 성능/credit 차이 흡수)
+    - 새 측정값이 없으면(CloudWatch 지연) 적분하지 않음
+    """
+
+    def __init__(self, base_url, reader, fleet_size_fn, target_cpu=DEFAULT_TARGET_CPU,
+                 vcpus_per_instance=DEFAULT_VCPUS, work_sec=DEFAULT_WORK_SEC,
+                 kp=0.8, ki=0.5, min_rate=0.05, max_rate=20.0, client=None):
+        self.base_url = base_url
+        self.reader = reader
+        self.fleet_size_fn = fleet_size_fn
+        self.target_cpu = float(target_cpu)
+        self.vcpus = vcpus_per_instance
+        self.work_sec = work_sec
+        self.kp = kp
+        self.ki = ki
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.client = client or HttpClient(pool_size=8, timeout=5)
+
+        self.fleet = max(1, int(fleet_size_fn() or 1))
+        self.rate = self._clamp(self._feedforward())
+        self.history = []  # [(ts, cpu, fleet, rate)]
+        self.sent = 0
+        self.failed = 0
+
+        self._integral = 0.0
+        self._last_sample_ts = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._pool = None
+
+    def _feedforward(self):
+        return self.target_cpu / 100.0 * self.vcpus * self.fleet / self.work_sec
+
+    def _clamp(self, rate):
+        return max(self.min_rate, min(self.max_rate, rate))
+
+    # ---- lifecycle
+    def start(self):
+        self._stop.clear()
+        self._pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="work")
+        for fn in (self._dispatch_loop, self._control_loop):
+            th = threading.Thread(target=fn, daemon=True)
+            th.start()
+            self._threads.append(th)
+        print(
+            f"[{now_str()}] [CTRL] target_cpu={self.target_cpu:.0f}% fleet={self.fleet} "
+            f"initial_rate={self.rate:.2f} req/s (work_sec={self.work_sec})"
+        )
+        return self
+
+    def stop(self):
+        self._stop.set()
+        for th in self._threads:
+            th.join()
+        self._threads = []
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ---- dispatch (/work at current rate)
+    def _fire(self):
+        try:
+            ok = self.client.get(f"{self.base_url}/work", params={"sec": self.work_sec}).status_code == 200
+        except Exception:
+            ok = False
+        with self._lock:
+            self.sent += 1
+            if not ok:
+                self.failed += 1
+
+    def _dispatch_loop(self):
+        last_fire = None
+        while not self._stop.is_set():
+            with self._lock:
+                period = 1.0 / self.rate
+            now = time.monotonic()
+            delay = 0.0 if last_fire is None else last_fire + period - now
+            if delay > 0:
+                # rate가 바뀌면 바로 반영되도록 짧게 나눠서 대기
+                self._stop.wait(min(delay, 0.5))
+                continue
+            self._pool.submit(self._fire)
+            last_fire = now  # 늦어진 만큼 몰아서 보내지 않음
+
+    # ---- control (PI on CPU error)
+    def update(self, sample):
+        """측정값 1개로 rate 갱신 (sample: (ts, cpu) 또는 None)"""
+        try:
+            self.fleet = max(1, int(self.fleet_size_fn() or self.fleet))
+        except Exception:
+            pass
+        ff = self._feedforward()
+
+        if sample is None or sample[0] == self._last_sample_ts:
+            rate = ff * (1 + self.ki * self._integral)
+            cpu = None
+        else:
+            self._last_sample_ts, cpu = sample
+            err = (self.target_cpu - cpu) / 100.0
+            # anti-windup: 적분항 단독 보정폭을 feedforward의 ±100%로 제한
+            self._integral = max(-1.0 / self.ki, min(1.0 / self.ki, self._integral + err))
+            rate = ff * (1 + self.kp * err + self.ki * self._integral)
+
+        with self._lock:
+            self.rate = self._clamp(rate)
+        self.history.append((time.time(), cpu, self.fleet, self.rate))
+        return self.rate
+
+    def _control_loop(self):
+        while not self._stop.wait(self.reader.interval):
+            try:
+                sample = self.reader.read()
+            except Exception as e:
+                print(f"[{now_str()}] [CTRL] CPU read failed: {e}")
+                sample = None
+            rate = self.update(sample)
+            cpu = "-" if sample is None else f"{sample[1]:.1f}%"
+            print(f"[{now_str()}] [CTRL] cpu={cpu} fleet={self.fleet} rate={rate:.2f} req/s sent={self.sent}")
@@ -0,0 +1,408 @@
+"""
+ALB access log 분석기 (target별 / 시간 bucket별 processing time histogram, 5xx 비율)
+
+- multiprocessing Pool: 파일 1개 = task 1개 (gzip 해제 + 파싱이 CPU bound라 프로세스 병렬)
+- worker: 파일 → 컬럼형 중간 표현(LogColumns: array.array 컬럼 + target dictionary encoding, 요청당 ~40 bytes)
+          → 부분 집계(Aggregate) → sparse dict 반환 (histogram 크기에만 비례, 요청 수와 무관)
+- parent: 부분 집계 merge → 표 출력 / --json 저장
+- --cache-dir: LogColumns를 파일로 저장 → bucket 크기를 바꾼 재분석 시 gzip 파싱 생략
+
+사용 예:
+    aws s3 sync s3://<bucket>/<prefix>/AWSLogs/<account-id>/elasticloadbalancing/<region>/2024/01/01/ ./alb-logs
+    python tests/performance/alb_log_analyzer.py ./alb-logs --workers 8 --json alb_report.json
+    python tests/performance/alb_log_analyzer.py "./alb-logs/**/*.log.gz" --bucket-sec 300 --cache-dir /tmp/alb-cols
+"""
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+from array import array
+from multiprocessing import Pool
+
+from alb_logs import F, iter_log_paths, iter_rows, parse_ts
+from latency_histogram import LatencyHistogram
+
+# ---- Constants
+# (이름, array typecode) — ts는 응답 완료 시각(time 필드, CloudWatch 지표와 같은 기준)
+COLUMNS = (
+    ("ts", "d"),
+    ("target", "i"),          # LogColumns.targets index (-1 = target에 도달하지 못한 요청)
+    ("elb_status", "H"),      # 0 = '-'
+    ("target_status", "H"),
+    ("request_us", "q"),      # processing time (us), -1 = 측정 불가 (ALB 로그의 -1)
+    ("target_us", "q"),       # 'i'(32bit)는 ~2147s에서 overflow → idle timeout(최대 4000s) 요청도 담도록 64bit
+    ("response_us", "q"),
+)
+TIMINGS = (("request", "request_us"), ("target", "target_us"), ("response", "response_us"))
+NO_TARGET = "-"
+DEFAULT_BUCKET_SEC = 60
+BUCKET_HIST_BITS = 5          # 시간 bucket histogram은 개수가 많으므로 해상도를 낮춤 (상대 오차 ~6%)
+CACHE_SUFFIX = ".cols"
+_US_MAX = 2 ** 63 - 1
+
+
+def _status(value):
+    if value == "-":
+        return 0
+    v = int(value)
+    if not 0 <= v <= 0xFFFF:
+        raise ValueError(f"status out of range: {value}")
+    return v
+
+
+def _us(value):
+    v = float(value)
+    if v < 0:
+        return -1
+    us = int(v * 1_000_000)  # inf → OverflowError, nan → ValueError
+    if us > _US_MAX:
+        raise OverflowError(f"processing time out of range: {value}")
+    return us
+
+
+# ==========================================
+# Columnar intermediate representation
+# ==========================================
+
+class LogColumns:
+    """로그 1개 파일의 필요한 필드만 컬럼별 array로 보관 (target 문자열은 dictionary encoding)"""
+
+    def __init__(self):
+        self.targets = []
+        self._target_idx = {}
+        self.cols = {name: array(code) for name, code in COLUMNS}
+        self.malformed = 0
+
+    def __len__(self):
+        return len(self.cols["ts"])
+
+    def _target(self, value):
+        if value == NO_TARGET:
+            return -1
+        idx = self._target_idx.get(value)
+        if idx is None:
+            idx = self._target_idx[value] = len(self.targets)
+            self.targets.append(value)
+        return idx
+
+    def append_row(self, row):
+        try:
+            values = (
+                parse_ts(row[F["time"]]),
+                self._target(row[F["target"]]),
+                _status(row[F["elb_status_code"]]),
+                _status(row[F["target_status_code"]]),
+                _us(row[F["request_processing_time"]]),
+                _us(row[F["target_processing_time"]]),
+                _us(row[F["response_processing_time"]]),
+            )
+        except (ValueError, OverflowError):
+            # 범위 검사까지 끝난 뒤에만 append (일부 컬럼만 추가되어 길이가 어긋나지 않도록)
+            self.malformed += 1
+            return
+        for (name, _), v in zip(COLUMNS, values):
+            self.cols[name].append(v)
+
+    @classmethod
+    def from_file(cls, path):
+        c = cls()
+        for row in iter_rows(path):
+            c.append_row(row)
+        return c
+
+    # ---- cache 파일: [header 길이(4B)] [JSON header] [컬럼 raw bytes...] (같은 머신 재분석용, native byte order)
+    def save(self, path):
+        header = json.dumps({
+            "targets": self.targets,
+            "malformed": self.malformed,
+            "columns": [[name, code, len(self.cols[name])] for name, code in COLUMNS],
+        }).encode()
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(struct.pack("<I", len(header)))
+            f.write(header)
+            for name, _ in COLUMNS:
+                self.cols[name].tofile(f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        c = cls()
+        with open(path, "rb") as f:
+            (size,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(size))
+            for name, code, n in header["columns"]:
+                col = array(code)
+                col.fromfile(f, n)
+                c.cols[name] = col
+        c.targets = header["targets"]
+        c._target_idx = {t: i for i, t in enumerate(c.targets)}
+        c.malformed = header["malformed"]
+        return c
+
+
+# ==========================================
+# Aggregation
+# ==========================================
+
+class Stats:
+    """요청 수 / 5xx 수 / processing time histogram 3종 (request, target, response)"""
+
+    __slots__ = ("requests", "elb_5xx", "target_5xx", "hists")
+
+    def __init__(self, **hist_kwargs):
+        self.requests = 0
+        self.elb_5xx = 0
+        self.target_5xx = 0
+        self.hists = {name: LatencyHistogram(**hist_kwargs) for name, _ in TIMINGS}
+
+    def merge(self, other):
+        self.requests += other.requests
+        self.elb_5xx += other.elb_5xx
+        self.target_5xx += other.target_5xx
+        for name, h in other.hists.items():
+            self.hists[name].merge(h)
+        return self
+
+    def to_dict(self):
+        return {
+            "requests": self.requests,
+            "elb_5xx": self.elb_5xx,
+            "target_5xx": self.target_5xx,
+            "hists": {name: h.to_dict() for name, h in self.hists.items() if h.count},
+        }
+
+    @classmethod
+    def from_dict(cls, d, **hist_kwargs):
+        s = cls(**hist_kwargs)
+        s.requests = d["requests"]
+        s.elb_5xx = d["elb_5xx"]
+        s.target_5xx = d["target_5xx"]
+        for name, h in d["hists"].items():
+            s.hists[name] = LatencyHistogram.from_dict(h)
+        return s
+
+    def summary(self, qs=(0.50, 0.95, 0.99)):
+        out = {
+            "requests": self.requests,
+            "elb_5xx_pct": (self.elb_5xx / self.requests * 100.0) if self.requests else 0.0,
+            "target_5xx_pct": (self.target_5xx / self.requests * 100.0) if self.requests else 0.0,
+        }
+        for name, h in self.hists.items():
+            for q, v in zip(qs, h.percentiles(list(qs))):
+                out[f"{name}_p{q * 100:g}_ms"] = v
+        return out
+
+
+class Aggregate:
+    """target별 / bucket_sec 단위 시간 bucket별 Stats (merge 가능)"""
+
+    def __init__(self, bucket_sec=DEFAULT_BUCKET_SEC):
+        self.bucket_sec = bucket_sec
+        self.by_target = {}
+        self.by_bucket = {}
+        self.records = 0
+        self.malformed = 0
+
+    def _target_stats(self, key):
+        s = self.by_target.get(key)
+        if s is None:
+            s = self.by_target[key] = Stats()
+        return s
+
+    def _bucket_stats(self, key):
+        s = self.by_bucket.get(key)
+        if s is None:
+            s = self.by_bucket[key] = Stats(sub_bucket_bits=BUCKET_HIST_BITS)
+        return s
+
+    def add_columns(self, c):
+        cols = c.cols
+        ts, target, elb, tgt = cols["ts"], cols["target"], cols["elb_status"], cols["target_status"]
+        timings = [(name, cols[col]) for name, col in TIMINGS]
+        names = c.targets
+        bucket_sec = self.bucket_sec
+        for i in range(len(c)):
+            b = int(ts[i] // bucket_sec) * bucket_sec
+            t = target[i]
+            pair = (self._target_stats(names[t] if t >= 0 else NO_TARGET), self._bucket_stats(b))
+            e5 = elb[i] >= 500
+            t5 = tgt[i] >= 500
+            for s in pair:
+                s.requests += 1
+                s.elb_5xx += e5
+                s.target_5xx += t5
+            for name, col in timings:
+                us = col[i]
+                if us >= 0:
+                    ms = us / 1000.0
+                    pair[0].hists[name].record(ms)
+                    pair[1].hists[name].record(ms)
+        self.records += len(c)
+        self.malformed += c.malformed
+
+    def merge(self, other):
+        for key, s in other.by_target.items():
+            self._target_stats(key).merge(s)
+        for key, s in other.by_bucket.items():
+            self._bucket_stats(key).merge(s)
+        self.records += other.records
+        self.malformed += other.malformed
+        return self
+
+    def to_dict(self):
+        return {
+            "bucket_sec": self.bucket_sec,
+            "records": self.records,
+            "malformed": self.malformed,
+            "by_target": {k: s.to_dict() for k, s in self.by_target.items()},
+            "by_bucket": {str(k): s.to_dict() for k, s in self.by_bucket.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        a = cls(d["bucket_sec"])
+        a.records = d["records"]
+        a.malformed = d["malformed"]
+        a.by_target = {k: Stats.from_dict(s) for k, s in d["by_target"].items()}
+        a.by_bucket = {int(k): Stats.from_dict(s, sub_bucket_bits=BUCKET_HIST_BITS) for k, s in d["by_bucket"].items()}
+        return a
+
+
+# ==========================================
+# Parallel pipeline
+# ==========================================
+
+def _cache_path(cache_dir, path):
+    return os.path.join(cache_dir, os.path.basename(path) + CACHE_SUFFIX)
+
+
+def _load_columns(path, cache_dir):
+    if not cache_dir:
+        return LogColumns.from_file(path)
+    cached = _cache_path(cache_dir, path)
+    if os.path.exists(cached) and os.path.getmtime(cached) >= os.path.getmtime(path):
+        return LogColumns.load(cached)
+    c = LogColumns.from_file(path)
+    c.save(cached)
+    return c
+
+
+def _analyze_file(task):
+    """Pool worker: 파일 1개 → 부분 집계 dict (top-level 함수여야 pickle 가능)"""
+    path, bucket_sec, cache_dir = task
+    agg = Aggregate(bucket_sec)
+    agg.add_columns(_load_columns(path, cache_dir))
+    return agg.to_dict()
+
+
+def analyze(paths, workers=None, bucket_sec=DEFAULT_BUCKET_SEC, cache_dir=None, progress=None):
+    """로그 파일 목록 → 병합된 Aggregate. workers=1이면 Pool 없이 현재 프로세스에서 처리"""
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+    tasks = [(p, bucket_sec, cache_dir) for p in paths]
+    total = Aggregate(bucket_sec)
+    if workers == 1:
+        results = map(_analyze_file, tasks)
+        for i, d in enumerate(results, 1):
+            total.merge(Aggregate.from_dict(d))
+            if progress:
+                progress(i, len(tasks))
+        return total
+    with Pool(processes=workers) as pool:
+        # 파일 크기가 제각각이므로 chunksize=1 + 완료 순서대로 merge
+        for i, d in enumerate(pool.imap_unordered(_analyze_file, tasks, chunksize=1), 1):
+            total.merge(Aggregate.from_dict(d))
+            if progress:
+                progress(i, len(tasks))
+    return total
+
+
+# ==========================================
+# Report
+# ==========================================
+
+def _ms(v):
+    return "-" if v is None else f"{v:.1f}"
+
+
+def _row(label, d):
+    return (
+        f"{label:<22} {d['requests']:>9} {d['elb_5xx_pct']:>7.2f} {d['target_5xx_pct']:>7.2f} "
+        f"{_ms(d['target_p50_ms']):>8} {_ms(d['target_p95_ms']):>8} {_ms(d['target_p99_ms']):>8} "
+        f"{_ms(d['request_p99_ms']):>8} {_ms(d['response_p99_ms']):>8}"
+    )
+
+
+HEADER = (
+    f"{'':<22} {'requests':>9} {'elb5xx%':>7} {'tgt5xx%':>7} "
+    f"{'tgt p50':>8} {'tgt p95':>8} {'tgt p99':>8} {'req p99':>8} {'resp p99':>8}"
+)
+
+
+def report_lines(agg, top=None):
+    lines = ["[Per Target] (processing time ms)", HEADER]
+    targets = sorted(agg.by_target.items(), key=lambda kv: kv[1].requests, reverse=True)
+    for key, s in targets[:top] if top else targets:
+        lines.append(_row(key, s.summary()))
+    lines += ["", f"[Per {agg.bucket_sec}s] (UTC)", HEADER]
+    for key in sorted(agg.by_bucket):
+        label = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(key))
+        lines.append(_row(label, agg.by_bucket[key].summary()))
+    return lines
+
+
+def report_json(agg):
+    """요약 percentile + histogram 원본(sparse bucket)을 함께 저장 (재집계/시각화용)"""
+    return {
+        "bucket_sec": agg.bucket_sec,
+        "records": agg.records,
+        "malformed": agg.malformed,
+        "targets": {k: {"summary": s.summary(), **s.to_dict()} for k, s in agg.by_target.items()},
+        "buckets": [
+            {"ts": k, "summary": agg.by_bucket[k].summary(), **agg.by_bucket[k].to_dict()}
+            for k in sorted(agg.by_bucket)
+        ],
+    }
+
+
+def _main():
+    parser = argparse.ArgumentParser(description="ALB access log 병렬 분석 (target별/시간별 histogram, 5xx)")
+    parser.add_argument("sources", nargs="+", help="로그 파일 / 디렉토리 / glob (.log.gz, .log)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--bucket-sec", type=int, default=DEFAULT_BUCKET_SEC, help="시간 bucket 크기(초)")
+    parser.add_argument("--cache-dir", help="컬럼형 중간 파일 저장 위치 (재분석 시 파싱 생략)")
+    parser.add_argument("--top", type=int, help="요청 수 상위 N개 target만 출력")
+    parser.add_argument("--json", help="결과 JSON 저장 경로 (histogram bucket 포함)")
+    args = parser.parse_args()
+
+    paths = iter_log_paths(args.sources)
+    if not paths:
+        print(f"[ERROR] No ALB log files found: {args.sources}")
+        return 2
+
+    started = time.time()
+    step = max(1, len(paths) // 20)
+
+    def progress(done, total):
+        if done % step == 0 or done == total:
+            print(f"  ... {done}/{total} files", file=sys.stderr)
+
+    print(f"files: {len(paths)}, workers: {args.workers}, bucket: {args.bucket_sec}s", file=sys.stderr)
+    agg = analyze(paths, workers=args.workers, bucket_sec=args.bucket_sec, cache_dir=args.cache_dir, progress=progress)
+    elapsed = time.time() - started
+    print(f"records: {agg.records} (malformed {agg.malformed}) in {elapsed:.1f}s", file=sys.stderr)
+
+    for line in report_lines(agg, args.top):
+        print(line)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report_json(agg), f, ensure_ascii=False)
+        print(f"\nSaved: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main())
@@ -0,0 +1,179 @@
+"""
+Open-model 부하: 응답 시간과 무관하게 목표 도착률(req/s)로 요청 slot을 배정
+
+- closed model(between wait)은 ALB가 느려지면 요청 수 자체가 줄어 P95가 실제보다 좋게 보임
+- ArrivalDispatcher가 프로세스 단위 schedule(다음 intended send time)을 관리하고,
+  미리 spawn된 user들이 acquire()로 slot을 하나씩 가져가 그 시각에 요청을 보냄
+- 모든 user가 응답 대기 중이라 slot을 제때 가져가지 못하면:
+  - late   : 예정 시각보다 ARRIVAL_LATE_SEC 이상 늦게 발송
+  - dropped: ARRIVAL_MAX_LAG_SEC 이상 밀린 slot은 발송하지 않고 버림 (몰아서 보내지 않음)
+- 도착 간격: uniform(1/rate 고정) 또는 poisson(지수분포)
+"""
+import math
+import random
+import time
+
+# gevent (Locust 내부에서 사용)
+try:
+    from gevent import sleep
+except Exception:
+    def sleep(x):  # fallback
+        time.sleep(x)
+
+# ---- Constants
+PROCESSES = ("uniform", "poisson")
+IDLE_POLL_SEC = 0.1   # rate=0 구간에서 schedule 재확인 주기
+
+
+# ==========================================
+# Rate profiles (t: schedule 시작 후 경과초 → req/s)
+# ==========================================
+
+def constant_rate(rate):
+    return lambda t: rate
+
+
+def step_rate(start_rate, increment, step_sec):
+    """start_rate에서 시작해 step_sec마다 increment씩 증가"""
+    return lambda t: start_rate + int(t // step_sec) * increment
+
+
+def peak_rate(profile, duration, resolution=1.0):
+    """duration 동안의 최대 rate (pre-spawn user 수 산정용)"""
+    steps = max(1, int(duration / resolution))
+    return max(profile(i * resolution) for i in range(steps + 1))
+
+
+def users_for_rate(rate, max_latency_sec, headroom=1.5, minimum=1):
+    """
+    Little's law: 동시 in-flight = rate * latency.
+    응답이 max_latency_sec까지 느려져도 rate를 유지할 수 있는 user 수
+    """
+    return max(minimum, int(math.ceil(rate * max_latency_sec * headroom)))
+
+
+# ==========================================
+# Dispatcher
+# ==========================================
+
+class ArrivalDispatcher:
+    """
+    프로세스 내 user들이 공유하는 도착 schedule (gevent 단일 스레드 전제, lock 없음).
+    scale: 이 프로세스가 담당할 비율 (distributed 모드에서 1/worker 수)
+    """
+
+    def __init__(self, profile, process="uniform", scale=1.0, late_sec=0.05, max_lag_sec=1.0, seed=None):
+        if process not in PROCESSES:
+            raise ValueError(f"process must be one of {PROCESSES}")
+        self.profile = profile
+        self.process = process
+        self.scale = scale
+        self.late_sec = late_sec
+        self.max_lag_sec = max_lag_sec
+        self._rng = random.Random(seed)
+        self.reset()
+
+    def reset(self):
+        self._t0 = None        # schedule 시작 (monotonic)
+        self._next = None      # 다음 slot 예정 시각 (monotonic)
+        self._wall_offset = time.time() - time.monotonic()
+        self.dispatched = 0
+        self.late = 0
+        self.dropped = 0
+        self.lag_sum = 0.0     # 예정 시각보다 늦게 발송된 slot의 지연 합
+        self.max_lag = 0.0
+
+    def start(self):
+        """schedule 시작 (이미 시작했으면 무시 — spawn 완료 이벤트가 여러 번 와도 안전)"""
+        if self._t0 is None:
+            self._t0 = self._next = time.monotonic()
+            self._wall_offset = time.time() - self._t0
+
+    @property
+    def started(self):
+        return self._t0 is not None
+
+    def rate_at(self, mono_ts):
+        return max(0.0, self.profile(mono_ts - self._t0) * self.scale)
+
+    def _advance(self):
+        rate = self.rate_at(self._next)
+        if rate <= 0:
+            self._next += IDLE_POLL_SEC
+            return False
+        gap = self._rng.expovariate(rate) if self.process == "poisson" else 1.0 / rate
+        self._next += gap
+        return True
+
+    def _take(self, now):
+        """다음 slot 배정. max_lag_sec 이상 밀린 slot은 dropped 처리"""
+        while True:
+            slot = self._next
+            if not self._advance():
+                if slot > now:
+                    return None  # rate=0 구간: 아직 보낼 slot 없음
+                continue
+            if now - slot > self.max_lag_sec:
+                self.dropped += 1
+                continue
+            return slot
+
+    def acquire(self):
+        """
+        다음 slot 시각까지 대기 후 intended send time(wall clock epoch) 반환.
+        호출 측은 반환 직후 요청을 보내면 됨.
+        """
+        while not self.started:
+            sleep(IDLE_POLL_SEC)
+        while True:
+            now = time.monotonic()
+            slot = self._take(now)
+            if slot is not None:
+                break
+            sleep(IDLE_POLL_SEC)
+
+        delay = slot - now
+        if delay > 0:
+            sleep(delay)
+        else:
+            lag = -delay
+            self.lag_sum += lag
+            if lag > self.max_lag:
+                self.max_lag = lag
+            if lag > self.late_sec:
+                self.late += 1
+        self.dispatched += 1
+        return slot + self._wall_offset
+
+    # ---- distributed: worker delta → master merge
+    def export_delta(self):
+        delta = {
+            "dispatched": self.dispatched,
+            "late": self.late,
+            "dropped": self.dropped,
+            "lag_sum": self.lag_sum,
+            "max_lag": self.max_lag,
+        }
+        self.dispatched = self.late = self.dropped = 0
+        self.lag_sum = 0.0
+        return delta
+
+    def merge_delta(self, delta):
+        self.dispatched += delta["dispatched"]
+        self.late += delta["late"]
+        self.dropped += delta["dropped"]
+        self.lag_sum += delta["lag_sum"]
+        self.max_lag = max(self.max_lag, delta["max_lag"])
+
+    def summary(self):
+        scheduled = self.dispatched + self.dropped
+        return {
+            "scheduled": scheduled,
+            "dispatched": self.dispatched,
+            "late": self.late,
+            "dropped": self.dropped,
+            "late_pct": (self.late / self.dispatched * 100.0) if self.dispatched else 0.0,
+            "dropped_pct": (self.dropped / scheduled * 100.0) if scheduled else 0.0,
+            "mean_lag_sec": (self.lag_sum / self.dispatched) if self.dispatched else 0.0,
+            "max_lag_sec": self.max_lag,
+        }
@@ -0,0 +1,78 @@
+"""
+boto3 client factory (lazy import + cache)
+
+- (service, region, profile) 단위로 1회만 생성 후 재사용 (client 생성은 service model 로딩 비용이 큼)
+- 동시 poller(watcher, scraper 등)용 botocore Config: connection pool 크기, adaptive retry, timeout
+- region: 인자 > AWS_REGION > AWS_DEFAULT_REGION > ap-northeast-2
+- pytest(conftest)와 Locust 양쪽에서 공용 (이 모듈은 sibling import 없이 독립적으로 유지)
+"""
+import os
+import threading
+
+# ---- Constants
+DEFAULT_REGION = "ap-northeast-2"
+DEFAULT_MAX_POOL_CONNECTIONS = 20   # botocore 기본 10 → 동시 poller 여러 개 고려
+DEFAULT_MAX_ATTEMPTS = 5            # 최초 요청 포함
+DEFAULT_CONNECT_TIMEOUT = 3         # 초
+DEFAULT_READ_TIMEOUT = 10           # 초
+
+_lock = threading.Lock()
+_sessions = {}  # {profile: boto3.session.Session}
+_clients = {}   # {(service, region, profile): client}
+
+
+def default_region():
+    return os.getenv("AWS_REGION") or os.getenv("AWS_DEFAULT_REGION") or DEFAULT_REGION
+
+
+def client_config(max_pool_connections=DEFAULT_MAX_POOL_CONNECTIONS, max_attempts=DEFAULT_MAX_ATTEMPTS,
+                  connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT):
+    """동시 polling용 botocore Config (adaptive: throttling 시 client 측 rate limit 자동 조정)"""
+    from botocore.config import Config
+
+    return Config(
+        max_pool_connections=max_pool_connections,
+        retries={"mode": "adaptive", "total_max_attempts": max_attempts},
+        connect_timeout=connect_timeout,
+        read_timeout=read_timeout,
+    )
+
+
+def _session(profile):
+    # boto3 Session 생성은 thread-safe하지 않으므로 _lock 안에서만 호출
+    s = _sessions.get(profile)
+    if s is None:
+        import boto3
+
+        s = _sessions[profile] = boto3.session.Session(profile_name=profile)
+    return s
+
+
+def get_client(service, region=None, profile=None, on_create=None):
+    """
+    cached boto3 client 반환 (없으면 생성).
+    on_create(client): 최초 생성 시 1회 호출 (예: API 호출 집계 hook 등록)
+    """
+    region = region or default_region()
+    profile = profile or os.getenv("AWS_PROFILE") or None
+    key = (service, region, profile)
+
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _session(profile).client(service, region_name=region, config=client_config())
+            if on_create is not None:
+                on_create(client)
+            _clients[key] = client
+    return client
+
+
+def clear_clients():
+    """cache 비우기 (credential/region 변경 후 재생성 필요 시)"""
+    with _lock:
+        _clients.clear()
+        _sessions.clear()
@@ -0,0 +1,57 @@
+"""
+server id 추출 micro-benchmark (OBSERVE hot path 1건당 비용)
+
+    python tests/performance/bench_server_id.py
+
+- legacy      : response.text 전체 decode + 대소문자 무시 regex
+- header      : X-Instance-Id header 조회
+- body_scan   : header 없음 → body 앞 SERVER_ID_SCAN_BYTES 바이트만 검사
+"""
+import re
+import timeit
+
+# locust(gevent monkey patch)를 requests보다 먼저 import
+from locust_metrics import extract_server_id, DEFAULT_SERVER_ID_SCAN_BYTES
+
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+
+_LEGACY_RE = re.compile(r"(?:Host|Hostname)\s*:\s*(.*?)(?:<|\s|$)", re.IGNORECASE)
+
+BODY_SIZES = (64, 4 * 1024, 64 * 1024)
+NUMBER = 20000
+
+
+def _legacy(response):
+    m = _LEGACY_RE.search(response.text)
+    return m.group(1).strip() if m else None
+
+
+def _make_response(body_size, with_header):
+    head = b"<h1>Instance ID/Hostname: ip-10-0-11-23</h1>"
+    r = Response()
+    r.status_code = 200
+    r._content = head + b"x" * max(0, body_size - len(head))
+    r.encoding = "utf-8"
+    r.headers = CaseInsensitiveDict({"Content-Type": "text/html; charset=utf-8"})
+    if with_header:
+        r.headers["X-Instance-Id"] = "ip-10-0-11-23"
+    return r
+
+
+def main():
+    print(f"scan_bytes={DEFAULT_SERVER_ID_SCAN_BYTES}, calls={NUMBER}")
+    print(f"{'body':>8} | {'legacy':>10} | {'header':>10} | {'body_scan':>10}   (us/call)")
+    for size in BODY_SIZES:
+        plain = _make_response(size, with_header=False)
+        tagged = _make_response(size, with_header=True)
+        assert _legacy(plain) == extract_server_id(plain) == extract_server_id(tagged)
+
+        t_legacy = timeit.timeit(lambda: _legacy(plain), number=NUMBER) / NUMBER * 1e6
+        t_header = timeit.timeit(lambda: extract_server_id(tagged), number=NUMBER) / NUMBER * 1e6
+        t_scan = timeit.timeit(lambda: extract_server_id(plain), number=NUMBER) / NUMBER * 1e6
+        print(f"{size:>8} | {t_legacy:>10.2f} | {t_header:>10.2f} | {t_scan:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+SLA 조기 중단용 순차 검정 (step 도중 p95 위반 확정)
+
+- locust 의존성 없음 (단위 테스트에서 gevent monkey patch 없이 import)
+"""
+import math
+
+
+class SequentialBreachTest:
+    """
+    Step 도중 p95 SLA 위반을 조기에 확정하기 위한 순차 검정 (단측 Wald SPRT, step마다 reset).
+    - "p95 > SLA" 는 "SLA 초과 샘플 비율 > 5%" 와 같으므로 초과 여부(0/1)만 누적
+    - H0: 초과 비율 <= p0 (=0.05), H1: 초과 비율 >= p1
+    - S = 누적 LLR 이 ln(1/alpha) 이상이 되는 순간 breach 확정 (이후 S가 내려가도 유지)
+    - 오탐 확률 <= alpha: H0에서 likelihood ratio는 martingale이므로 (Ville 부등식)
+      step 길이 / 요청 수 / update 간격과 무관하게 성립
+      (S를 0에서 반사시키는 CUSUM은 step 안에서 검정을 반복하는 셈이라 오탐이 alpha의 수십 배)
+    """
+
+    def __init__(self, p0=0.05, p1=0.10, alpha=0.001):
+        self.llr_over = math.log(p1 / p0)
+        self.llr_ok = math.log((1.0 - p1) / (1.0 - p0))
+        self.threshold = math.log(1.0 / alpha)
+        self.reset()
+
+    def reset(self):
+        self.score = 0.0
+        self.n = 0
+        self.over = 0
+        self.breached = False
+
+    def update(self, over, total):
+        """구간 누적치(초과 건수, 전체 건수)로 통계량 갱신. breach 여부 반환."""
+        if total <= 0 or self.breached:
+            return self.breached
+        ok = total - over
+        self.score += over * self.llr_over + ok * self.llr_ok
+        self.n += total
+        self.over += over
+        self.breached = self.score >= self.threshold
+        return self.breached
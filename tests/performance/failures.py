@@ -0,0 +1,199 @@
+"""
+OBSERVE 실패 분류 (수집 시점, 요청당 O(1))
+
+- 분류: http_<status> / timeout / refused / reset / dns / tls / connection / other
+  응답 status(>= 100)가 있으면 status 기준, 없으면 exception chain(__cause__/__context__/args/reason)의 타입으로 판정
+  (requests/urllib3를 import하지 않고 표준 예외 타입 + 클래스 이름으로 판정 → FastHttpUser 예외도 같은 규칙)
+- 집계: class별 합계 / host별 합계 / 시간 bucket별 합계 (error mix over time)
+  bucket은 max_buckets까지만 보관 (오래된 bucket부터 제거, 24h soak에서도 메모리 상한)
+- distributed 모드: worker는 증분만 보내고 master가 merge (모든 counter가 가산적)
+"""
+import socket
+import ssl
+
+# ---- Constants
+DEFAULT_BUCKET_SEC = 10.0
+DEFAULT_MAX_BUCKETS = 8640   # 10s × 8640 = 24h
+EXAMPLE_MAX_CHARS = 160
+_CHAIN_MAX_DEPTH = 8
+
+# 클래스 이름 기준 (requests / urllib3 / http.client / geventhttpclient 예외)
+_NAME_CLASSES = {
+    "ConnectTimeout": "timeout",
+    "ReadTimeout": "timeout",
+    "Timeout": "timeout",
+    "TimeoutError": "timeout",
+    "ConnectTimeoutError": "timeout",
+    "ReadTimeoutError": "timeout",
+    "NameResolutionError": "dns",
+    "RemoteDisconnected": "reset",
+    "IncompleteRead": "reset",
+    "SSLError": "tls",
+}
+# 메시지 기준 (타입으로 판정하지 못한 경우의 fallback)
+_MESSAGE_CLASSES = (
+    ("Name or service not known", "dns"),
+    ("nodename nor servname", "dns"),
+    ("getaddrinfo failed", "dns"),
+    ("Temporary failure in name resolution", "dns"),
+    ("Connection refused", "refused"),
+    ("Connection reset", "reset"),
+    ("Connection aborted", "reset"),
+    ("timed out", "timeout"),
+)
+
+
+def _classify_exc(e):
+    """예외 1개 → class 또는 None (판정 불가)"""
+    if isinstance(e, socket.gaierror):
+        return "dns"
+    if isinstance(e, ConnectionRefusedError):
+        return "refused"
+    if isinstance(e, (ConnectionResetError, ConnectionAbortedError, BrokenPipeError)):
+        return "reset"
+    if isinstance(e, (socket.timeout, TimeoutError)):
+        return "timeout"
+    if isinstance(e, ssl.SSLError):
+        return "tls"
+    return _NAME_CLASSES.get(type(e).__name__)
+
+
+def _iter_chain(exc):
+    """exception → 원인 예외들 (깊이 제한, 순환 방지)"""
+    seen = set()
+    stack = [exc]
+    while stack and len(seen) < _CHAIN_MAX_DEPTH:
+        e = stack.pop(0)
+        if e is None or id(e) in seen:
+            continue
+        seen.add(id(e))
+        yield e
+        stack.append(getattr(e, "reason", None))   # urllib3 MaxRetryError
+        stack.append(e.__cause__)
+        stack.append(e.__context__)
+        stack.extend(a for a in getattr(e, "args", ()) if isinstance(a, BaseException))
+
+
+def classify_failure(exception, response):
+    """실패 1건 → class 문자열"""
+    status = getattr(response, "status_code", 0) or 0
+    if status >= 100:
+        return f"http_{status}"
+    if exception is None:
+        return "other"
+
+    # 가장 구체적인(원인에 가까운) 판정 우선: timeout/dns/refused 등이 wrapper(ConnectionError)보다 앞
+    found = None
+    for e in _iter_chain(exception):
+        cls = _classify_exc(e)
+        if cls is not None:
+            found = cls
+            if cls != "timeout":  # ConnectTimeout 안쪽에 refused/dns 원인이 있으면 그쪽을 채택
+                break
+    if found is not None:
+        return found
+
+    msg = str(exception)
+    for needle, cls in _MESSAGE_CLASSES:
+        if needle in msg:
+            return cls
+    if "Connection" in type(exception).__name__:
+        return "connection"
+    return "other"
+
+
+class FailureStats:
+    """class / host / 시간 bucket별 실패 counter (gevent 단일 스레드 전제, lock 없음)"""
+
+    def __init__(self, bucket_sec=DEFAULT_BUCKET_SEC, max_buckets=DEFAULT_MAX_BUCKETS):
+        self.bucket_sec = float(bucket_sec)
+        self.max_buckets = max_buckets
+        self.reset()
+
+    def reset(self):
+        self.totals = {}      # {class: count}
+        self.by_host = {}     # {(host, class): count}
+        self.buckets = {}     # {bucket_idx: {class: count}} (삽입 순서 ≒ 시간순)
+        self.first_seen = {}  # {class: ts}
+        self.last_seen = {}   # {class: ts}
+        self.examples = {}    # {class: 첫 실패 메시지}
+        self._sent_examples = set()  # worker: 이미 master로 보낸 예시 class
+        self.dropped_buckets = 0
+
+    def record(self, now, cls, host, exception=None):
+        self.totals[cls] = self.totals.get(cls, 0) + 1
+        key = (host, cls)
+        self.by_host[key] = self.by_host.get(key, 0) + 1
+        idx = int(now // self.bucket_sec)
+        b = self.buckets.get(idx)
+        if b is None:
+            b = self._new_bucket(idx)
+        b[cls] = b.get(cls, 0) + 1
+        if cls not in self.first_seen or now < self.first_seen[cls]:
+            self.first_seen[cls] = now
+        if cls not in self.last_seen or now > self.last_seen[cls]:
+            self.last_seen[cls] = now
+        if exception is not None and cls not in self.examples:
+            self.examples[cls] = str(exception)[:EXAMPLE_MAX_CHARS]
+
+    def _new_bucket(self, idx):
+        b = self.buckets[idx] = {}
+        while len(self.buckets) > self.max_buckets:
+            del self.buckets[min(self.buckets)]
+            self.dropped_buckets += 1
+        return b
+
+    @property
+    def total(self):
+        return sum(self.totals.values())
+
+    # ---- distributed: worker delta → master merge
+    def export_delta(self):
+        examples = {cls: msg for cls, msg in self.examples.items() if cls not in self._sent_examples}
+        delta = {
+            "totals": self.totals,
+            "by_host": [[h, c, n] for (h, c), n in self.by_host.items()],
+            "buckets": [[idx, b] for idx, b in self.buckets.items()],
+            "first": self.first_seen,
+            "last": self.last_seen,
+            "examples": examples,
+        }
+        # 예시는 class당 1회만 전송 (나머지 counter는 증분이므로 비움)
+        kept, sent = self.examples, self._sent_examples | set(examples)
+        self.reset()
+        self.examples, self._sent_examples = kept, sent
+        return delta
+
+    def merge_delta(self, delta):
+        for cls, n in delta["totals"].items():
+            self.totals[cls] = self.totals.get(cls, 0) + n
+        for host, cls, n in delta["by_host"]:
+            self.by_host[(host, cls)] = self.by_host.get((host, cls), 0) + n
+        for idx, counts in delta["buckets"]:
+            b = self.buckets.get(idx)
+            if b is None:
+                b = self._new_bucket(idx)
+            for cls, n in counts.items():
+                b[cls] = b.get(cls, 0) + n
+        for cls, ts in delta["first"].items():
+            if cls not in self.first_seen or ts < self.first_seen[cls]:
+                self.first_seen[cls] = ts
+        for cls, ts in delta["last"].items():
+            if cls not in self.last_seen or ts > self.last_seen[cls]:
+                self.last_seen[cls] = ts
+        for cls, msg in delta["examples"].items():
+            self.examples.setdefault(cls, msg)
+
+    # ---- query
+    def ranking(self):
+        """[(class, count)] (많은 순)"""
+        return sorted(self.totals.items(), key=lambda x: (-x[1], x[0]))
+
+    def hosts_for(self, cls):
+        """class의 host별 count [(host, count)] (많은 순)"""
+        rows = [(h, n) for (h, c), n in self.by_host.items() if c == cls]
+        return sorted(rows, key=lambda x: (-x[1], x[0]))
+
+    def timeline(self):
+        """[(bucket 시작 ts, {class: count})] (시간순)"""
+        return [(idx * self.bucket_sec, self.buckets[idx]) for idx in sorted(self.buckets)]
@@ -0,0 +1,143 @@
+"""
+Host(server id)별 OBSERVE latency / 실패 집계
+
+- host마다 LatencyHistogram + 실패 수 + first/last seen (기록 O(1), 메모리는 host 수에 비례)
+- 실패 응답도 header/body에 server id가 있으면 그 host로 집계 (target이 만든 5xx)
+  ALB가 만든 502/503, connection error처럼 host를 알 수 없는 실패는 UNKNOWN_HOST로 집계
+- outlier 판정은 fleet median 기준 (자기 자신을 제외한 나머지 host의 median → host 2대여도 비교 가능)
+"""
+from latency_histogram import LatencyHistogram
+
+# ---- Constants
+UNKNOWN_HOST = "(unknown)"
+MIN_SAMPLES = 20            # 이보다 요청이 적은 host는 판정 제외
+SLOW_RATIO = 2.0            # p95 >= fleet median p95 × 2 → SLOW
+SLOW_MIN_DIFF_MS = 20.0     # 절대 차이가 작으면(수 ms 수준) 비율이 커도 무시
+ERROR_RATIO = 3.0           # 실패율 >= fleet median × 3 이고
+ERROR_MIN_DIFF_PCT = 1.0    # fleet median + 1%p 이상 → ERRORS
+
+
+class HostStat:
+    __slots__ = ("hist", "failures", "first_seen", "last_seen")
+
+    def __init__(self):
+        self.hist = LatencyHistogram()
+        self.failures = 0
+        self.first_seen = None
+        self.last_seen = None
+
+    def touch(self, now):
+        if self.first_seen is None or now < self.first_seen:
+            self.first_seen = now
+        if self.last_seen is None or now > self.last_seen:
+            self.last_seen = now
+
+    @property
+    def requests(self):
+        return self.hist.count + self.failures
+
+
+def _median(values):
+    values = sorted(values)
+    n = len(values)
+    if n == 0:
+        return None
+    mid = n // 2
+    return values[mid] if n % 2 else (values[mid - 1] + values[mid]) / 2.0
+
+
+class HostStatsTable:
+    """host → HostStat (worker delta 병합 가능)"""
+
+    def __init__(self):
+        self.hosts = {}
+        self._dirty = set()  # 직전 export 이후 변경된 host (worker 전용)
+
+    def reset(self):
+        self.hosts = {}
+        self._dirty = set()
+
+    def _get(self, host):
+        s = self.hosts.get(host)
+        if s is None:
+            s = self.hosts[host] = HostStat()
+        return s
+
+    def record_success(self, host, response_time_ms, now):
+        host = host or UNKNOWN_HOST
+        s = self._get(host)
+        s.hist.record(response_time_ms)
+        s.touch(now)
+        self._dirty.add(host)
+
+    def record_failure(self, host, now):
+        host = host or UNKNOWN_HOST
+        s = self._get(host)
+        s.failures += 1
+        s.touch(now)
+        self._dirty.add(host)
+
+    # ---- distributed: worker delta → master merge
+    def export_delta(self):
+        delta = {}
+        for host in self._dirty:
+            s = self.hosts.pop(host)
+            delta[host] = {
+                "hist": s.hist.to_dict() if s.hist.count else None,
+                "fail": s.failures,
+                "first": s.first_seen,
+                "last": s.last_seen,
+            }
+        self._dirty = set()
+        return delta
+
+    def merge_delta(self, delta):
+        for host, d in delta.items():
+            s = self._get(host)
+            if d["hist"]:
+                s.hist.merge(LatencyHistogram.from_dict(d["hist"]))
+            s.failures += d["fail"]
+            s.touch(d["first"])
+            s.touch(d["last"])
+
+    # ---- ranking
+    def ranking(self):
+        """
+        host별 요약 목록 (p95 내림차순, 같으면 실패율).
+        flags: SLOW / ERRORS (fleet median 대비), FEW (표본 부족으로 판정 제외)
+        """
+        rows = []
+        for host, s in self.hosts.items():
+            p50, p95, p99 = s.hist.percentiles([0.50, 0.95, 0.99])
+            rows.append({
+                "host": host,
+                "requests": s.requests,
+                "failures": s.failures,
+                "error_pct": s.failures / s.requests * 100.0 if s.requests else 0.0,
+                "p50_ms": p50,
+                "p95_ms": p95,
+                "p99_ms": p99,
+                "first_seen": s.first_seen,
+                "last_seen": s.last_seen,
+                "flags": [],
+            })
+
+        judged = [r for r in rows if r["host"] != UNKNOWN_HOST and r["requests"] >= MIN_SAMPLES]
+        for r in rows:
+            if r["host"] == UNKNOWN_HOST:
+                continue
+            if r["requests"] < MIN_SAMPLES:
+                r["flags"].append("FEW")
+                continue
+            others = [o for o in judged if o is not r]
+            p95_med = _median([o["p95_ms"] for o in others if o["p95_ms"] is not None])
+            err_med = _median([o["error_pct"] for o in others])
+            if p95_med is not None and r["p95_ms"] is not None:
+                if r["p95_ms"] >= p95_med * SLOW_RATIO and r["p95_ms"] - p95_med >= SLOW_MIN_DIFF_MS:
+                    r["flags"].append("SLOW")
+            if err_med is not None:
+                if r["error_pct"] >= err_med * ERROR_RATIO and r["error_pct"] - err_med >= ERROR_MIN_DIFF_PCT:
+                    r["flags"].append("ERRORS")
+
+        rows.sort(key=lambda r: (r["p95_ms"] if r["p95_ms"] is not None else -1.0, r["error_pct"]), reverse=True)
+        return rows
@@ -0,0 +1,277 @@
+"""
+HDR 방식(log-bucket) latency histogram
+
+- 기록: O(1) (정수 연산만 사용, 정렬/리스트 누적 없음)
+- 메모리: 샘플 수와 무관하게 고정 (bucket 개수만큼)
+- 조회: bucket 개수에 비례 (샘플 수와 무관) → step 경계에서 gevent loop를 막지 않음
+- merge 가능: step window → 전체 run, worker → master 집계에 사용
+"""
+import math
+
+# ---- Constants
+UNIT_PER_MS = 1000          # 내부 단위: us (ms * 1000)
+DEFAULT_SUB_BUCKET_BITS = 8  # 상대 오차 < 1/2^(bits-1) (=0.8%)
+DEFAULT_MAX_MS = 3_600_000   # 1h 이상은 clamp
+MAX_BACKFILL_RECORDS = 256   # 보정 샘플이 이보다 많으면 구간을 묶어 가중치(n)로 기록
+
+
+class LatencyHistogram:
+    """ms 단위 latency를 log-bucket으로 집계하는 고정 메모리 histogram."""
+
+    __slots__ = (
+        "_bits", "_sub_count", "_half", "_max_value",
+        "counts", "count", "sum_ms", "min_ms", "max_ms",
+        "_lo_idx", "_hi_idx",
+    )
+
+    def __init__(self, max_ms=DEFAULT_MAX_MS, sub_bucket_bits=DEFAULT_SUB_BUCKET_BITS):
+        self._bits = int(sub_bucket_bits)
+        self._sub_count = 1 << self._bits
+        self._half = self._sub_count >> 1
+        self._max_value = int(max_ms * UNIT_PER_MS)
+        self.counts = [0] * (self._index_of(self._max_value) + 1)
+        self.reset()
+
+    # ---- bucket index <-> value
+    def _index_of(self, v):
+        if v < self._sub_count:
+            return v
+        shift = v.bit_length() - self._bits
+        return self._sub_count + (shift - 1) * self._half + ((v >> shift) - self._half)
+
+    def _bucket_range(self, idx):
+        """bucket idx가 표현하는 [lo, hi] (내부 단위)"""
+        if idx < self._sub_count:
+            return idx, idx
+        k = idx - self._sub_count
+        shift = k // self._half + 1
+        lo = ((k % self._half) + self._half) << shift
+        return lo, lo + (1 << shift) - 1
+
+    # ---- record / merge
+    def reset(self):
+        counts = self.counts
+        for i in range(getattr(self, "_lo_idx", 0), getattr(self, "_hi_idx", len(counts) - 1) + 1):
+            counts[i] = 0
+        self.count = 0
+        self.sum_ms = 0.0
+        self.min_ms = None
+        self.max_ms = None
+        self._lo_idx = len(self.counts)
+        self._hi_idx = -1
+
+    def record(self, value_ms, n=1):
+        """latency(ms) 1건(또는 n건) 기록."""
+        v = int(value_ms * UNIT_PER_MS)
+        if v < 0:
+            v = 0
+        elif v > self._max_value:
+            v = self._max_value
+        idx = self._index_of(v)
+        self.counts[idx] += n
+        if idx < self._lo_idx:
+            self._lo_idx = idx
+        if idx > self._hi_idx:
+            self._hi_idx = idx
+
+        self.count += n
+        self.sum_ms += value_ms * n
+        if self.min_ms is None or value_ms < self.min_ms:
+            self.min_ms = value_ms
+        if self.max_ms is None or value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def record_corrected(self, value_ms, expected_interval_ms):
+        """
+        coordinated omission 보정 기록 (HdrHistogram recordValueWithExpectedInterval과 동일).
+        응답이 expected_interval_ms보다 오래 걸렸다면, 그동안 보내지 못한 요청들이
+        value - interval, value - 2*interval, ... (>= interval) 만큼 기다렸을 것으로 보고 함께 기록.
+        """
+        self.record(value_ms)
+        if expected_interval_ms <= 0 or value_ms <= expected_interval_ms:
+            return
+        missing = int((value_ms - expected_interval_ms) // expected_interval_ms)
+        if missing <= MAX_BACKFILL_RECORDS:
+            v = value_ms - expected_interval_ms
+            while v >= expected_interval_ms:
+                self.record(v)
+                v -= expected_interval_ms
+            return
+        # 등간격 값들을 MAX_BACKFILL_RECORDS개 구간으로 묶어 구간 중앙값 × 개수로 기록
+        per = missing / MAX_BACKFILL_RECORDS
+        done = 0
+        for i in range(MAX_BACKFILL_RECORDS):
+            n = int(round((i + 1) * per)) - done
+            if n <= 0:
+                continue
+            mid = value_ms - expected_interval_ms * (done + 1 + (n - 1) / 2.0)
+            self.record(mid, n)
+            done += n
+
+    def _check_compatible(self, other):
+        if other._bits != self._bits or len(other.counts) != len(self.counts):
+            raise ValueError("histogram layout mismatch (sub_bucket_bits/max_ms)")
+
+    def merge(self, other):
+        """다른 histogram의 값을 누적 (동일 layout만 허용)."""
+        if other is None or other.count == 0:
+            return self
+        self._check_compatible(other)
+        counts = self.counts
+        src = other.counts
+        for i in range(other._lo_idx, other._hi_idx + 1):
+            c = src[i]
+            if c:
+                counts[i] += c
+        self._lo_idx = min(self._lo_idx, other._lo_idx)
+        self._hi_idx = max(self._hi_idx, other._hi_idx)
+
+        self.count += other.count
+        self.sum_ms += other.sum_ms
+        if self.min_ms is None or other.min_ms < self.min_ms:
+            self.min_ms = other.min_ms
+        if self.max_ms is None or other.max_ms > self.max_ms:
+            self.max_ms = other.max_ms
+        return self
+
+    def copy(self):
+        h = LatencyHistogram.__new__(LatencyHistogram)
+        h._bits = self._bits
+        h._sub_count = self._sub_count
+        h._half = self._half
+        h._max_value = self._max_value
+        h.counts = list(self.counts)
+        h.count = self.count
+        h.sum_ms = self.sum_ms
+        h.min_ms = self.min_ms
+        h.max_ms = self.max_ms
+        h._lo_idx = self._lo_idx
+        h._hi_idx = self._hi_idx
+        return h
+
+    # ---- query
+    def _value_of(self, idx):
+        """bucket의 대표값(ms): 상한값 기준 (SLA 판정은 보수적으로), 관측 min/max로 clamp."""
+        _, hi = self._bucket_range(idx)
+        v = hi / UNIT_PER_MS
+        if v > self.max_ms:
+            v = self.max_ms
+        if v < self.min_ms:
+            v = self.min_ms
+        return float(v)
+
+    def percentiles(self, qs):
+        """q in [0,1] 목록 → 같은 순서의 ms 값 목록 (bucket 1회 순회)."""
+        if self.count == 0:
+            return [None for _ in qs]
+
+        order = sorted(range(len(qs)), key=lambda i: qs[i])
+        out = [None] * len(qs)
+        # _percentile()과 동일한 ceil-index 규칙 (rank는 1-based)
+        ranks = [max(1, min(self.count, int(math.ceil(qs[i] * self.count)))) for i in order]
+
+        j = 0
+        seen = 0
+        counts = self.counts
+        for idx in range(self._lo_idx, self._hi_idx + 1):
+            c = counts[idx]
+            if not c:
+                continue
+            seen += c
+            while j < len(order) and ranks[j] <= seen:
+                out[order[j]] = self._value_of(idx)
+                j += 1
+            if j == len(order):
+                break
+        return out
+
+    def percentile(self, q):
+        """q in [0,1] → ms (샘플 없으면 None)"""
+        return self.percentiles([q])[0]
+
+    def buckets(self):
+        """비어 있지 않은 bucket 목록 [(idx, 대표값 ms, count)] (오름차순, resampling/외부 집계용)"""
+        counts = self.counts
+        return [
+            (idx, self._value_of(idx), counts[idx])
+            for idx in range(self._lo_idx, self._hi_idx + 1)
+            if counts[idx]
+        ]
+
+    @property
+    def mean_ms(self):
+        return (self.sum_ms / self.count) if self.count else None
+
+    # ---- sparse 직렬화 (worker → master 전송, 파일 저장용: msgpack/JSON 호환)
+    def to_dict(self):
+        counts = self.counts
+        return {
+            "bits": self._bits,
+            "max_ms": self._max_value / UNIT_PER_MS,
+            "buckets": [[i, counts[i]] for i in range(self._lo_idx, self._hi_idx + 1) if counts[i]],
+            "count": self.count,
+            "sum_ms": self.sum_ms,
+            "min_ms": self.min_ms,
+            "max_seen_ms": self.max_ms,
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        h = cls(max_ms=d["max_ms"], sub_bucket_bits=d["bits"])
+        for idx, c in d["buckets"]:
+            h.counts[idx] += c
+            h._lo_idx = min(h._lo_idx, idx)
+            h._hi_idx = max(h._hi_idx, idx)
+        h.count = d["count"]
+        h.sum_ms = d["sum_ms"]
+        h.min_ms = d["min_ms"]
+        h.max_ms = d["max_seen_ms"]
+        return h
+
+
+class SlidingWindowHistogram:
+    """
+    최근 N초 구간 latency (ring of sub-bucket histogram)
+    - slot_sec 단위 slot을 ring으로 돌려쓰며, 오래된 slot은 재사용 시점에 reset
+    - snapshot(window_sec): 최근 window_sec 구간 slot만 merge (window_sec <= max_window_sec)
+    """
+
+    def __init__(self, max_window_sec=60, slot_sec=1.0, **hist_kwargs):
+        self.slot_sec = float(slot_sec)
+        self.n_slots = max(1, int(math.ceil(max_window_sec / self.slot_sec)))
+        self.slots = [LatencyHistogram(**hist_kwargs) for _ in range(self.n_slots)]
+        self.epochs = [None] * self.n_slots  # 각 slot이 담고 있는 절대 slot 번호
+        self._hist_kwargs = hist_kwargs
+
+    def reset(self):
+        for h in self.slots:
+            h.reset()
+        self.epochs = [None] * self.n_slots
+
+    def record(self, value_ms, now):
+        epoch = int(now // self.slot_sec)
+        pos = epoch % self.n_slots
+        if self.epochs[pos] != epoch:
+            self.slots[pos].reset()
+            self.epochs[pos] = epoch
+        self.slots[pos].record(value_ms)
+
+    def merge(self, hist, now):
+        """다른 histogram을 now 시점 slot에 누적 (worker delta 반영용)."""
+        epoch = int(now // self.slot_sec)
+        pos = epoch % self.n_slots
+        if self.epochs[pos] != epoch:
+            self.slots[pos].reset()
+            self.epochs[pos] = epoch
+        self.slots[pos].merge(hist)
+
+    def snapshot(self, window_sec, now):
+        """최근 window_sec 구간을 하나의 histogram으로 merge해서 반환."""
+        cur = int(now // self.slot_sec)
+        k = min(self.n_slots, max(1, int(math.ceil(window_sec / self.slot_sec))))
+        out = LatencyHistogram(**self._hist_kwargs)
+        for pos in range(self.n_slots):
+            epoch = self.epochs[pos]
+            if epoch is not None and cur - k < epoch <= cur:
+                out.merge(self.slots[pos])
+        return out
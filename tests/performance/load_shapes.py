@@ -0,0 +1,222 @@
+"""
+Locust 부하 곡선 라이브러리 (ASG scale_out / scale_in policy, cooldown 검증용)
+
+- 각 shape는 users_at(t) 곡선 + duration + spawn_rate를 가지며,
+  bind(get_run_time) 후 tick()이 LoadTestShape.tick()과 같은 (users, spawn_rate) / None을 반환
+- LoadTestShape를 직접 상속하지 않음 (locustfile에 import 시 shape class가 여러 개로 인식되는 것 방지)
+  → locustfile의 LoadTestShape 하나가 tick()을 위임
+- open model(ARRIVAL_PROFILE=shape)에서는 users_at(t)를 req/s 곡선으로 사용
+
+spec 문자열 (LOAD_SHAPE):
+    ramp                                   # 인자 생략 시 defaults(환경 변수) 사용
+    ramp(peak=200,up=300,hold=600,down=300)
+    soak(users=50,duration=600) > spike(base=50,peak=300,at=60,len=120,duration=600) > sine(...)
+"""
+import abc
+import math
+import re
+
+# ---- Constants
+DEFAULT_SPAWN_RATE = 10.0
+SPIKE_SPAWN_RATE = 100.0   # spike는 급격히 늘어야 의미가 있으므로 빠르게 spawn
+
+_SPEC_RE = re.compile(r"^\s*([a-z_]+)\s*(?:\((.*)\))?\s*$")
+
+
+# ==========================================
+# Shapes
+# ==========================================
+
+class Shape(abc.ABC):
+    """공통: t(초) → 목표 user 수 곡선"""
+    duration = 0.0
+    spawn_rate = DEFAULT_SPAWN_RATE
+
+    _clock = None
+
+    @abc.abstractmethod
+    def users_at(self, t):
+        """t(초) → 목표 user 수 (open model에서는 req/s)"""
+
+    def spawn_rate_at(self, t):
+        return self.spawn_rate
+
+    def bind(self, clock):
+        """clock: () → 경과 초 (LoadTestShape.get_run_time)"""
+        self._clock = clock
+        return self
+
+    def tick(self):
+        t = self._clock()
+        if t > self.duration:  # 기존 StepLoadShape와 같은 경계 (t == duration tick 포함)
+            return None
+        return max(0, int(round(self.users_at(t)))), self.spawn_rate_at(t)
+
+    def __rshift__(self, other):
+        """a >> b : a 다음 b (Sequence)"""
+        return Sequence(self, other)
+
+
+class Step(Shape):
+    """step_sec마다 step_users씩 증가 (기존 StepLoadShape와 동일)"""
+
+    def __init__(self, step_users, step_sec, duration, spawn_rate=DEFAULT_SPAWN_RATE):
+        self.step_users = step_users
+        self.step_sec = step_sec
+        self.duration = duration
+        self.spawn_rate = spawn_rate
+
+    def users_at(self, t):
+        return (int(t // self.step_sec) + 1) * self.step_users
+
+
+class Ramp(Shape):
+    """base → peak 선형 증가(up) → 유지(hold) → base로 선형 감소(down)"""
+
+    def __init__(self, peak, up_sec, hold_sec, down_sec, base=0, spawn_rate=DEFAULT_SPAWN_RATE):
+        self.peak = peak
+        self.base = base
+        self.up_sec = up_sec
+        self.hold_sec = hold_sec
+        self.down_sec = down_sec
+        self.duration = up_sec + hold_sec + down_sec
+        self.spawn_rate = spawn_rate
+
+    def users_at(self, t):
+        if t < self.up_sec:
+            return self.base + (self.peak - self.base) * t / self.up_sec
+        t -= self.up_sec
+        if t < self.hold_sec:
+            return self.peak
+        t -= self.hold_sec
+        return self.peak - (self.peak - self.base) * min(1.0, t / self.down_sec) if self.down_sec else self.base
+
+
+class Spike(Shape):
+    """base 유지 중 at_sec부터 spike_sec 동안 peak (급증/급감, spawn_rate 높게)"""
+
+    def __init__(self, base, peak, at_sec, spike_sec, duration, spawn_rate=SPIKE_SPAWN_RATE):
+        self.base = base
+        self.peak = peak
+        self.at_sec = at_sec
+        self.spike_sec = spike_sec
+        self.duration = duration
+        self.spawn_rate = spawn_rate
+
+    def users_at(self, t):
+        return self.peak if self.at_sec <= t < self.at_sec + self.spike_sec else self.base
+
+
+class Sine(Shape):
+    """
+    일일 트래픽 패턴(diurnal)을 period_sec로 압축한 사인 곡선.
+    phase=0이면 최저점(mean - amplitude)에서 시작
+    """
+
+    def __init__(self, mean, amplitude, period_sec, duration, phase=0.0, spawn_rate=DEFAULT_SPAWN_RATE):
+        self.mean = mean
+        self.amplitude = amplitude
+        self.period_sec = period_sec
+        self.duration = duration
+        self.phase = phase
+        self.spawn_rate = spawn_rate
+
+    def users_at(self, t):
+        angle = 2 * math.pi * (t / self.period_sec + self.phase)
+        return self.mean - self.amplitude * math.cos(angle)
+
+
+class Soak(Shape):
+    """일정 user 수를 장시간 유지 (누수/점진적 성능 저하 확인)"""
+
+    def __init__(self, users, duration, spawn_rate=DEFAULT_SPAWN_RATE):
+        self.users = users
+        self.duration = duration
+        self.spawn_rate = spawn_rate
+
+    def users_at(self, t):
+        return self.users
+
+
+class Sequence(Shape):
+    """여러 shape를 순서대로 이어 붙임 (각 shape의 t는 자기 구간 시작 기준)"""
+
+    def __init__(self, *shapes):
+        flat = []
+        for s in shapes:
+            flat.extend(s.shapes if isinstance(s, Sequence) else [s])
+        self.shapes = flat
+        self.duration = sum(s.duration for s in flat)
+
+    def _locate(self, t):
+        for s in self.shapes:
+            if t < s.duration:
+                return s, t
+            t -= s.duration
+        last = self.shapes[-1]
+        return last, last.duration
+
+    def users_at(self, t):
+        shape, local = self._locate(t)
+        return shape.users_at(local)
+
+    def spawn_rate_at(self, t):
+        shape, local = self._locate(t)
+        return shape.spawn_rate_at(local)
+
+
+# ==========================================
+# spec 문자열 → Shape
+# ==========================================
+
+# name → (class, {spec key: 생성자 인자})
+SHAPES = {
+    "step": (Step, {"users": "step_users", "step": "step_sec", "duration": "duration", "rate": "spawn_rate"}),
+    "ramp": (Ramp, {"peak": "peak", "up": "up_sec", "hold": "hold_sec", "down": "down_sec",
+                    "base": "base", "rate": "spawn_rate"}),
+    "spike": (Spike, {"base": "base", "peak": "peak", "at": "at_sec", "len": "spike_sec",
+                      "duration": "duration", "rate": "spawn_rate"}),
+    "sine": (Sine, {"mean": "mean", "amp": "amplitude", "period": "period_sec", "duration": "duration",
+                    "phase": "phase", "rate": "spawn_rate"}),
+    "soak": (Soak, {"users": "users", "duration": "duration", "rate": "spawn_rate"}),
+}
+
+
+def _parse_args(text):
+    args = {}
+    for part in (text or "").split(","):
+        if not part.strip():
+            continue
+        key, sep, value = part.partition("=")
+        if not sep:
+            raise ValueError(f"shape argument must be key=value: {part!r}")
+        args[key.strip()] = float(value)
+    return args
+
+
+def parse_shape(spec, defaults=None):
+    """
+    'ramp(peak=200,up=300) > soak' → Shape.
+    defaults: {shape name: {spec key: value}} — spec에서 생략한 인자를 채움
+    """
+    defaults = defaults or {}
+    shapes = []
+    for segment in spec.split(">"):
+        m = _SPEC_RE.match(segment)
+        if not m or m.group(1) not in SHAPES:
+            raise ValueError(f"unknown load shape: {segment.strip()!r} (choose from {', '.join(SHAPES)})")
+        name = m.group(1)
+        cls, keys = SHAPES[name]
+        args = dict(defaults.get(name, {}))
+        args.update(_parse_args(m.group(2)))
+        unknown = set(args) - set(keys)
+        if unknown:
+            raise ValueError(f"{name}: unknown argument(s) {sorted(unknown)} (allowed: {sorted(keys)})")
+        shapes.append(cls(**{keys[k]: v for k, v in args.items()}))
+    return shapes[0] if len(shapes) == 1 else Sequence(*shapes)
+
+
+def describe(shape, points=8):
+    """곡선 요약 문자열 (시작 로그용)"""
+    ts = [shape.duration * i / points for i in range(points)] + [max(0.0, shape.duration - 1e-6)]
+    return " → ".join(f"{int(t)}s:{int(round(shape.users_at(t)))}" for t in ts)
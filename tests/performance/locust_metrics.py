@@ -1,38 +1,93 @@
+import sys
 import time
 import math
+import json
 import re
 from collections import defaultdict
 from locust import events
-from locust.runners import STATE_STOPPING, STATE_STOPPED
+from locust.runners import STATE_STOPPING, STATE_STOPPED, MasterRunner, WorkerRunner
+
+from latency_histogram import LatencyHistogram, SlidingWindowHistogram
+from host_stats import HostStatsTable, UNKNOWN_HOST
+from outage import OutageTracker
+from breach import SequentialBreachTest
+from failures import FailureStats, classify_failure
+from prom_exporter import Exposition, MetricsExporter, parse_buckets
+from node_scraper import CPU_SATURATED_PCT, NodeCsvWriter, NodeScraper, discover_targets, parse_static_targets, pearson
+from aws_clients import get_client
+from timeseries import TimeSeriesRecorder, make_series_writer
+from results_store import NodeSeriesWriter, ResultsStore, config_snapshot
 
 # gevent (Locust 내부에서 사용)
 try:
-    from gevent import spawn, sleep
+    from gevent import spawn, sleep, get_hub
 except Exception:
     spawn = None
+    get_hub = None
 
     def sleep(x):  # fallback (locust env면 보통 안 탐)
         time.sleep(x)
 
 _BODY_INSTANCE_PATTERNS = [
     # app.js 응답에서 Host/Hostname 파싱 (예: "Hostname: ip-...")
-    re.compile(r"(?:Host|Hostname)\s*:\s*(.*?)(?:<|\s|$)", re.IGNORECASE),
+    # decode 없이 raw bytes 앞부분만 검사 ('<' 또는 공백 직전까지 = 기존 (.*?)(?:<|\s|$) 와 동일)
+    re.compile(rb"Host(?:name)?\s*:\s*([^<\s]*)", re.IGNORECASE),
 ]
-_HTTP_CODE_RE = re.compile(r"\b([1-5]\d{2})\b")
 
-def extract_server_id_from_body(response):
-    """OBSERVE 응답 body에서 Host/Hostname 문자열로 server id 추출."""
+DEFAULT_SERVER_ID_HEADERS = ("X-Instance-Id", "Server-Id")
+DEFAULT_SERVER_ID_SCAN_BYTES = 512
+
+_SERVER_ID_CACHE = {}  # {raw header/body 값: server id} (인스턴스 수만큼만 쌓임)
+_SERVER_ID_CACHE_MAX = 1024
+
+def _normalize_server_id(raw):
+    """header(str) / body(bytes)에서 뽑은 원문 → server id 문자열 (최근 값 memoize)."""
+    sid = _SERVER_ID_CACHE.get(raw)
+    if sid is not None:
+        return sid
+    text = raw.decode("utf-8", "replace") if isinstance(raw, bytes) else raw
+    sid = sys.intern(text.strip())
+    if not sid:
+        return None
+    if len(_SERVER_ID_CACHE) >= _SERVER_ID_CACHE_MAX:
+        _SERVER_ID_CACHE.clear()
+    _SERVER_ID_CACHE[raw] = sid
+    return sid
+
+def extract_server_id_from_body(response, scan_bytes=DEFAULT_SERVER_ID_SCAN_BYTES):
+    """OBSERVE 응답 body 앞부분(scan_bytes)에서 Host/Hostname 문자열로 server id 추출."""
     if response is None:
         return None
-    text = getattr(response, "text", None)
-    if not text:
+    content = getattr(response, "content", None)
+    if not content:
         return None
+    head = content[:scan_bytes] if scan_bytes else content
     for pat in _BODY_INSTANCE_PATTERNS:
-        m = pat.search(text)
-        if m:
-            return m.group(1).strip()
+        m = pat.search(head)
+        if m is None:
+            continue
+        # 잘린 경계에서 끝난 매치는 id가 중간에 끊겼을 수 있으므로 전체 body로 재검사
+        if m.end(1) >= len(head) and len(content) > len(head):
+            m = pat.search(content)
+        return _normalize_server_id(m.group(1))
     return None
 
+def extract_server_id(response, headers=DEFAULT_SERVER_ID_HEADERS, scan_bytes=DEFAULT_SERVER_ID_SCAN_BYTES):
+    """
+    OBSERVE 응답의 server id 추출 (hot path)
+    - 1) 응답 header (X-Instance-Id / Server-Id)
+    - 2) body 앞 scan_bytes 바이트만 raw bytes로 검사 (response.text decode 없음)
+    """
+    if response is None:
+        return None
+    hdrs = getattr(response, "headers", None)
+    if hdrs:
+        for h in headers:
+            v = hdrs.get(h)
+            if v:
+                return _normalize_server_id(v)
+    return extract_server_id_from_body(response, scan_bytes)
+
 def is_failure(exception, response):
     """request 실패 판정: exception or response None or status>=400."""
     if exception is not None:
@@ -51,6 +106,18 @@ def _percentile(sorted_vals, q):
     i = max(0, min(i, n - 1))
     return float(sorted_vals[i])
 
+def _fmt_ms(v, width=7):
+    return f"{v:{width}.1f}" if v is not None else f"{'-':>{width}}"
+
+def _fmt_rate(bps, width=9):
+    if bps is None:
+        return f"{'-':>{width}}"
+    for unit, scale in (("MB/s", 1e6), ("KB/s", 1e3)):
+        if bps >= scale:
+            return f"{bps / scale:>{width - 4}.1f}{unit}"
+    return f"{bps:>{width - 3}.0f}B/s"
+
+
 def _now_str(ts=None):
     ts = time.time() if ts is None else ts
     return time.strftime("%H:%M:%S", time.localtime(ts))
@@ -65,25 +132,77 @@ class MetricsTracker:
         # Global Metrics & State Tracking
         self.instance_hits = defaultdict(int)
         self.server_first_seen = {}  # {server_id: timestamp}
+        # host별 latency histogram / 실패 수 / first·last seen (느리거나 불안정한 target 식별)
+        self.host_stats = HostStatsTable()
         
         self.first_error_time = None
         self.last_error_time = None
         self.success_count = 0
         self.failure_count = 0
-        self.current_outage_start = None
-        self.outage_periods = []
+        # outage: bucket별 실패 비율로 판정 → 병합된 interval index (24h soak에서도 메모리 상한)
+        self.outages = OutageTracker(
+            bucket_sec=config.OUTAGE_BUCKET_SEC,
+            failure_ratio=config.OUTAGE_FAILURE_RATIO,
+            max_intervals=config.OUTAGE_MAX_INTERVALS,
+        )
+        # 실패 분류 (수집 시점): class(http_<status>/timeout/refused/reset/dns/...) × host × 시간 bucket
+        self.failures = FailureStats(bucket_sec=config.FAILURE_BUCKET_SEC)
         self.test_start_ts = None
         self.locust_env = None
+
+        # Distributed mode (--master/--worker)
+        # - worker: report_to_master 주기마다 delta를 실어 보내고 로컬 누적치는 비움
+        # - master: worker_report로 받은 delta를 merge (step-SLA 판정/Summary는 master에서만)
+        self._shipped_hosts = set()
+
+        # OBSERVE latency (성공 응답만, 전체 run)
+        self.obs_hist = LatencyHistogram()
+        # coordinated omission 보정 latency (intended send time 기준 / 기대 간격 back-fill)
+        self.obs_hist_corrected = LatencyHistogram()
+        
+        # 최근 N초 live percentile (LIVE_WINDOWS_SEC 중 최대 구간까지 보관)
+        self.obs_window = SlidingWindowHistogram(max_window_sec=max(config.LIVE_WINDOWS_SEC))
+        
+        # OBSERVE 시계열 (bucket 단위, bounded ring + 파일 증분 flush)
+        self.timeseries = TimeSeriesRecorder(
+            bucket_sec=config.TIMESERIES_BUCKET_SEC,
+            max_buckets=config.TIMESERIES_MAX_BUCKETS,
+        )
+        self._ts_writers = []  # 파일 writer + results store (공통: write(rows) / close())
+        self._ts_flush_g = None
+
+        # node_exporter scrape (NODE_SCRAPE=1, master/local에서만) → OBSERVE와 같은 시간축의 CPU/load/network
+        self.node_scraper = None
+        self._node_writers = []
+
+        # 결과 저장소 (RESULTS_DB 지정 시 run 단위로 SQLite에 누적)
+        self._results_store = None
+        self._results_run = None
+
+        # open model dispatcher (ARRIVAL_RATE 지정 시 locustfile에서 attach)
+        self.dispatcher = None
+        # trace replay (REPLAY_LOG 지정 시 locustfile에서 attach)
+        self.replayer = None
+
+        # Prometheus /metrics (PROMETHEUS_PORT 지정 시 master/local에서만 기동)
+        self._exporter = None
+        self._prom_buckets_ms = parse_buckets(config.PROMETHEUS_BUCKETS_MS)
         
         # Step-SLA window stats (OBSERVE만)
-        self._step_obs_rts = []
+        self._step_obs_hist = LatencyHistogram()
         self._step_obs_succ = 0
         self._step_obs_fail = 0
+        self._step_obs_over = 0  # SLA_P95_MS 초과 응답 수
+        self._step_fed_succ = 0  # breach test에 이미 반영한 누적치
+        self._step_fed_over = 0
+        self._step_breach = SequentialBreachTest(alpha=config.SLA_EARLY_STOP_ALPHA)
+        self._step_start_ts = None
         self._step_last_idx = 1
         self._step_monitor_g = None
         
         # Step-SLA stop 기록 (Summary 출력용)
         self.step_sla_stopped = False
+        self.step_sla_stop_early = False
         self.step_sla_stop_step = None
         self.step_sla_stop_p95 = None
         self.step_sla_stop_p99 = None
@@ -92,91 +211,196 @@ class MetricsTracker:
         self.step_sla_stop_ts = None
 
         # Event Listeners 등록
+        events.init.add_listener(self._on_init)
         events.test_start.add_listener(self.reset_metrics)
         events.request.add_listener(self.collect_metrics)
+        events.report_to_master.add_listener(self._on_report_to_master)
+        events.worker_report.add_listener(self._on_worker_report)
         events.quitting.add_listener(self.print_summary)
 
-    def _iter_error_rows(self):
-        """Locust stats.errors -> (name, method, error_msg, occurrences)"""
-        if self.locust_env is None:
-            return
-
-        errs = getattr(getattr(self.locust_env, "stats", None), "errors", None)
-        if not errs:
-            return
-
-        for err_key, err_stats in errs.items():
-            name = getattr(err_key, "name", "") or ""
-            method = getattr(err_key, "method", "") or ""
-            err_msg = getattr(err_key, "error", None)
-            if err_msg is None:
-                err_msg = str(err_key)
-
-            occ = getattr(err_stats, "occurrences", None)
-            if occ is None:
-                occ = getattr(err_stats, "occurences", 0)
+    def _on_init(self, environment, **kwargs):
+        self.locust_env = environment
+        # worker 누적치는 report마다 비워지므로 병합된 값이 있는 master/local에서만 노출
+        if self.config.PROMETHEUS_PORT and not self._is_worker():
+            self._start_exporter()
 
-            yield name, method, str(err_msg), int(occ)
+    def attach_dispatcher(self, dispatcher):
+        """open model dispatcher의 late/dropped 집계를 worker→master 병합 및 Summary에 포함"""
+        self.dispatcher = dispatcher
 
-    def print_http_code_summary(self, only_name="OBSERVE"):
-        """Summary에서 OBSERVE만 HTTP code별로 짧게 요약."""
-        if self.locust_env is None:
-            return
+    def attach_replayer(self, replayer):
+        """trace replay의 lag / 진행 상황을 worker→master 병합 및 Summary에 포함"""
+        self.replayer = replayer
 
-        counts = defaultdict(int)
-        total = 0
+    def _is_worker(self):
+        return isinstance(getattr(self.locust_env, "runner", None), WorkerRunner)
 
-        for name, method, err_msg, occ in self._iter_error_rows() or []:
-            if name != only_name:
-                continue
-            m = _HTTP_CODE_RE.search(err_msg)
-            if not m:
-                continue
-            code = m.group(1)
-            counts[code] += occ
-            total += occ
+    def _is_master(self):
+        return isinstance(getattr(self.locust_env, "runner", None), MasterRunner)
 
-        if total <= 0:
-            return
+    # ==========================================
+    # Distributed mode: worker delta → master merge
+    # ==========================================
 
-        ordered = sorted(counts.items(), key=lambda x: (-x[1], x[0]))
-        s = ", ".join([f"{code}:{cnt}" for code, cnt in ordered])
-        print(f"\n[HTTP Error Codes] (name={only_name}) {s} (total={total})")
+    def _export_delta(self):
+        """
+        직전 report 이후 누적분을 compact dict로 내보내고 로컬 누적치를 비움 (worker 전용).
+        step 경계는 master 시계 기준이라, report 주기(~3s) 만큼 인접 step으로 섞일 수 있음.
+        """
+        new_hosts = {h: ts for h, ts in self.server_first_seen.items() if h not in self._shipped_hosts}
+        self._shipped_hosts.update(new_hosts)
+
+        delta = {
+            "succ": self.success_count,
+            "fail": self.failure_count,
+            "over": self._step_obs_over,
+            "hist": self.obs_hist.to_dict() if self.obs_hist.count else None,
+            "hist_corr": self.obs_hist_corrected.to_dict() if self.obs_hist_corrected.count else None,
+            "hits": dict(self.instance_hits),
+            "host_stats": self.host_stats.export_delta(),
+            "first_seen": new_hosts,
+            "first_error": self.first_error_time,
+            "last_error": self.last_error_time,
+            "outages": self.outages.export_delta(),
+            "failures": self.failures.export_delta(),
+            "series": self.timeseries.export_delta(),
+            "dispatch": self.dispatcher.export_delta() if self.dispatcher is not None else None,
+            "replay": self.replayer.export_delta() if self.replayer is not None else None,
+        }
 
-    def print_top_failures_only(self, only_name="OBSERVE", top_n=None):
-        """Locust 기본 Error report 대체가 아니라, Summary에서 OBSERVE 실패 이유 Top-N만 짧게 보여주기."""
-        if top_n is None:
-            top_n = self.config.TOP_N_FAILURES
-            
-        if self.locust_env is None:
-            return
+        self.success_count = 0
+        self.failure_count = 0
+        self.first_error_time = None
+        self.last_error_time = None
+        self.instance_hits.clear()
+        self.obs_hist.reset()
+        self.obs_hist_corrected.reset()
+        self._reset_step_window()
+        return delta
 
-        rows = []
-        for name, method, err_msg, occ in self._iter_error_rows() or []:
-            if name != only_name:
-                continue
-            rows.append((occ, method, err_msg))
+    def _on_report_to_master(self, client_id, data, **kwargs):
+        data["metrics_tracker"] = self._export_delta()
 
-        if not rows:
+    def _on_worker_report(self, client_id, data, **kwargs):
+        delta = data.get("metrics_tracker")
+        if not delta:
             return
+        now = time.time()
 
-        rows.sort(key=lambda x: x[0], reverse=True)
-
-        print(f"\n[Top Failure Reasons] (name={only_name})")
-        for occ, method, err_msg in rows[:top_n]:
-            print(f"  {occ:5d} | {method:4} | {err_msg}")
+        self.success_count += delta["succ"]
+        self.failure_count += delta["fail"]
+        self._step_obs_succ += delta["succ"]
+        self._step_obs_fail += delta["fail"]
+        self._step_obs_over += delta["over"]
+
+        if delta["hist"]:
+            h = LatencyHistogram.from_dict(delta["hist"])
+            self.obs_hist.merge(h)
+            self._step_obs_hist.merge(h)
+            self.obs_window.merge(h, now)
+        if delta.get("hist_corr"):
+            self.obs_hist_corrected.merge(LatencyHistogram.from_dict(delta["hist_corr"]))
+
+        for host, cnt in delta["hits"].items():
+            self.instance_hits[host] += cnt
+        if delta.get("host_stats"):
+            self.host_stats.merge_delta(delta["host_stats"])
+        for host, ts in delta["first_seen"].items():
+            if host not in self.server_first_seen or ts < self.server_first_seen[host]:
+                self.server_first_seen[host] = ts
+
+        if delta["first_error"] is not None:
+            if self.first_error_time is None or delta["first_error"] < self.first_error_time:
+                self.first_error_time = delta["first_error"]
+        if delta["last_error"] is not None:
+            if self.last_error_time is None or delta["last_error"] > self.last_error_time:
+                self.last_error_time = delta["last_error"]
+
+        self.timeseries.merge_delta(delta["series"])
+        if delta.get("dispatch") and self.dispatcher is not None:
+            self.dispatcher.merge_delta(delta["dispatch"])
+        if delta.get("replay") and self.replayer is not None:
+            self.replayer.merge_delta(delta["replay"])
+
+        self.outages.merge_delta(delta["outages"], now)
+        self.failures.merge_delta(delta["failures"])
+
+    def live_percentiles(self, window_sec, qs=(0.50, 0.95, 0.99), now=None):
+        """최근 window_sec 구간 OBSERVE latency percentile (ms 목록)"""
+        now = time.time() if now is None else now
+        return self.obs_window.snapshot(window_sec, now).percentiles(list(qs))
+
+    def _print_live(self):
+        parts = []
+        for w in self.config.LIVE_WINDOWS_SEC:
+            p95 = self.live_percentiles(w, (0.95,))[0]
+            parts.append(f"p95({w}s)={p95:.1f}ms" if p95 is not None else f"p95({w}s)=N/A")
+        print(f"[{_now_str()}] [LIVE] step={self._step_last_idx} " + " ".join(parts))
+
+    def _reset_step_window(self):
+        self._step_obs_hist.reset()
+        self._step_obs_succ = 0
+        self._step_obs_fail = 0
+        self._step_obs_over = 0
+        self._step_fed_succ = 0
+        self._step_fed_over = 0
+        self._step_breach.reset()
+
+    def _record_step_sla_stop(self, p95, p99, fail_rate, total, early):
+        self.step_sla_stopped = True
+        self.step_sla_stop_early = early
+        self.step_sla_stop_step = self._step_last_idx
+        self.step_sla_stop_p95 = p95
+        self.step_sla_stop_p99 = p99
+        self.step_sla_stop_fail_rate = fail_rate
+        self.step_sla_stop_obs_total = total
+        self.step_sla_stop_ts = time.time()
+
+    def _check_early_breach(self, runner):
+        """
+        step 도중 순차 검정으로 SLA 위반이 확정되면 즉시 runner.quit().
+        (step 경계까지 남은 시간 동안 포화된 ASG에 부하를 계속 주지 않기 위함)
+        """
+        over = self._step_obs_over - self._step_fed_over
+        succ = self._step_obs_succ - self._step_fed_succ
+        self._step_fed_over = self._step_obs_over
+        self._step_fed_succ = self._step_obs_succ
+        self._step_breach.update(over, succ)
+
+        if not self._step_breach.breached:
+            return False
+        if self._step_obs_hist.count < self.config.SLA_STEP_MIN_SAMPLES:
+            return False
+
+        total = self._step_obs_succ + self._step_obs_fail
+        fail_rate = (self._step_obs_fail / total) * 100.0 if total > 0 else 0.0
+        p95, p99 = self._step_obs_hist.percentiles([0.95, 0.99])
+        self._record_step_sla_stop(p95, p99, fail_rate, total, early=True)
+
+        in_step = time.time() - self._step_start_ts if self._step_start_ts else 0.0
+        over_pct = (self._step_breach.over / self._step_breach.n) * 100.0 if self._step_breach.n else 0.0
+        print(
+            f"\n[SLA STOP] step={self._step_last_idx} breach confirmed mid-step at +{in_step:.1f}s "
+            f"(>{self.config.SLA_P95_MS}ms: {over_pct:.1f}% of {self._step_breach.n}, "
+            f"step_p95={p95:.1f}ms). Stopping..."
+        )
+        runner.quit()
+        return True
 
     def _step_sla_monitor(self):
         """
         Step-up 모드에서만 사용:
         - step 경계마다 직전 step의 OBSERVE p95/p99, fail% 출력
         - p95 > SLA_P95_MS 이면 runner.quit()
+        - (ENABLE_SLA_EARLY_STOP) step 도중에도 순차 검정으로 위반이 확정되면 즉시 runner.quit()
         """
         if self.locust_env is None:
             return
 
         t0 = self.test_start_ts or time.time()
         self._step_last_idx = 1
+        self._step_start_ts = t0
+        last_live = time.time()
 
         while True:
             runner = getattr(self.locust_env, "runner", None)
@@ -198,10 +422,8 @@ class MetricsTracker:
                 fail_rate = (self._step_obs_fail / total) * 100.0 if total > 0 else 0.0
 
                 p95 = p99 = None
-                if len(self._step_obs_rts) >= self.config.SLA_STEP_MIN_SAMPLES:
-                    s = sorted(self._step_obs_rts)
-                    p95 = _percentile(s, 0.95)
-                    p99 = _percentile(s, 0.99)
+                if self._step_obs_hist.count >= self.config.SLA_STEP_MIN_SAMPLES:
+                    p95, p99 = self._step_obs_hist.percentiles([0.95, 0.99])
 
                 if p95 is not None:
                     print(
@@ -209,13 +431,7 @@ class MetricsTracker:
                         f"obs_total={total} fail%={fail_rate:.2f} p95={p95:.1f}ms p99={p99:.1f}ms"
                     )
                     if p95 > self.config.SLA_P95_MS:
-                        self.step_sla_stopped = True
-                        self.step_sla_stop_step = self._step_last_idx
-                        self.step_sla_stop_p95 = p95
-                        self.step_sla_stop_p99 = p99
-                        self.step_sla_stop_fail_rate = fail_rate
-                        self.step_sla_stop_obs_total = total
-                        self.step_sla_stop_ts = time.time()
+                        self._record_step_sla_stop(p95, p99, fail_rate, total, early=False)
 
                         print(f"[SLA STOP] step={self._step_last_idx} P95={p95:.1f}ms > SLA({self.config.SLA_P95_MS}ms). Stopping...")
                         runner.quit()
@@ -227,10 +443,9 @@ class MetricsTracker:
                     )
 
                 # reset window
-                self._step_obs_rts.clear()
-                self._step_obs_succ = 0
-                self._step_obs_fail = 0
+                self._reset_step_window()
                 self._step_last_idx += 1
+                self._step_start_ts = t0 + (self._step_last_idx - 1) * self.config.STEP_TIME
 
             # 다음 step 경계까지 sleep (짧게 쪼개서 stop 반응성 유지)
             next_boundary = t0 + (self._step_last_idx * self.config.STEP_TIME)
@@ -241,6 +456,13 @@ class MetricsTracker:
                 remaining = next_boundary - time.time()
                 if remaining <= 0:
                     break
+
+                if self.config.ENABLE_SLA_EARLY_STOP and self._check_early_breach(runner):
+                    return
+                if time.time() - last_live >= self.config.LIVE_REPORT_SEC:
+                    self._print_live()
+                    last_live = time.time()
+
                 sleep(min(0.5, remaining))
 
     def reset_metrics(self, environment, **kwargs):
@@ -248,22 +470,34 @@ class MetricsTracker:
 
         self.instance_hits.clear()
         self.server_first_seen = {}
+        self.host_stats.reset()
 
         self.first_error_time = None
         self.last_error_time = None
         self.success_count = 0
         self.failure_count = 0
-        self.current_outage_start = None
-        self.outage_periods = []
+        self.outages.reset()
+        self.failures.reset()
+        # worker는 bucket 원본만 master로 보내고 판정하지 않음
+        self.outages.auto_close = not self._is_worker()
+        self.timeseries.reset()
+        if self.dispatcher is not None:
+            self.dispatcher.reset()
+        if self.replayer is not None:
+            self.replayer.reset()
+        self._shipped_hosts = set()
         self.test_start_ts = time.time()
 
-        self._step_obs_rts = []
-        self._step_obs_succ = 0
-        self._step_obs_fail = 0
+        self.obs_hist.reset()
+        self.obs_hist_corrected.reset()
+        self.obs_window.reset()
+        self._reset_step_window()
+        self._step_start_ts = None
         self._step_last_idx = 1
         self._step_monitor_g = None
 
         self.step_sla_stopped = False
+        self.step_sla_stop_early = False
         self.step_sla_stop_step = None
         self.step_sla_stop_p95 = None
         self.step_sla_stop_p99 = None
@@ -271,14 +505,311 @@ class MetricsTracker:
         self.step_sla_stop_obs_total = None
         self.step_sla_stop_ts = None
 
-        # Step-SLA monitor (옵션)
-        if self.config.USE_STEP_SHAPE and self.config.ENABLE_STEP_SLA_STOP:
+        # 시계열 flush (worker는 master로 delta만 보냄)
+        if not self._is_worker():
+            self._start_timeseries()
+
+        # Step-SLA monitor (옵션, worker는 master가 판정하므로 제외)
+        if self.config.USE_STEP_SHAPE and self.config.ENABLE_STEP_SLA_STOP and not self._is_worker():
             if spawn is None:
                 print(f"[{_now_str()}] Step SLA stop requested, but gevent is unavailable (spawn=None).")
             else:
                 self._step_monitor_g = spawn(self._step_sla_monitor)
                 print(f"[{_now_str()}] Step SLA monitor enabled.")
 
+    # ==========================================
+    # 시계열 flush
+    # ==========================================
+
+    def _start_timeseries(self):
+        if self._is_master():
+            # worker report(~3s 주기)가 늦게 도착해도 bucket이 확정되기 전에 merge되도록 여유를 둠
+            self.timeseries.finalize_lag_sec = self.config.TIMESERIES_BUCKET_SEC + self.config.TIMESERIES_MASTER_LAG_SEC
+            self.outages.finalize_lag_sec = self.config.OUTAGE_BUCKET_SEC + self.config.TIMESERIES_MASTER_LAG_SEC
+        else:
+            self.timeseries.finalize_lag_sec = self.config.TIMESERIES_BUCKET_SEC
+            self.outages.finalize_lag_sec = self.config.OUTAGE_BUCKET_SEC
+
+        self._ts_writers = []
+        if self.config.TIMESERIES_PATH:
+            try:
+                writer = make_series_writer(self.config.TIMESERIES_PATH, self.config.TIMESERIES_FORMAT)
+                self._ts_writers.append(writer)
+                print(f"[{_now_str()}] Time series export: {writer.series_path}")
+            except Exception as e:
+                print(f"[{_now_str()}] [WARN] Time series export disabled: {e}")
+
+        self._results_run = None
+        if self.config.RESULTS_DB:
+            try:
+                if self._results_store is None:
+                    self._results_store = ResultsStore(self.config.RESULTS_DB)
+                self._results_run = self._results_store.start_run(
+                    self.config.RUN_SCENARIO,
+                    "locust",
+                    config=config_snapshot(self.config),
+                    target=self.config.ALB_URL,
+                    started_at=self.test_start_ts,
+                )
+                self._ts_writers.append(self._results_run)
+                print(f"[{_now_str()}] Results store: {self._results_run.series_path}")
+            except Exception as e:
+                print(f"[{_now_str()}] [WARN] Results store disabled: {e}")
+
+        self._start_node_scraper()
+
+        if spawn is not None:
+            self._ts_flush_g = spawn(self._timeseries_loop)
+
+    def _timeseries_loop(self):
+        while True:
+            sleep(self.config.TIMESERIES_FLUSH_SEC)
+            self._flush_timeseries()
+
+    def _flush_timeseries(self, final=False):
+        """
+        확정된 bucket을 row로 만들어 파일/결과 저장소에 append.
+        I/O는 gevent threadpool에서 수행 → request callback/greenlet이 막히지 않음.
+        """
+        self.timeseries.close_ready(time.time(), force=final)
+        rows = self.timeseries.take_pending()
+        self._write_rows(self._ts_writers, rows, final)
+        if self.node_scraper is not None:
+            self._write_rows(self._node_writers, self.node_scraper.take_pending(), final)
+
+    def _write_rows(self, writers, rows, final):
+        if not writers or not rows:
+            return
+        for writer in writers:
+            try:
+                if get_hub is not None and not final:
+                    get_hub().threadpool.spawn(writer.write, rows).get()
+                else:
+                    writer.write(rows)
+            except Exception as e:
+                print(f"[{_now_str()}] [WARN] Time series flush failed ({writer.series_path}): {e}")
+
+    def _stop_timeseries(self):
+        if self._ts_flush_g is not None:
+            self._ts_flush_g.kill()
+            self._ts_flush_g = None
+        if self.node_scraper is not None:
+            self.node_scraper.stop()
+        self._flush_timeseries(final=True)
+        for writer in self._ts_writers:
+            writer.close()
+            print(f"[{_now_str()}] Time series saved: {writer.series_path} ({len(self.timeseries.rows)} buckets in memory)")
+        self._ts_writers = []
+        if self.timeseries.late_buckets:
+            print(f"[{_now_str()}] [WARN] {self.timeseries.late_buckets} time series bucket(s) "
+                  f"({self.timeseries.late_requests} requests) arrived after finalize and were dropped "
+                  f"(worker report delay)")
+        for writer in self._node_writers:
+            writer.close()
+            print(f"[{_now_str()}] Node samples saved: {writer.series_path} ({len(self.node_scraper.rows)} rows in memory)")
+        self._node_writers = []
+
+    # ==========================================
+    # node_exporter scrape
+    # ==========================================
+
+    def _node_targets_fn(self):
+        if self.config.NODE_SCRAPE_TARGETS:
+            targets = parse_static_targets(self.config.NODE_SCRAPE_TARGETS, self.config.NODE_EXPORTER_PORT)
+            return lambda: targets
+        asg_name = self.config.NODE_SCRAPE_ASG or None
+        return lambda: discover_targets(get_client("ec2"), asg_name=asg_name, port=self.config.NODE_EXPORTER_PORT)
+
+    def _start_node_scraper(self):
+        if not self.config.NODE_SCRAPE:
+            return
+        if self.node_scraper is None:
+            self.node_scraper = NodeScraper(
+                self._node_targets_fn(),
+                interval=self.config.NODE_SCRAPE_SEC,
+                discovery_sec=self.config.NODE_DISCOVERY_SEC,
+                max_rows=self.config.NODE_SCRAPE_MAX_ROWS,
+            )
+        self.node_scraper.stop()
+        self.node_scraper.reset()
+
+        self._node_writers = []
+        if self.config.TIMESERIES_PATH:
+            self._node_writers.append(NodeCsvWriter(self.config.TIMESERIES_PATH))
+        if self._results_run is not None:
+            self._node_writers.append(NodeSeriesWriter(self._results_run))
+        self.node_scraper.start()
+        src = "static targets" if self.config.NODE_SCRAPE_TARGETS else "EC2 tag PrometheusScrape=true"
+        print(f"[{_now_str()}] node_exporter scrape every {self.config.NODE_SCRAPE_SEC:g}s ({src})")
+
+    def _save_results(self):
+        """run 종료 시 host별 통계 / outage / 주요 지표를 결과 저장소에 기록"""
+        run = self._results_run
+        if run is None:
+            return
+        total = self.success_count + self.failure_count
+        # bucket 경계로 run 시작 이전까지 걸친 구간은 run 시작에서 자름 (summary의 Availability와 같은 기준)
+        outages = self.outages.intervals(self.test_start_ts)
+        durations = [e - s for s, e in outages]
+        p50 = p95 = p99 = p999 = None
+        if self.obs_hist.count > 0:
+            p50, p95, p99, p999 = self.obs_hist.percentiles([0.50, 0.95, 0.99, 0.999])
+        try:
+            run.record_hosts(dict(self.instance_hits), self.server_first_seen)
+            run.record_outages(outages)
+            if self.obs_hist.count > 0:
+                run.record_histogram("obs", self.obs_hist.to_dict())
+            for host, stat in self.host_stats.hosts.items():
+                if stat.hist.count:
+                    run.record_histogram(f"host:{host}", stat.hist.to_dict())
+            host_rows = self.host_stats.ranking()
+            c95 = c99 = c999 = None
+            if self.obs_hist_corrected.count > 0:
+                run.record_histogram("obs_corrected", self.obs_hist_corrected.to_dict())
+                c95, c99, c999 = self.obs_hist_corrected.percentiles([0.95, 0.99, 0.999])
+            run.record_metrics(
+                obs_requests=total,
+                obs_failures=self.failure_count,
+                obs_success_rate_pct=(self.success_count / total * 100) if total else None,
+                obs_p50_ms=p50,
+                obs_p95_ms=p95,
+                obs_p99_ms=p99,
+                obs_p999_ms=p999,
+                obs_p95_corrected_ms=c95,
+                obs_p99_corrected_ms=c99,
+                obs_p999_corrected_ms=c999,
+                outage_count=len(durations),
+                outage_total_sec=sum(durations),
+                outage_max_sec=max(durations) if durations else 0.0,
+                hosts_seen=len(self.server_first_seen),
+                hosts_slow=sum("SLOW" in r["flags"] for r in host_rows),
+                hosts_erroring=sum("ERRORS" in r["flags"] for r in host_rows),
+                sla_stop_step=self.step_sla_stop_step if self.step_sla_stopped else None,
+                **self._dispatch_metrics(),
+                **self._replay_metrics(),
+                **self._node_metrics(),
+                **{f"obs_fail_{cls}": n for cls, n in self.failures.totals.items()},
+            )
+            run.finish(status="sla_stop" if self.step_sla_stopped else "completed")
+        except Exception as e:
+            print(f"[{_now_str()}] [WARN] Results store write failed: {e}")
+        self._results_run = None
+
+    def _dispatch_metrics(self):
+        if self.dispatcher is None:
+            return {}
+        d = self.dispatcher.summary()
+        return {
+            "arrival_scheduled": d["scheduled"],
+            "arrival_late_pct": d["late_pct"],
+            "arrival_dropped_pct": d["dropped_pct"],
+            "arrival_max_lag_sec": d["max_lag_sec"],
+        }
+
+    def _replay_metrics(self):
+        if self.replayer is None:
+            return {}
+        d = self.replayer.summary()
+        return {
+            "replay_requests": d["replayed"],
+            "replay_late_pct": d["late_pct"],
+            "replay_lag_p95_ms": d["lag_p95_ms"],
+            "replay_lag_max_ms": d["lag_max_ms"],
+        }
+
+    # ==========================================
+    # Prometheus /metrics
+    # ==========================================
+
+    def _start_exporter(self):
+        self._exporter = MetricsExporter(self.render_prometheus, self.config.PROMETHEUS_PORT, self.config.PROMETHEUS_ADDR)
+        try:
+            self._exporter.start()
+        except OSError as e:
+            print(f"[{_now_str()}] [WARN] Prometheus exporter disabled: {e}")
+            self._exporter = None
+            return
+        print(f"[{_now_str()}] Prometheus metrics on http://{self.config.PROMETHEUS_ADDR}:{self._exporter.port}/metrics")
+
+    def render_prometheus(self):
+        """
+        scrape 시점의 tracker 상태 → exposition text (scrape greenlet에서 실행, request path 비용 없음)
+        값은 run 시작(test_start)마다 0부터 다시 누적 → counter reset으로 처리됨
+        """
+        now = time.time()
+        bounds = self._prom_buckets_ms
+        out = Exposition()
+
+        out.metric("observe_requests_total", "counter", "OBSERVE requests by result.", [
+            ({"result": "success"}, self.success_count),
+            ({"result": "failure"}, self.failure_count),
+        ])
+        out.histogram("observe_latency_seconds", "OBSERVE latency of successful requests (raw).",
+                      [(None, self.obs_hist)], bounds)
+        if self.config.CO_CORRECTION:
+            out.histogram("observe_latency_corrected_seconds", "OBSERVE latency corrected for coordinated omission.",
+                          [(None, self.obs_hist_corrected)], bounds)
+
+        hosts = sorted(self.host_stats.hosts.items())
+        out.metric("host_requests_total", "counter", "OBSERVE requests per responding host.",
+                   [({"host": h}, st.requests) for h, st in hosts])
+        out.metric("host_failures_total", "counter", "OBSERVE failures per responding host.",
+                   [({"host": h}, st.failures) for h, st in hosts])
+        out.histogram("host_latency_seconds", "OBSERVE latency per responding host.",
+                      [({"host": h}, st.hist) for h, st in hosts], bounds)
+
+        out.metric("observe_failures_total", "counter", "OBSERVE failures by class and host.", [
+            ({"class": cls, "host": host}, n) for (host, cls), n in sorted(self.failures.by_host.items())
+        ])
+        out.gauge("outage_active", "1 while an OBSERVE outage is open (finalized buckets only).",
+                  1 if self.outages.active else 0)
+        out.counter("outages_total", "Closed OBSERVE outages since run start.", self.outages.closed)
+        if self.test_start_ts is not None:
+            out.counter("outage_downtime_seconds_total", "OBSERVE downtime since run start.",
+                        self.outages.downtime(self.test_start_ts, now, now=now))
+            out.gauge("run_start_timestamp_seconds", "Unix time the current run started.", self.test_start_ts)
+            if self.config.USE_STEP_SHAPE:
+                out.gauge("step", "Current step of the step load shape (1-based).",
+                          int((now - self.test_start_ts) // self.config.STEP_TIME) + 1)
+
+        runner = getattr(self.locust_env, "runner", None)
+        if runner is not None:
+            out.gauge("users", "Running Locust users (sum over workers).", runner.user_count)
+
+        if self.dispatcher is not None:
+            d = self.dispatcher.summary()
+            out.metric("arrivals_total", "counter", "Open-model arrivals by outcome.", [
+                ({"outcome": "dispatched"}, d["dispatched"]),
+                ({"outcome": "late"}, d["late"]),
+                ({"outcome": "dropped"}, d["dropped"]),
+            ])
+        if self.replayer is not None:
+            out.counter("replay_requests_total", "Trace replay requests sent.", self.replayer.replayed)
+            out.counter("replay_late_total", "Trace replay requests sent later than REPLAY_LATE_SEC.", self.replayer.late)
+        return out.text()
+
+    def _node_metrics(self):
+        if self.node_scraper is None or not self.node_scraper.rows:
+            return {}
+        cpu = [r["cpu_pct"] for r in self.node_scraper.rows if r["cpu_pct"] is not None]
+        _, corr = self._node_alignment()
+        return {
+            "node_cpu_avg_pct": sum(cpu) / len(cpu) if cpu else None,
+            "node_cpu_max_pct": max(cpu) if cpu else None,
+            "node_p95_cpu_corr": corr,
+        }
+
+    def _save_first_seen(self):
+        """인스턴스별 첫 OBSERVE 응답 시각 → <TIMESERIES_PATH>_first_seen.json (scale-out timeline 분석용)"""
+        if not self.config.TIMESERIES_PATH or not self.server_first_seen:
+            return
+        path = self.config.TIMESERIES_PATH + "_first_seen.json"
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.server_first_seen, f, indent=2, sort_keys=True)
+        except Exception as e:
+            print(f"[{_now_str()}] [WARN] first-seen export failed: {e}")
+
     def collect_metrics(self, request_type, name, response_time, response_length, response, context, exception, **kwargs):
         """
         custom 지표는 OBSERVE만 집계 (=client view).
@@ -297,24 +828,49 @@ class MetricsTracker:
                 self.first_error_time = now
             self.last_error_time = now
 
-            if self.current_outage_start is None:
-                self.current_outage_start = now
+            self.outages.record(now, False)
+            self.timeseries.record(now, None, False)
+            # target이 직접 만든 5xx는 server id가 있음 (ALB 502/503, connection error는 unknown)
+            server_id = None
+            if response is not None:
+                server_id = extract_server_id(response, self.config.SERVER_ID_HEADERS, self.config.SERVER_ID_SCAN_BYTES)
+            self.host_stats.record_failure(server_id, now)
+            self.failures.record(now, classify_failure(exception, response), server_id or UNKNOWN_HOST, exception)
             return
 
         self.success_count += 1
         self._step_obs_succ += 1
-        self._step_obs_rts.append(float(response_time))  # ms
-
-        if self.current_outage_start is not None:
-            self.outage_periods.append(now - self.current_outage_start)
-            self.current_outage_start = None
-
-        server_id = extract_server_id_from_body(response)
+        self.obs_hist.record(response_time)  # ms
+        self._record_corrected(response_time, now, context)
+        self.obs_window.record(response_time, now)
+        self._step_obs_hist.record(response_time)
+        if response_time > self.config.SLA_P95_MS:
+            self._step_obs_over += 1
+
+        self.outages.record(now, True)
+
+        server_id = extract_server_id(response, self.config.SERVER_ID_HEADERS, self.config.SERVER_ID_SCAN_BYTES)
+        self.timeseries.record(now, response_time, True, server_id)
+        self.host_stats.record_success(server_id, response_time, now)
         if server_id:
             self.instance_hits[server_id] += 1
             if server_id not in self.server_first_seen:
                 self.server_first_seen[server_id] = now
 
+    def _record_corrected(self, response_time, now, context):
+        """
+        coordinated omission 보정:
+        - open model: 응답 완료 - intended send time (dispatcher가 밀려 늦게 보낸 시간까지 포함)
+        - closed model: 응답이 기대 요청 간격보다 길면 그 사이 보내지 못한 요청을 back-fill
+        """
+        if not self.config.CO_CORRECTION:
+            return
+        intended = context.get("intended_ts") if context else None
+        if intended is not None:
+            self.obs_hist_corrected.record(max(response_time, (now - intended) * 1000.0))
+        else:
+            self.obs_hist_corrected.record_corrected(response_time, self.config.CO_EXPECTED_INTERVAL_MS)
+
     # ==========================================
     # Summary 출력 영역 (목차 형태로 분리)
     # ==========================================
@@ -325,22 +881,31 @@ class MetricsTracker:
             print("\n[WARN] locust_env is None.")
             return
 
+        if self._is_worker():
+            # worker 누적치는 report_to_master로 master에 전달됨 → Summary는 master에서만 출력
+            print(f"[{_now_str()}] Worker metrics were reported to master; see master summary.")
+            return
+
         self._flush_outage_state()
+        self._stop_timeseries()
+        self._save_first_seen()
+        self._save_results()
 
         # 마치 책의 목차처럼 어떤 항목들이 출력되는지 한눈에 보입니다.
         self._print_config()
         self._print_stop_reason()
         self._print_load_balancing_and_scaling()
+        self._print_host_health()
+        self._print_node_resources()
+        self._print_arrival_dispatch()
+        self._print_trace_replay()
         self._print_reliability_metrics()
         self._print_service_outages()
 
         print("=" * 60 + "\n")
 
     def _flush_outage_state(self):
-        now = time.time()
-        if self.current_outage_start is not None:
-            self.outage_periods.append(now - self.current_outage_start)
-            self.current_outage_start = None
+        self.outages.flush(time.time())
 
     def _print_config(self):
         fault_mode_label = "KILL ALL" if self.config.FAULT_MODE == "all" else "SINGLE"
@@ -350,8 +915,25 @@ class MetricsTracker:
         print("[Configuration]")
         print(f"  Target URL: {self.config.ALB_URL}")
         print(f"  Observe Path: {self.config.OBSERVE_PATH}")
+        if self._is_master():
+            print(f"  Run Mode: distributed (workers={getattr(self.locust_env.runner, 'worker_count', 'N/A')})")
+        if self.config.USE_REPLAY:
+            print(
+                f"  Load Model: trace replay (log={self.config.REPLAY_LOG}, speed={self.config.REPLAY_SPEED}x, "
+                f"methods={','.join(self.config.REPLAY_METHODS)})"
+            )
+        elif self.config.USE_OPEN_MODEL:
+            print(
+                f"  Load Model: open (rate={self.config.ARRIVAL_RATE}/s, profile={self.config.ARRIVAL_PROFILE}, "
+                f"process={self.config.ARRIVAL_PROCESS})"
+            )
+        else:
+            print(f"  Load Model: closed (wait {self.config.OBS_WAIT_MIN}~{self.config.OBS_WAIT_MAX}s)")
         print(f"  Fault Injection: {'Enabled' if self.config.ENABLE_FAULT else 'Disabled'} (Mode: {fault_mode_label})")
         print(f"  Step SLA Stop: {'Enabled' if (self.config.USE_STEP_SHAPE and self.config.ENABLE_STEP_SLA_STOP) else 'Disabled'}")
+        if self.config.USE_STEP_SHAPE and self.config.ENABLE_STEP_SLA_STOP:
+            early = f"Enabled (alpha={self.config.SLA_EARLY_STOP_ALPHA})" if self.config.ENABLE_SLA_EARLY_STOP else "Disabled"
+            print(f"  Mid-step SLA Stop: {early}")
 
     def _print_stop_reason(self):
         print("\n[Stop Reason]")
@@ -364,7 +946,10 @@ class MetricsTracker:
             p95_s = f"{self.step_sla_stop_p95:.1f}ms" if self.step_sla_stop_p95 is not None else "N/A"
             p99_s = f"{self.step_sla_stop_p99:.1f}ms" if self.step_sla_stop_p99 is not None else "N/A"
 
-            print("  Stopped early by STEP-SLA")
+            if self.step_sla_stop_early:
+                print("  Stopped early by STEP-SLA (mid-step, sequential test)")
+            else:
+                print("  Stopped early by STEP-SLA")
             print(f"    - step      : {self.step_sla_stop_step}")
             print(f"    - users~    : {users_s}")
             print(f"    - step_p95  : {p95_s}  (SLA={self.config.SLA_P95_MS}ms)")
@@ -381,7 +966,7 @@ class MetricsTracker:
         total_hits = sum(self.instance_hits.values())
         if total_hits == 0:
             print("  No host data collected via OBSERVE_PATH.")
-            print("  Ensure the server response includes 'Host' or 'Hostname'.")
+            print("  Ensure the server response includes an 'X-Instance-Id' header or 'Host'/'Hostname' in the body.")
         else:
             for server, count in sorted(self.instance_hits.items(), key=lambda x: x[1], reverse=True):
                 ratio = (count / total_hits) * 100
@@ -406,6 +991,110 @@ class MetricsTracker:
                 else:
                     print("  No new hosts detected during the test.")
 
+    def _print_host_health(self):
+        rows = self.host_stats.ranking()
+        if not rows:
+            return
+        print("\n[Host Health] (OBSERVE-based, ranked by P95)")
+        print(f"  {'host':25} | {'reqs':>6} | {'fail%':>6} | {'p50':>7} | {'p95':>7} | {'p99':>7} | {'seen':>15} | flags")
+        for r in rows:
+            seen = "-"
+            if r["first_seen"] is not None and self.test_start_ts is not None:
+                seen = f"{r['first_seen'] - self.test_start_ts:.0f}s~{r['last_seen'] - self.test_start_ts:.0f}s"
+            print(
+                f"  {r['host']:25} | {r['requests']:6} | {r['error_pct']:6.2f} | {_fmt_ms(r['p50_ms'])} | "
+                f"{_fmt_ms(r['p95_ms'])} | {_fmt_ms(r['p99_ms'])} | {seen:>15} | {self._host_flags(r)}"
+            )
+        flagged = [r["host"] for r in rows if "SLOW" in r["flags"] or "ERRORS" in r["flags"]]
+        if flagged:
+            print(f"  [WARN] Outlier hosts vs fleet median: {', '.join(flagged)}")
+        if any(r["host"] == UNKNOWN_HOST for r in rows):
+            print(f"  Note: {UNKNOWN_HOST} = no server id (ALB-generated 5xx, connection errors, missing header).")
+
+    def _node_alignment(self):
+        """(scrape 구간별 OBSERVE + node CPU 결합 목록, p95 vs fleet 최대 CPU 상관계수)"""
+        windows = self.node_scraper.align(self.timeseries.rows)
+        paired = [w for w in windows if w["p95_ms"] is not None]
+        corr = pearson([w["p95_ms"] for w in paired], [w["cpu_max"] for w in paired])
+        return windows, corr
+
+    def _print_node_resources(self):
+        sc = self.node_scraper
+        if sc is None:
+            return
+        print(f"\n[Node Resources] (node_exporter every {sc.interval:g}s, same time axis as OBSERVE series)")
+        rows = sc.host_summary()
+        if not rows:
+            print(f"  No samples (targets={len(sc.targets)}, errors={sc.errors}"
+                  + (f", last: {sc.last_error}" if sc.last_error else "") + ")")
+            return
+        print(f"  {'host':25} | {'samples':>7} | {'cpu avg':>7} | {'cpu max':>7} | {'load1':>6} | {'rx avg':>9} | {'tx avg':>9}")
+        for r in rows:
+            cpu_avg = f"{r['cpu_avg']:6.1f}%" if r["cpu_avg"] is not None else f"{'-':>7}"
+            cpu_max = f"{r['cpu_max']:6.1f}%" if r["cpu_max"] is not None else f"{'-':>7}"
+            load1 = f"{r['load1_max']:6.2f}" if r["load1_max"] is not None else f"{'-':>6}"
+            print(
+                f"  {r['host']:25} | {r['samples']:7} | {cpu_avg} | {cpu_max} | {load1} | "
+                f"{_fmt_rate(r['rx_avg_bps'])} | {_fmt_rate(r['tx_avg_bps'])}"
+            )
+        if sc.errors or sc.discovery_errors:
+            print(f"  Scrape errors: {sc.errors} (discovery {sc.discovery_errors}), last: {sc.last_error}")
+
+        windows, corr = self._node_alignment()
+        paired = [w for w in windows if w["p95_ms"] is not None]
+        if not paired:
+            return
+        corr_txt = f"{corr:+.2f}" if corr is not None else "n/a"
+        print(f"  Latency vs CPU ({len(paired)} windows): corr(P95, max host CPU) = {corr_txt}")
+        top = sorted(paired, key=lambda w: w["p95_ms"], reverse=True)[:self.config.NODE_REPORT_TOP_N]
+        print(f"  Top {len(top)} slowest windows:")
+        for w in top:
+            at = f"+{w['ts'] - self.test_start_ts:.0f}s" if self.test_start_ts else _now_str(w["ts"])
+            print(
+                f"    {at:>7} | p95 {_fmt_ms(w['p95_ms'])}ms | reqs {w['requests']:5} fail {w['failures']:4} | "
+                f"cpu avg {w['cpu_avg']:5.1f}% max {w['cpu_max']:5.1f}% ({w['cpu_max_host']})"
+            )
+        if any(w["cpu_max"] >= CPU_SATURATED_PCT for w in top):
+            print(f"  [WARN] Slowest windows coincide with host CPU >= {CPU_SATURATED_PCT:.0f}% (CPU saturation).")
+
+    @staticmethod
+    def _host_flags(row):
+        if row["host"] == UNKNOWN_HOST:
+            return "-"
+        return ",".join(row["flags"]) or "ok"
+
+    def _print_arrival_dispatch(self):
+        if self.dispatcher is None:
+            return
+        d = self.dispatcher.summary()
+        print("\n[Arrival Dispatch] (open model)")
+        print(f"  Scheduled         : {d['scheduled']}")
+        print(f"  Dispatched        : {d['dispatched']}")
+        print(f"  Late (>{self.dispatcher.late_sec * 1000:.0f}ms)     : {d['late']} ({d['late_pct']:.2f}%)")
+        print(f"  Dropped           : {d['dropped']} ({d['dropped_pct']:.2f}%)")
+        print(f"  Lag mean / max    : {d['mean_lag_sec'] * 1000:.1f}ms / {d['max_lag_sec'] * 1000:.1f}ms")
+        if d["dropped"]:
+            print("  [WARN] Offered load was not sustained: increase ARRIVAL_USERS or ARRIVAL_MAX_LATENCY_SEC.")
+
+    def _print_trace_replay(self):
+        if self.replayer is None:
+            return
+        d = self.replayer.summary()
+        print("\n[Trace Replay] (ALB access log)")
+        print(f"  Replayed          : {d['replayed']} ({'trace finished' if d['finished'] else 'stopped before end of trace'})")
+        if self.replayer.trace_last is not None:
+            clock = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(self.replayer.trace_last))
+            print(f"  Trace position    : {clock} UTC")
+        print(f"  Late (>{self.replayer.late_sec * 1000:.0f}ms)     : {d['late']} ({d['late_pct']:.2f}%)")
+        if d["lag_p50_ms"] is not None:
+            print(f"  Lag p50/p95/p99   : {d['lag_p50_ms']:.1f} / {d['lag_p95_ms']:.1f} / {d['lag_p99_ms']:.1f} ms")
+            print(f"  Lag max           : {d['lag_max_ms']:.1f} ms")
+        print(f"  Skipped / bad     : {d['skipped']} (method filter) / {d['malformed']} (malformed)")
+        if d["out_of_order"]:
+            print(f"  Out of order      : {d['out_of_order']} (beyond REPLAY_REORDER_SEC, sent without extra delay)")
+        if d["late_pct"] > 1.0:
+            print("  [WARN] Client could not keep up with the trace: increase REPLAY_USERS or lower REPLAY_SPEED.")
+
     def _print_reliability_metrics(self):
         stats_total = self.locust_env.stats.total
         try:
@@ -424,7 +1113,28 @@ class MetricsTracker:
         if self.first_error_time and self.last_error_time:
             print(f"    Error Duration    : {self.last_error_time - self.first_error_time:.1f}s")
 
-        if stats_observe and stats_observe.num_requests > 0:
+        if self.obs_hist.count > 0:
+            qs = [0.50, 0.95, 0.99, 0.999]
+            p50, p95, p99, p999 = self.obs_hist.percentiles(qs)
+            if self.obs_hist_corrected.count > 0:
+                # raw(실제 발송~응답) / corrected(보내야 했던 시각~응답) 나란히 출력
+                c50, c95, c99, c999 = self.obs_hist_corrected.percentiles(qs)
+                print(f"    Latency           :      raw /  CO-corrected")
+                print(f"    P50 Latency       : {p50:8.1f} / {c50:8.1f} ms")
+                print(f"    P95 Latency       : {p95:8.1f} / {c95:8.1f} ms")
+                print(f"    P99 Latency       : {p99:8.1f} / {c99:8.1f} ms")
+                print(f"    P99.9 Latency     : {p999:8.1f} / {c999:8.1f} ms")
+                sla_met = "YES" if p95 < self.config.SLA_P95_MS else "NO"
+                sla_met_c = "YES" if c95 < self.config.SLA_P95_MS else "NO"
+                print(f"    SLA Met (<{self.config.SLA_P95_MS}ms): {sla_met} (corrected: {sla_met_c})")
+            else:
+                print(f"    P50 Latency       : {p50:.1f} ms")
+                print(f"    P95 Latency       : {p95:.1f} ms")
+                print(f"    P99 Latency       : {p99:.1f} ms")
+                print(f"    P99.9 Latency     : {p999:.1f} ms")
+                sla_met = "YES" if p95 < self.config.SLA_P95_MS else "NO"
+                print(f"    SLA Met (<{self.config.SLA_P95_MS}ms): {sla_met}")
+        elif stats_observe and stats_observe.num_requests > 0:
             p95 = stats_observe.get_response_time_percentile(0.95)
             p99 = stats_observe.get_response_time_percentile(0.99)
             print(f"    P95 Latency       : {p95:.1f} ms")
@@ -442,15 +1152,63 @@ class MetricsTracker:
         if total > 0:
             print(f"    Success Rate      : {(self.success_count / total) * 100:.2f}%")
 
-        self.print_http_code_summary(only_name="OBSERVE")
-        self.print_top_failures_only(only_name="OBSERVE")
+        self._print_failure_breakdown()
+
+    def _print_failure_breakdown(self):
+        """수집 시점에 분류한 OBSERVE 실패: class별 합계 / 주요 host / 시간 bucket별 구성"""
+        fs = self.failures
+        ranking = fs.ranking()
+        if not ranking:
+            return
+        total = fs.total
+        t0 = self.test_start_ts
+
+        def at(ts):
+            return f"+{max(0.0, ts - t0):.0f}s" if t0 is not None else _now_str(ts)
+
+        print("\n[Failure Breakdown] (OBSERVE, classified at collection time)")
+        print(f"  {'class':12} | {'count':>6} | {'share':>6} | {'first':>6} | {'last':>6} | top hosts")
+        for cls, n in ranking[:self.config.TOP_N_FAILURES]:
+            hosts = ", ".join(f"{h}:{c}" for h, c in fs.hosts_for(cls)[:3])
+            print(
+                f"  {cls:12} | {n:6} | {n / total * 100:5.1f}% | {at(fs.first_seen[cls]):>6} | "
+                f"{at(fs.last_seen[cls]):>6} | {hosts}"
+            )
+        if len(ranking) > self.config.TOP_N_FAILURES:
+            rest = sum(n for _, n in ranking[self.config.TOP_N_FAILURES:])
+            print(f"  ... {len(ranking) - self.config.TOP_N_FAILURES} more classes ({rest} failures)")
+        for cls, _ in ranking[:self.config.TOP_N_FAILURES]:
+            if cls in fs.examples:
+                print(f"    e.g. {cls}: {fs.examples[cls]}")
+
+        timeline = fs.timeline()
+        shown = timeline
+        if len(timeline) > self.config.FAILURE_TIMELINE_ROWS:
+            # 실패가 많은 bucket만 시간순으로
+            top = sorted(timeline, key=lambda x: sum(x[1].values()), reverse=True)[:self.config.FAILURE_TIMELINE_ROWS]
+            shown = sorted(top, key=lambda x: x[0])
+        label = f"top {len(shown)} of {len(timeline)} buckets" if shown is not timeline else f"{len(timeline)} buckets"
+        print(f"  Failure mix over time ({fs.bucket_sec:g}s buckets, {label}):")
+        for ts, counts in shown:
+            mix = " ".join(f"{c}:{n}" for c, n in sorted(counts.items(), key=lambda x: (-x[1], x[0])))
+            print(f"    {at(ts):>7} | {sum(counts.values()):6} | {mix}")
+        if fs.dropped_buckets:
+            print(f"  Note: {fs.dropped_buckets} oldest buckets were dropped (memory bound).")
 
     def _print_service_outages(self):
-        print("\n[Service Outages] (OBSERVE consecutive failures)")
-        if not self.outage_periods:
+        print(
+            f"\n[Service Outages] (OBSERVE failure ratio >= {self.config.OUTAGE_FAILURE_RATIO:.0%} "
+            f"per {self.config.OUTAGE_BUCKET_SEC:g}s bucket)"
+        )
+        # outage는 bucket 경계로 확정되므로 첫 구간이 run 시작 이전부터일 수 있음
+        # → total_time / Top N / Availability 모두 같은 범위 [test_start_ts, end_ts]로 잘라서 집계
+        end_ts = time.time()
+        intervals = self.outages.intervals(self.test_start_ts, end_ts)
+        if not intervals:
             print("  No outage detected.")
         else:
-            raw = list(self.outage_periods)
+            # 겹치거나 맞닿은 구간은 interval index에서 이미 하나로 병합됨 (worker 간 포함)
+            raw = [end - start for start, end in intervals]
             raw_count = len(raw)
             raw_total = sum(raw)
             raw_max = max(raw) if raw else 0.0
@@ -478,5 +1236,17 @@ class MetricsTracker:
                 print(f"    - p50/p95/p99: {p50o:.3f}s / {p95o:.3f}s / {p99o:.3f}s")
 
                 print(f"  Top {len(top)} longest outages:")
-                for i, d in enumerate(top, 1):
-                    print(f"    #{i:02d} {d:.3f}s")
\ No newline at end of file
+                longest = sorted(intervals, key=lambda p: p[1] - p[0], reverse=True)[:len(top)]
+                for i, (start, end) in enumerate(longest, 1):
+                    at = f" (at {start - self.test_start_ts:.1f}s | {_now_str(start)})" if self.test_start_ts else ""
+                    print(f"    #{i:02d} {end - start:.3f}s{at}")
+
+            if self.test_start_ts is not None:
+                down = self.outages.downtime(self.test_start_ts, end_ts)
+                elapsed = max(end_ts - self.test_start_ts, 1e-9)
+                print(f"  Availability      : {(1 - down / elapsed) * 100:.3f}% (downtime {down:.3f}s / {elapsed:.1f}s)")
+            if self.outages.index.coalesced_sec:
+                print(f"  Note: {self.outages.index.coalesced_sec:.3f}s of short gaps were merged into outages "
+                      f"(OUTAGE_MAX_INTERVALS={self.config.OUTAGE_MAX_INTERVALS}).")
+            if self.outages.late_buckets:
+                print(f"  Note: {self.outages.late_buckets} bucket(s) arrived after finalize and were not judged (worker report delay).")
\ No newline at end of file
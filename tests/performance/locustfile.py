@@ -1,5 +1,6 @@
 import os
 import json
+import math
 import time
 from pathlib import Path
 
@@ -7,13 +8,18 @@ from locust import (
     HttpUser,
     task,
     between,
+    events,
     LoadTestShape,
     constant,
 )
+from locust.runners import MasterRunner, WorkerRunner
 from dotenv import load_dotenv
 
 # locust_metrics로 분리된 로직 임포트
 from locust_metrics import MetricsTracker, _now_str
+from arrival import ArrivalDispatcher, constant_rate, peak_rate, step_rate, users_for_rate
+import load_shapes
+from replay import TraceReplayer
 
 # for terminal output when --only-summary enabled
 import builtins, sys
@@ -27,7 +33,7 @@ builtins.print = stderr_print
 
 # gevent (Locust 내부에서 사용)
 try:
-    from gevent import sleep
+    from gevent import sleep, spawn
 except Exception:
     def sleep(x):  # fallback
         time.sleep(x)
@@ -91,22 +97,221 @@ class Config:
     SPAWN_RATE = float(os.getenv("SPAWN_RATE", "10"))
     TIME_LIMIT = int(os.getenv("TIME_LIMIT", "720"))
 
+    # 부하 곡선 (load_shapes spec, 예: "ramp", "soak > spike(at=60,len=120)"). USE_STEP_SHAPE=1이면 기본 "step"
+    LOAD_SHAPE = os.getenv("LOAD_SHAPE", "step" if USE_STEP_SHAPE else "").strip().lower()
+    SHAPE_BASE_USERS = float(os.getenv("SHAPE_BASE_USERS", "10"))
+    SHAPE_PEAK_USERS = float(os.getenv("SHAPE_PEAK_USERS", "100"))
+    SHAPE_RAMP_UP_SEC = float(os.getenv("SHAPE_RAMP_UP_SEC", "300"))
+    SHAPE_HOLD_SEC = float(os.getenv("SHAPE_HOLD_SEC", "600"))
+    SHAPE_RAMP_DOWN_SEC = float(os.getenv("SHAPE_RAMP_DOWN_SEC", "300"))
+    SHAPE_SPIKE_AT_SEC = float(os.getenv("SHAPE_SPIKE_AT_SEC", "120"))
+    SHAPE_SPIKE_SEC = float(os.getenv("SHAPE_SPIKE_SEC", "180"))
+    SHAPE_PERIOD_SEC = float(os.getenv("SHAPE_PERIOD_SEC", "1800"))
+    SHAPE_DURATION_SEC = float(os.getenv("SHAPE_DURATION_SEC", str(TIME_LIMIT)))
+
+    # Trace replay (REPLAY_LOG 지정 시 ALB access log의 요청을 도착 간격 그대로 재현, open model보다 우선)
+    REPLAY_LOG = os.getenv("REPLAY_LOG", "").strip()                 # 파일/디렉토리/glob, 콤마 구분
+    REPLAY_SPEED = float(os.getenv("REPLAY_SPEED", "1.0"))           # 2.0 = 2배 빠르게 (시간 압축)
+    REPLAY_METHODS = tuple(
+        m.strip().upper() for m in os.getenv("REPLAY_METHODS", "GET,HEAD").split(",") if m.strip()
+    )
+    REPLAY_USERS = int(os.getenv("REPLAY_USERS", "50"))              # 동시 in-flight 상한
+    REPLAY_REORDER_SEC = float(os.getenv("REPLAY_REORDER_SEC", "30"))
+    REPLAY_LATE_SEC = float(os.getenv("REPLAY_LATE_SEC", "0.05"))
+    USE_REPLAY = bool(REPLAY_LOG)
+
+    # Open model (ARRIVAL_RATE > 0이면 응답 시간과 무관하게 도착률 기준으로 OBSERVE 발송)
+    ARRIVAL_RATE = float(os.getenv("ARRIVAL_RATE", "0"))            # req/s (step이면 시작 rate)
+    ARRIVAL_PROFILE = os.getenv("ARRIVAL_PROFILE", "constant").lower()  # constant | step | shape(LOAD_SHAPE 곡선을 req/s로)
+    ARRIVAL_STEP_RATE = float(os.getenv("ARRIVAL_STEP_RATE", str(ARRIVAL_RATE)))
+    ARRIVAL_STEP_TIME = int(os.getenv("ARRIVAL_STEP_TIME", str(STEP_TIME)))
+    ARRIVAL_PROCESS = os.getenv("ARRIVAL_PROCESS", "uniform").lower()  # uniform | poisson
+    ARRIVAL_MAX_LATENCY_SEC = float(os.getenv("ARRIVAL_MAX_LATENCY_SEC", "2.0"))  # user 수 산정 기준
+    ARRIVAL_USERS = int(os.getenv("ARRIVAL_USERS", "0"))             # 0이면 자동 산정
+    ARRIVAL_LATE_SEC = float(os.getenv("ARRIVAL_LATE_SEC", "0.05"))
+    ARRIVAL_MAX_LAG_SEC = float(os.getenv("ARRIVAL_MAX_LAG_SEC", "1.0"))
+    USE_OPEN_MODEL = ARRIVAL_RATE > 0 and not USE_REPLAY
+
+    # coordinated omission 보정 (raw / corrected percentile 함께 출력)
+    CO_CORRECTION = os.getenv("CO_CORRECTION", "1") == "1"
+    # closed model 기대 요청 간격(ms): 기본은 평균 대기 시간 (open model은 intended send time을 직접 사용)
+    CO_EXPECTED_INTERVAL_MS = float(
+        os.getenv("CO_EXPECTED_INTERVAL_MS", str((OBS_WAIT_MIN + OBS_WAIT_MAX) / 2 * 1000))
+    )
+
     SLA_P95_MS = float(os.getenv("SLA_P95_MS", "500"))
     ENABLE_STEP_SLA_STOP = os.getenv("ENABLE_STEP_SLA_STOP", "0") == "1"
+    ENABLE_SLA_EARLY_STOP = os.getenv("ENABLE_SLA_EARLY_STOP", "1") == "1"
+    SLA_EARLY_STOP_ALPHA = float(os.getenv("SLA_EARLY_STOP_ALPHA", "0.001"))
+
+    LIVE_WINDOWS_SEC = (10, 30, 60)
+    LIVE_REPORT_SEC = 10
+
+    # server id 추출: header 우선 → body 앞부분만 검사
+    SERVER_ID_HEADERS = tuple(
+        h.strip() for h in os.getenv("SERVER_ID_HEADERS", "X-Instance-Id,Server-Id").split(",") if h.strip()
+    )
+    SERVER_ID_SCAN_BYTES = int(os.getenv("SERVER_ID_SCAN_BYTES", "512"))
+
+    # OBSERVE 시계열 (TIMESERIES_PATH 지정 시 파일로 증분 저장, 확장자는 형식에 따라 자동)
+    TIMESERIES_PATH = os.getenv("TIMESERIES_PATH", "").strip()
+    TIMESERIES_FORMAT = os.getenv("TIMESERIES_FORMAT", "auto").lower()
+    TIMESERIES_BUCKET_SEC = float(os.getenv("TIMESERIES_BUCKET_SEC", "1"))
+    TIMESERIES_FLUSH_SEC = float(os.getenv("TIMESERIES_FLUSH_SEC", "10"))
+    TIMESERIES_MAX_BUCKETS = int(os.getenv("TIMESERIES_MAX_BUCKETS", "3600"))
+    TIMESERIES_MASTER_LAG_SEC = 10.0
+
+    # 결과 저장소 (SQLite, run마다 누적 — 빈 값이면 비활성)
+    RESULTS_DB = os.getenv("RESULTS_DB", str(_TESTS_DIR / "results" / "results.db")).strip()
+    RUN_SCENARIO = os.getenv("RUN_SCENARIO", "locust").strip()
 
     INITIAL_HOST_WINDOW_SEC = 10.0
     KILL_ALL_REQUESTS = int(os.getenv("KILL_ALL_REQUESTS", "16"))
     KILL_ALL_RETRY_ONCE = os.getenv("KILL_ALL_RETRY_ONCE", "1") == "1"
     SLA_STEP_MIN_SAMPLES = 20
     TOP_N_FAILURES = 5
+    FAILURE_BUCKET_SEC = float(os.getenv("FAILURE_BUCKET_SEC", "10"))  # 실패 구성(error mix) 시간 bucket
+    FAILURE_TIMELINE_ROWS = 20
     OUTAGE_TOP_N = 10
     OUTAGE_MIN_SEC = float(os.getenv("OUTAGE_MIN_SEC", "0.10"))
+    # outage 판정: bucket(초) 단위 실패 비율이 기준 이상이면 down (연속 down bucket은 하나의 구간으로 병합)
+    OUTAGE_BUCKET_SEC = float(os.getenv("OUTAGE_BUCKET_SEC", "0.25"))
+    OUTAGE_FAILURE_RATIO = float(os.getenv("OUTAGE_FAILURE_RATIO", "0.5"))
+    OUTAGE_MAX_INTERVALS = int(os.getenv("OUTAGE_MAX_INTERVALS", "10000"))
+
+    # Prometheus /metrics (0이면 비활성, distributed 모드는 master에서만 기동)
+    PROMETHEUS_PORT = int(os.getenv("PROMETHEUS_PORT", "0"))
+    PROMETHEUS_ADDR = os.getenv("PROMETHEUS_ADDR", "0.0.0.0")
+    PROMETHEUS_BUCKETS_MS = os.getenv("PROMETHEUS_BUCKETS_MS", "5,10,25,50,100,250,500,1000,2500,5000,10000")
+
+    # node_exporter scrape (EC2 tag PrometheusScrape=true 자동 탐색, 또는 고정 목록)
+    NODE_SCRAPE_TARGETS = os.getenv("NODE_SCRAPE_TARGETS", "").strip()
+    NODE_SCRAPE = os.getenv("NODE_SCRAPE", "0") == "1" or bool(NODE_SCRAPE_TARGETS)
+    NODE_SCRAPE_SEC = float(os.getenv("NODE_SCRAPE_SEC", "5"))
+    NODE_SCRAPE_ASG = os.getenv("ASG_NAME", "").strip()
+    NODE_EXPORTER_PORT = int(os.getenv("NODE_EXPORTER_PORT", "9100"))
+    NODE_DISCOVERY_SEC = float(os.getenv("NODE_DISCOVERY_SEC", "30"))
+    NODE_SCRAPE_MAX_ROWS = int(os.getenv("NODE_SCRAPE_MAX_ROWS", "20000"))
+    NODE_REPORT_TOP_N = 5
 
 
 # 단 한 줄로 모든 메트릭 추적 활성화
 tracker = MetricsTracker(Config)
 
 
+# ---- Load shape (spec 생략 인자는 SHAPE_* 환경 변수로 채움)
+def shape_defaults(config):
+    base, peak, duration = config.SHAPE_BASE_USERS, config.SHAPE_PEAK_USERS, config.SHAPE_DURATION_SEC
+    return {
+        "step": {"users": config.STEP_USERS, "step": config.STEP_TIME, "duration": config.TIME_LIMIT,
+                 "rate": config.SPAWN_RATE},
+        "ramp": {"peak": peak, "up": config.SHAPE_RAMP_UP_SEC, "hold": config.SHAPE_HOLD_SEC,
+                 "down": config.SHAPE_RAMP_DOWN_SEC, "base": base, "rate": config.SPAWN_RATE},
+        "spike": {"base": base, "peak": peak, "at": config.SHAPE_SPIKE_AT_SEC, "len": config.SHAPE_SPIKE_SEC,
+                  "duration": duration},
+        "sine": {"mean": (base + peak) / 2, "amp": (peak - base) / 2, "period": config.SHAPE_PERIOD_SEC,
+                 "duration": duration, "rate": config.SPAWN_RATE},
+        "soak": {"users": peak, "duration": duration, "rate": config.SPAWN_RATE},
+    }
+
+
+load_shape = load_shapes.parse_shape(Config.LOAD_SHAPE, shape_defaults(Config)) if Config.LOAD_SHAPE else None
+
+
+# ---- Open model (arrival-rate) dispatcher
+def build_arrival_profile(config):
+    if config.ARRIVAL_PROFILE == "step":
+        return step_rate(config.ARRIVAL_RATE, config.ARRIVAL_STEP_RATE, config.ARRIVAL_STEP_TIME)
+    if config.ARRIVAL_PROFILE == "shape" and load_shape is not None:
+        return load_shape.users_at
+    return constant_rate(config.ARRIVAL_RATE)
+
+
+arrival = None
+ARRIVAL_OBSERVE_USERS = 0
+if Config.USE_OPEN_MODEL:
+    _profile = build_arrival_profile(Config)
+    ARRIVAL_OBSERVE_USERS = Config.ARRIVAL_USERS or users_for_rate(
+        peak_rate(_profile, load_shape.duration if Config.ARRIVAL_PROFILE == "shape" and load_shape else Config.TIME_LIMIT),
+        Config.ARRIVAL_MAX_LATENCY_SEC,
+        minimum=10,
+    )
+    arrival = ArrivalDispatcher(
+        _profile,
+        process=Config.ARRIVAL_PROCESS,
+        late_sec=Config.ARRIVAL_LATE_SEC,
+        max_lag_sec=Config.ARRIVAL_MAX_LAG_SEC,
+    )
+    tracker.attach_dispatcher(arrival)
+
+    @events.spawning_complete.add_listener
+    def _start_arrival(user_count, **kwargs):
+        # 이 프로세스의 ObserveUser 비율만큼 rate 분담 (distributed 모드에서 worker별 user 수가 달라도 합계 유지)
+        local = tracker.locust_env.runner.user_classes_count.get("ObserveUser", 0)
+        if local <= 0:
+            return  # master (user 없음)
+        arrival.scale = local / ARRIVAL_OBSERVE_USERS
+        arrival.start()
+        print(
+            f"[{_now_str()}] Open model started: rate={Config.ARRIVAL_RATE}/s ({Config.ARRIVAL_PROFILE}, "
+            f"{Config.ARRIVAL_PROCESS}), local users={local}, share={arrival.scale:.2f}"
+        )
+
+
+# ---- Trace replay
+replayer = None
+if Config.USE_REPLAY:
+    replayer = TraceReplayer(
+        [p.strip() for p in Config.REPLAY_LOG.split(",") if p.strip()],
+        speed=Config.REPLAY_SPEED,
+        methods=Config.REPLAY_METHODS,
+        reorder_sec=Config.REPLAY_REORDER_SEC,
+        late_sec=Config.REPLAY_LATE_SEC,
+    )
+    tracker.attach_replayer(replayer)
+
+    @events.test_start.add_listener
+    def _plan_replay(environment, **kwargs):
+        # distributed master: partition 수 = 연결된 worker 수 (spawn 메시지의 parsed_options로 worker에 전달)
+        runner = environment.runner
+        if not isinstance(runner, MasterRunner):
+            return
+        nodes = runner.clients.ready + runner.clients.spawning + runner.clients.running
+        indexes = sorted(runner.get_worker_index(n.id) for n in nodes)
+        if environment.parsed_options is None or indexes != list(range(len(indexes))):
+            # 재접속한 worker는 새 index를 받으므로 0..n-1이 아니면 빈 partition / 중복 replay가 생김
+            print(f"[{_now_str()}] [ERROR] Trace replay needs worker indexes 0..n-1 (got {indexes}); "
+                  f"restart the workers. Stopping.")
+            spawn(runner.quit)  # test_start 도중이므로 dispatch가 끝난 뒤 종료
+            return
+        replayer.partitions = len(indexes)
+        environment.parsed_options.replay_partitions = len(indexes)
+
+    @events.spawning_complete.add_listener
+    def _start_replay(user_count, **kwargs):
+        runner = tracker.locust_env.runner
+        if runner.user_classes_count.get("ReplayUser", 0) <= 0:
+            return  # master (user 없음)
+        # distributed: master가 배정한 worker_index로 partition 선택 (local 실행은 partition 1개)
+        if isinstance(runner, WorkerRunner):
+            partitions = getattr(tracker.locust_env.parsed_options, "replay_partitions", None)
+            if partitions is None or not 0 <= runner.worker_index < partitions:
+                # replay하지 않고 done에도 포함하지 않음 (master가 이미 종료 처리)
+                print(f"[{_now_str()}] [ERROR] worker_index={runner.worker_index} outside replay partitions "
+                      f"({partitions}): this worker stays idle")
+                return
+            replayer.partition, replayer.partitions = runner.worker_index, partitions
+        else:
+            replayer.partition, replayer.partitions = 0, 1
+        if not replayer.start():
+            print(f"[{_now_str()}] [ERROR] No ALB log files found: {Config.REPLAY_LOG}")
+            return
+        print(
+            f"[{_now_str()}] Trace replay started: {len(replayer.paths)} file(s), speed={replayer.speed}x, "
+            f"partition={replayer.partition + 1}/{replayer.partitions}"
+        )
+
+
 # ---- 2. User Classes
 
 class BaseUser(HttpUser):
@@ -119,12 +324,36 @@ class BaseUser(HttpUser):
 
 class ObserveUser(BaseUser):
     """OBSERVE 트래픽: LB 분산/지연/실패 확인용."""
-    weight = 8
-    wait_time = between(Config.OBS_WAIT_MIN, Config.OBS_WAIT_MAX)
+    weight = 0 if Config.USE_REPLAY else 8
+    # open model: 대기는 dispatcher slot이 결정 (응답이 느려져도 도착률 유지)
+    wait_time = constant(0) if Config.USE_OPEN_MODEL else between(Config.OBS_WAIT_MIN, Config.OBS_WAIT_MAX)
 
     @task(1)
     def observe(self):
-        self.client.get(Config.OBSERVE_PATH, name="OBSERVE")
+        if arrival is None:
+            self.client.get(Config.OBSERVE_PATH, name="OBSERVE")
+            return
+        intended = arrival.acquire()
+        self.client.get(Config.OBSERVE_PATH, name="OBSERVE", context={"intended_ts": intended})
+
+
+class ReplayUser(BaseUser):
+    """REPLAY 트래픽: ALB access log의 요청을 그대로 재현 (client view로 OBSERVE와 같이 집계)."""
+    abstract = not Config.USE_REPLAY
+    weight = 8
+    wait_time = constant(0)  # 대기는 replayer schedule이 결정
+
+    @task(1)
+    def replay(self):
+        item = replayer.acquire()
+        if item is None:
+            self._idle_forever()  # trace 종료 → ReplayShape가 run 종료
+        method, path, intended = item
+        self.client.request(method, path, name="OBSERVE", context={"intended_ts": intended})
+
+    def _idle_forever(self):
+        while True:
+            sleep(60)
 
 
 class ScalingUser(BaseUser):
@@ -233,17 +462,52 @@ class FaultUser(BaseUser):
 
 # ---- 3. Load Shape (Optional)
 
-if Config.USE_STEP_SHAPE:
+if Config.USE_REPLAY:
+
+    class ReplayShape(LoadTestShape):
+        """
+        trace replay: REPLAY_USERS를 미리 spawn해 두고 trace가 끝날 때까지 유지
+        (요청 시각은 replayer가 결정, 모든 partition 종료 또는 TIME_LIMIT에서 stop)
+        """
+        _weights = ReplayUser.weight + ScalingUser.weight
+        users = math.ceil(Config.REPLAY_USERS * _weights / ReplayUser.weight) + (1 if Config.ENABLE_FAULT else 0)
+        spawn_rate = max(Config.SPAWN_RATE, users)
 
-    class StepLoadShape(LoadTestShape):
-        step_time = Config.STEP_TIME
-        step_users = Config.STEP_USERS
-        spawn_rate = Config.SPAWN_RATE
-        time_limit = Config.TIME_LIMIT
+        def tick(self):
+            if self.get_run_time() > Config.TIME_LIMIT or replayer.finished:
+                return None
+            return self.users, self.spawn_rate
+
+elif Config.USE_OPEN_MODEL:
+
+    class ArrivalRateShape(LoadTestShape):
+        """
+        open model: 필요한 user를 미리 spawn해 두고 유지 (요청 rate는 dispatcher가 결정)
+        ObserveUser가 ARRIVAL_OBSERVE_USERS명이 되도록 weight 비율로 전체 user 수 산정
+        """
+        _weights = ObserveUser.weight + ScalingUser.weight
+        users = math.ceil(ARRIVAL_OBSERVE_USERS * _weights / ObserveUser.weight) + (1 if Config.ENABLE_FAULT else 0)
+        spawn_rate = max(Config.SPAWN_RATE, users)  # rate 측정 전에 한꺼번에 준비
+        if Config.ARRIVAL_PROFILE == "shape" and load_shape is not None:
+            time_limit = load_shape.duration
+        else:
+            time_limit = Config.TIME_LIMIT
 
         def tick(self):
-            run_time = self.get_run_time()
-            if run_time > self.time_limit:
+            if self.get_run_time() > self.time_limit:
                 return None
-            current_step = (run_time // self.step_time) + 1
-            return current_step * self.step_users, self.spawn_rate
\ No newline at end of file
+            return self.users, self.spawn_rate
+
+elif load_shape is not None:
+
+    class LibraryLoadShape(LoadTestShape):
+        """LOAD_SHAPE spec으로 만든 load_shapes 곡선에 tick() 위임 (USE_STEP_SHAPE=1 → step)"""
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.shape = load_shape.bind(self.get_run_time)
+            print(f"[{_now_str()}] Load shape '{Config.LOAD_SHAPE}' ({load_shape.duration:.0f}s): "
+                  f"{load_shapes.describe(load_shape)}")
+
+        def tick(self):
+            return self.shape.tick()
\ No newline at end of file
@@ -0,0 +1,326 @@
+"""
+node_exporter scraper (부하 테스트 중 인스턴스별 CPU / load / network를 OBSERVE와 같은 시간축으로 수집)
+
+- 대상: EC2 tag PrometheusScrape=true 인 running 인스턴스 (modules/asg launch template tag)
+  discovery_sec마다 재탐색 → scale-out으로 늘어난 인스턴스도 자동 포함 (고정 목록 지정 시 AWS 불필요)
+- scrape 시각을 interval의 배수(wall clock)에 맞춤 → 모든 host의 sample이 같은 ts를 가지고
+  OBSERVE 시계열 bucket 경계(ts = bucket 시작)와도 일치
+- 대상별 동시 scrape, collect[]로 필요한 collector만 요청
+- 응답은 줄 단위 streaming parse: 필요한 series만 보고, 마지막 필요 family를 지나면 중단 (node_exporter 출력은 이름순)
+- counter(cpu/network)는 직전 scrape 대비 rate → row ts는 rate 구간의 시작 (OBSERVE bucket과 같은 규칙)
+"""
+import csv
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+# ---- Constants
+NODE_EXPORTER_PORT = 9100
+SCRAPE_TAG = "PrometheusScrape"
+COLLECTORS = ("cpu", "loadavg", "netdev")
+NODE_COLUMNS = ("ts", "host", "cpu_pct", "load1", "rx_bps", "tx_bps")
+CPU_SATURATED_PCT = 90.0    # report에서 CPU 포화로 보는 기준
+
+_CPU = "node_cpu_seconds_total{"
+_LOAD1 = "node_load1 "
+_RX = "node_network_receive_bytes_total{"
+_TX = "node_network_transmit_bytes_total{"
+_LAST_FAMILY = "node_network_transmit_bytes_total"
+_WANTED = (_CPU, _LOAD1, _RX, _TX)
+_IGNORED_DEVICES = ('device="lo"',)
+
+
+def parse_node_metrics(lines):
+    """
+    node_exporter text 줄 iterable → {"cpu_idle", "cpu_total", "load1", "rx", "tx"} (누적값, 없는 항목은 None)
+    - cpu: 모든 CPU 합산 (idle + iowait를 idle로 봄, load_controller.NodeExporterCpuReader도 이 함수 사용)
+    - network: lo 제외한 모든 device 합산
+    """
+    out = {"cpu_idle": None, "cpu_total": None, "load1": None, "rx": None, "tx": None}
+    for line in lines:
+        if not line or line[0] == "#":
+            continue
+        if not line.startswith(_WANTED):
+            if line.split("{", 1)[0].split(" ", 1)[0] > _LAST_FAMILY:
+                break
+            continue
+        labels, _, value = line.rpartition(" ")
+        v = float(value)
+        if line.startswith(_CPU):
+            out["cpu_total"] = (out["cpu_total"] or 0.0) + v
+            if 'mode="idle"' in labels or 'mode="iowait"' in labels:
+                out["cpu_idle"] = (out["cpu_idle"] or 0.0) + v
+        elif line.startswith(_LOAD1):
+            out["load1"] = v
+        elif not any(d in labels for d in _IGNORED_DEVICES):
+            key = "rx" if line.startswith(_RX) else "tx"
+            out[key] = (out[key] or 0.0) + v
+    return out
+
+
+def discover_targets(ec2_client, asg_name=None, port=NODE_EXPORTER_PORT):
+    """
+    PrometheusScrape=true tag의 running 인스턴스 → {host label: "private_ip:port"}
+    label은 private DNS 앞부분(ip-10-0-1-23) = 인스턴스 hostname → OBSERVE server id(Hostname)와 같은 이름
+    """
+    filters = [
+        {"Name": f"tag:{SCRAPE_TAG}", "Values": ["true"]},
+        {"Name": "instance-state-name", "Values": ["running"]},
+    ]
+    if asg_name:
+        filters.append({"Name": "tag:aws:autoscaling:groupName", "Values": [asg_name]})
+    targets = {}
+    for page in ec2_client.get_paginator("describe_instances").paginate(Filters=filters):
+        for res in page["Reservations"]:
+            for inst in res["Instances"]:
+                ip = inst.get("PrivateIpAddress")
+                if not ip:
+                    continue
+                label = (inst.get("PrivateDnsName") or "").split(".", 1)[0] or inst["InstanceId"]
+                targets[label] = f"{ip}:{port}"
+    return targets
+
+
+def parse_static_targets(raw, port=NODE_EXPORTER_PORT):
+    """'10.0.1.5, web-a=10.0.1.6:9100' → {label: "host:port"} (label 생략 시 host)"""
+    targets = {}
+    for item in str(raw or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        label, _, addr = item.rpartition("=")
+        if ":" not in addr:
+            addr = f"{addr}:{port}"
+        targets[label or addr.split(":", 1)[0]] = addr
+    return targets
+
+
+class NodeScraper:
+    """
+    interval마다 모든 대상을 동시에 scrape → host별 rate row를 bounded ring에 보관.
+    targets_fn() → {label: "host:port"} (discovery_sec마다 호출)
+    """
+
+    def __init__(self, targets_fn, interval=5.0, discovery_sec=30.0, timeout=2.0,
+                 max_rows=20000, max_workers=16):
+        self.targets_fn = targets_fn
+        self.interval = float(interval)
+        self.discovery_sec = discovery_sec
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.rows = deque(maxlen=max_rows)
+        self._pending = deque(maxlen=max_rows)
+        self._session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=max_workers)
+        self._session.mount("http://", adapter)
+        self._params = [("collect[]", c) for c in COLLECTORS]
+        self._stop = threading.Event()
+        self._thread = None
+        self.reset()
+
+    def reset(self):
+        self.rows.clear()
+        self._pending.clear()
+        self.targets = {}
+        self._prev = {}         # {label: (tick ts, 누적값 dict)}
+        self._last_discovery = None
+        self.scrapes = 0
+        self.errors = 0
+        self.discovery_errors = 0
+        self.last_error = None
+
+    # ---- lifecycle
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="node-scraper", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.timeout + 1)
+            self._thread = None
+
+    def _loop(self):
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="node-scrape") as pool:
+            while not self._stop.is_set():
+                # 다음 interval 경계까지 대기 (모든 host sample의 ts를 경계에 맞춤)
+                tick = (int(time.time() // self.interval) + 1) * self.interval
+                if self._stop.wait(max(0.0, tick - time.time())):
+                    return
+                self.scrape_once(tick, pool)
+
+    # ---- scrape
+    def _refresh_targets(self, now):
+        if self._last_discovery is not None and now - self._last_discovery < self.discovery_sec:
+            return
+        self._last_discovery = now
+        try:
+            self.targets = dict(self.targets_fn())
+        except Exception as e:
+            self.discovery_errors += 1
+            self.last_error = f"discovery: {e}"
+            return
+        for label in set(self._prev) - set(self.targets):
+            del self._prev[label]
+
+    def _fetch(self, addr):
+        with self._session.get(f"http://{addr}/metrics", params=self._params,
+                               timeout=self.timeout, stream=True) as resp:
+            resp.raise_for_status()
+            resp.encoding = resp.encoding or "utf-8"  # charset 없는 응답이면 iter_lines가 bytes를 돌려줌
+            return parse_node_metrics(resp.iter_lines(decode_unicode=True))
+
+    def scrape_once(self, tick, pool):
+        """tick 시각의 scrape 1회 (대상별 동시). 새로 확정된 row 목록 반환"""
+        self._refresh_targets(tick)
+        labels = sorted(self.targets)
+        futures = [pool.submit(self._fetch, self.targets[label]) for label in labels]
+        out = []
+        for label, fut in zip(labels, futures):
+            try:
+                cur = fut.result()
+            except Exception as e:
+                self.errors += 1
+                self.last_error = f"{label}: {e}"
+                continue
+            self.scrapes += 1
+            prev = self._prev.get(label)
+            self._prev[label] = (tick, cur)
+            if prev is None:
+                continue
+            row = self._rate_row(label, prev[0], prev[1], tick, cur)
+            if row is not None:
+                out.append(row)
+        self.rows.extend(out)
+        self._pending.extend(out)
+        return out
+
+    @staticmethod
+    def _rate_row(label, t0, prev, t1, cur):
+        dt = t1 - t0
+        if dt <= 0:
+            return None
+
+        def delta(key):
+            if prev[key] is None or cur[key] is None or cur[key] < prev[key]:
+                return None  # 값 없음 / counter reset (재부팅)
+            return cur[key] - prev[key]
+
+        cpu_pct = None
+        d_total = delta("cpu_total")
+        d_idle = delta("cpu_idle")
+        if d_total and d_idle is not None:
+            cpu_pct = max(0.0, min(100.0, 100.0 * (1 - d_idle / d_total)))
+        d_rx = delta("rx")
+        d_tx = delta("tx")
+        return {
+            "ts": t0,
+            "host": label,
+            "cpu_pct": cpu_pct,
+            "load1": cur["load1"],
+            "rx_bps": d_rx / dt if d_rx is not None else None,
+            "tx_bps": d_tx / dt if d_tx is not None else None,
+        }
+
+    def take_pending(self):
+        rows = list(self._pending)
+        self._pending.clear()
+        return rows
+
+    # ---- report
+    def host_summary(self):
+        """host별 {samples, cpu_avg, cpu_max, load1_max, rx_avg_bps, tx_avg_bps} (cpu_max 내림차순)"""
+        acc = {}
+        for r in self.rows:
+            acc.setdefault(r["host"], []).append(r)
+        out = []
+        for host, rows in acc.items():
+            cpu = [r["cpu_pct"] for r in rows if r["cpu_pct"] is not None]
+            load = [r["load1"] for r in rows if r["load1"] is not None]
+            rx = [r["rx_bps"] for r in rows if r["rx_bps"] is not None]
+            tx = [r["tx_bps"] for r in rows if r["tx_bps"] is not None]
+            out.append({
+                "host": host,
+                "samples": len(rows),
+                "cpu_avg": sum(cpu) / len(cpu) if cpu else None,
+                "cpu_max": max(cpu) if cpu else None,
+                "load1_max": max(load) if load else None,
+                "rx_avg_bps": sum(rx) / len(rx) if rx else None,
+                "tx_avg_bps": sum(tx) / len(tx) if tx else None,
+            })
+        out.sort(key=lambda r: r["cpu_max"] if r["cpu_max"] is not None else -1.0, reverse=True)
+        return out
+
+    def align(self, series_rows):
+        """
+        OBSERVE 시계열 row(ts = bucket 시작) → scrape 구간 [ts, ts + interval) 단위로 묶어 node sample과 결합.
+        [{ts, requests, failures, p95_ms(구간 내 bucket p95 최댓값), cpu_avg, cpu_max, cpu_max_host}] (ts 오름차순)
+        """
+        windows = {}
+        for r in series_rows:
+            w = windows.setdefault(int(r["ts"] // self.interval), {"requests": 0, "failures": 0, "p95_ms": None})
+            w["requests"] += r["requests"]
+            w["failures"] += r["failures"]
+            if r["p95_ms"] is not None and (w["p95_ms"] is None or r["p95_ms"] > w["p95_ms"]):
+                w["p95_ms"] = r["p95_ms"]
+        cpus = {}
+        for r in self.rows:
+            if r["cpu_pct"] is not None:
+                cpus.setdefault(int(r["ts"] // self.interval), []).append((r["cpu_pct"], r["host"]))
+        out = []
+        for idx in sorted(set(windows) & set(cpus)):
+            w = windows[idx]
+            c = cpus[idx]
+            top = max(c)
+            out.append({
+                "ts": idx * self.interval,
+                **w,
+                "cpu_avg": sum(v for v, _ in c) / len(c),
+                "cpu_max": top[0],
+                "cpu_max_host": top[1],
+            })
+        return out
+
+
+def pearson(xs, ys):
+    """표본 상관계수 (n < 3 또는 분산 0이면 None)"""
+    n = len(xs)
+    if n < 3:
+        return None
+    mx = sum(xs) / n
+    my = sum(ys) / n
+    sxy = sum((x - mx) * (y - my) for x, y in zip(xs, ys))
+    sxx = sum((x - mx) ** 2 for x in xs)
+    syy = sum((y - my) ** 2 for y in ys)
+    if sxx <= 0 or syy <= 0:
+        return None
+    return sxy / (sxx * syy) ** 0.5
+
+
+class NodeCsvWriter:
+    """node sample row → <base>_nodes.csv append (series writer와 같은 write(rows)/close() 인터페이스)"""
+
+    def __init__(self, base_path):
+        self.series_path = base_path + "_nodes.csv"
+        self._header = not os.path.exists(self.series_path)
+
+    def write(self, rows):
+        if not rows:
+            return
+        with open(self.series_path, "a", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            if self._header:
+                w.writerow(NODE_COLUMNS)
+                self._header = False
+            for r in rows:
+                w.writerow(["" if r[c] is None else r[c] for c in NODE_COLUMNS])
+
+    def close(self):
+        pass
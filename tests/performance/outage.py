@@ -0,0 +1,189 @@
+"""
+OBSERVE outage 모델 (시간 bucket별 실패 비율 기반)
+
+- 요청 1건의 성공/실패로 outage를 열고 닫지 않고, bucket_sec(기본 0.25s) 단위로 성공/실패 수를 모아
+  실패 비율 >= failure_ratio 인 bucket을 down으로 판정 → 동시 user가 많아도 micro-interval이 쌓이지 않음
+- 요청이 없는 bucket은 직전 상태를 유지 (응답이 모두 timeout 대기 중인 구간도 outage로 이어짐)
+- 확정된 outage는 IntervalIndex(겹치거나 맞닿은 구간 자동 병합)에 저장 → downtime(t1, t2) 조회 O(log n)
+- 메모리: 열린 bucket(finalize lag 구간) + interval 수. interval이 max_intervals를 넘으면
+  가장 짧은 간격의 두 구간을 합침 (합친 간격은 coalesced_sec로 집계, 24시간 soak에서도 상한 유지)
+- distributed 모드: worker는 bucket 원본(성공/실패 수)만 보내고 master가 전체 합계로 판정
+  (finalize 이후 도착한 bucket은 판정하지 않고 late_buckets로만 집계)
+"""
+from bisect import bisect_left, bisect_right
+
+# ---- Constants
+DEFAULT_BUCKET_SEC = 0.25
+DEFAULT_FAILURE_RATIO = 0.5
+DEFAULT_MAX_INTERVALS = 10000
+
+
+class IntervalIndex:
+    """정렬된 서로소 구간 [start, end) 목록 (추가 시 겹치거나 맞닿은 구간 병합)"""
+
+    def __init__(self, max_intervals=DEFAULT_MAX_INTERVALS):
+        self.max_intervals = max_intervals
+        self._starts = []
+        self._ends = []
+        self._cum = None         # 구간 길이 누적합 (조회 시 lazy 계산)
+        self.coalesced_sec = 0.0  # 상한 유지를 위해 outage로 합쳐진 정상 구간 길이
+
+    def __len__(self):
+        return len(self._starts)
+
+    def add(self, start, end):
+        if end <= start:
+            return
+        starts, ends = self._starts, self._ends
+        i = bisect_left(ends, start)    # end >= start 인 첫 구간부터
+        j = bisect_right(starts, end)   # start <= end 인 구간까지 병합 대상
+        if i < j:
+            start = min(start, starts[i])
+            end = max(end, ends[j - 1])
+        starts[i:j] = [start]
+        ends[i:j] = [end]
+        self._cum = None
+        if len(starts) > self.max_intervals:
+            self._coalesce()
+
+    def _coalesce(self):
+        starts, ends = self._starts, self._ends
+        k = min(range(len(starts) - 1), key=lambda i: starts[i + 1] - ends[i])
+        self.coalesced_sec += starts[k + 1] - ends[k]
+        ends[k] = ends[k + 1]
+        del starts[k + 1]
+        del ends[k + 1]
+
+    def intervals(self, t1=None, t2=None):
+        """[(start, end)] (t1/t2를 주면 그 범위로 잘라냄 → 합계가 downtime(t1, t2)와 일치)"""
+        out = list(zip(self._starts, self._ends))
+        if t1 is None and t2 is None:
+            return out
+        lo = float("-inf") if t1 is None else t1
+        hi = float("inf") if t2 is None else t2
+        return [(max(s, lo), min(e, hi)) for s, e in out if e > lo and s < hi]
+
+    def durations(self, t1=None, t2=None):
+        return [e - s for s, e in self.intervals(t1, t2)]
+
+    def total(self):
+        return self.downtime(float("-inf"), float("inf"))
+
+    def downtime(self, t1, t2):
+        """[t1, t2] 구간과 겹치는 outage 시간 합 (초)"""
+        if t2 <= t1 or not self._starts:
+            return 0.0
+        starts, ends = self._starts, self._ends
+        if self._cum is None:
+            cum = [0.0]
+            for s, e in zip(starts, ends):
+                cum.append(cum[-1] + (e - s))
+            self._cum = cum
+        i = bisect_right(ends, t1)    # end > t1 인 첫 구간
+        j = bisect_left(starts, t2)   # start < t2 인 구간 [0, j)
+        if i >= j:
+            return 0.0
+        total = self._cum[j] - self._cum[i]
+        if starts[i] < t1:
+            total -= t1 - starts[i]
+        if ends[j - 1] > t2:
+            total -= ends[j - 1] - t2
+        return total
+
+
+class OutageTracker:
+    """bucket별 실패 비율로 outage 구간을 판정 (gevent 단일 스레드 전제, lock 없음)"""
+
+    def __init__(self, bucket_sec=DEFAULT_BUCKET_SEC, failure_ratio=DEFAULT_FAILURE_RATIO,
+                 finalize_lag_sec=None, max_intervals=DEFAULT_MAX_INTERVALS):
+        self.bucket_sec = float(bucket_sec)
+        self.failure_ratio = failure_ratio
+        # 이 시간보다 오래된 bucket만 확정 (distributed master는 worker report 지연만큼 크게)
+        self.finalize_lag_sec = self.bucket_sec if finalize_lag_sec is None else float(finalize_lag_sec)
+        self.max_intervals = max_intervals
+        self.auto_close = True  # worker는 False (판정은 master에서)
+        self.reset()
+
+    def reset(self):
+        self.index = IntervalIndex(self.max_intervals)
+        self._open = {}          # {bucket_idx: [success, failure]}
+        self._next_idx = None    # 이보다 작은 bucket은 확정됨
+        self._down_since = None  # 진행 중인 outage 시작 (빈 bucket은 이 상태 유지)
+        self.late_buckets = 0    # 확정 이후 도착한 bucket (worker report 지연)
+        self.closed = 0          # 닫힌 outage 수 (단조 증가, index 병합/coalesce와 무관)
+
+    def _is_down(self, success, failure):
+        total = success + failure
+        return total > 0 and failure / total >= self.failure_ratio
+
+    def record(self, now, ok):
+        idx = int(now // self.bucket_sec)
+        b = self._open.get(idx)
+        if b is None:
+            b = self._open[idx] = [0, 0]
+        b[0 if ok else 1] += 1
+        if self.auto_close:
+            self.close_ready(now)
+
+    # ---- distributed mode (worker → master)
+    def export_delta(self):
+        out = [[idx, s, f] for idx, (s, f) in self._open.items()]
+        self._open = {}
+        return out
+
+    def merge_delta(self, delta, now):
+        for idx, s, f in delta:
+            if self._next_idx is not None and idx < self._next_idx:
+                # 이미 확정된 bucket: 다른 worker의 수는 판정 후 버렸으므로 이 worker 몫만으로
+                # 다시 판정하면 오판 (성공 수백 건 bucket에 실패 2/3 → 가짜 outage) → 집계만 하고 버림
+                self.late_buckets += 1
+                continue
+            b = self._open.get(idx)
+            if b is None:
+                b = self._open[idx] = [0, 0]
+            b[0] += s
+            b[1] += f
+        self.close_ready(now)
+
+    # ---- finalize
+    def close_ready(self, now, force=False):
+        limit = int((now - self.finalize_lag_sec) // self.bucket_sec)
+        if force:
+            limit = max([limit] + [idx + 1 for idx in self._open])
+        if self._next_idx is not None and limit <= self._next_idx:
+            return
+        # 빈 bucket은 상태를 바꾸지 않으므로 요청이 있던 bucket만 순서대로 판정
+        for idx in sorted(i for i in self._open if i < limit):
+            s, f = self._open.pop(idx)
+            down = self._is_down(s, f)
+            if down and self._down_since is None:
+                self._down_since = idx * self.bucket_sec
+            elif not down and self._down_since is not None:
+                self.index.add(self._down_since, idx * self.bucket_sec)
+                self._down_since = None
+                self.closed += 1
+        self._next_idx = limit
+
+    def flush(self, now):
+        """run 종료: 열린 bucket을 모두 확정하고 진행 중인 outage는 now에서 닫음"""
+        self.close_ready(now, force=True)
+        if self._down_since is not None:
+            self.index.add(self._down_since, max(now, self._down_since))
+            self._down_since = None
+            self.closed += 1
+
+    # ---- query
+    @property
+    def active(self):
+        """확정된 bucket 기준으로 outage 진행 중인지 (master는 finalize lag만큼 늦게 반영)"""
+        return self._down_since is not None
+
+    def intervals(self, t1=None, t2=None):
+        return self.index.intervals(t1, t2)
+
+    def downtime(self, t1, t2, now=None):
+        """[t1, t2] 사이 outage 시간 합 (진행 중인 outage는 now까지 포함)"""
+        total = self.index.downtime(t1, t2)
+        if self._down_since is not None and now is not None:
+            total += max(0.0, min(t2, now) - max(t1, self._down_since))
+        return total
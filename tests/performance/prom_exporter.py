@@ -0,0 +1,146 @@
+"""
+Prometheus exposition endpoint (/metrics) - OBSERVE 지표를 node_exporter와 같은 Prometheus에서 조회
+
+- 추가 의존성 없음 (stdlib http.server, Locust 환경에서는 gevent monkey patch로 greenlet에서 동작)
+- scrape 시점에 render 함수가 tracker 상태를 읽어 text format 생성
+  → request path에서는 아무 작업도 하지 않음 (lock 없음, 기록 비용 증가 없음)
+- latency histogram은 HDR bucket을 고정 경계(le)로 누적 (Prometheus histogram_quantile() 사용 가능)
+  HDR bucket 상한값 기준으로 경계에 배정하므로 경계 근처 값은 한 칸 위로 갈 수 있음 (오차 < 1%)
+"""
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ---- Constants
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def _escape(v):
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _fmt_value(v):
+    if v is None:
+        return "NaN"
+    if isinstance(v, float) and math.isinf(v):
+        return "+Inf" if v > 0 else "-Inf"
+    return repr(float(v)) if isinstance(v, float) else str(int(v))
+
+
+def parse_buckets(raw):
+    """'5,10,25' → (5.0, 10.0, 25.0) (정렬, 중복 제거). 비어 있으면 기본값"""
+    values = sorted({float(x) for x in str(raw or "").split(",") if x.strip()})
+    return tuple(values) if values else tuple(float(x) for x in DEFAULT_BUCKETS_MS)
+
+
+class Exposition:
+    """Prometheus text format builder (metric family 단위로 HELP/TYPE + sample 출력)"""
+
+    def __init__(self, prefix="loadtest_"):
+        self.prefix = prefix
+        self.lines = []
+
+    def _family(self, name, kind, help_text):
+        name = self.prefix + name
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+        return name
+
+    def metric(self, name, kind, help_text, samples):
+        """samples: [(labels dict 또는 None, value)]. 비어 있으면 family 자체를 생략"""
+        if not samples:
+            return
+        name = self._family(name, kind, help_text)
+        for labels, value in samples:
+            self.lines.append(f"{name}{_fmt_labels(labels)} {_fmt_value(value)}")
+
+    def gauge(self, name, help_text, value, labels=None):
+        self.metric(name, "gauge", help_text, [(labels, value)])
+
+    def counter(self, name, help_text, value, labels=None):
+        self.metric(name, "counter", help_text, [(labels, value)])
+
+    def histogram(self, name, help_text, series, bounds_ms):
+        """
+        series: [(labels dict 또는 None, LatencyHistogram)] → 초 단위 histogram (_bucket/_sum/_count)
+        bucket 순회는 비어 있지 않은 HDR bucket 수에 비례 (샘플 수와 무관)
+        """
+        series = [(labels, h) for labels, h in series if h.count]
+        if not series:
+            return
+        name = self._family(name, "histogram", help_text)
+        for labels, h in series:
+            labels = dict(labels or {})
+            cum = [0] * len(bounds_ms)
+            j = 0
+            seen = 0
+            for _, value_ms, c in h.buckets():
+                while j < len(bounds_ms) and value_ms > bounds_ms[j]:
+                    cum[j] = seen
+                    j += 1
+                seen += c
+            while j < len(bounds_ms):
+                cum[j] = seen
+                j += 1
+            for bound, c in zip(bounds_ms, cum):
+                self.lines.append(f"{name}_bucket{_fmt_labels({**labels, 'le': f'{bound / 1000.0:g}'})} {c}")
+            self.lines.append(f"{name}_bucket{_fmt_labels({**labels, 'le': '+Inf'})} {h.count}")
+            self.lines.append(f"{name}_sum{_fmt_labels(labels)} {h.sum_ms / 1000.0!r}")
+            self.lines.append(f"{name}_count{_fmt_labels(labels)} {h.count}")
+
+    def text(self):
+        return "\n".join(self.lines) + "\n"
+
+
+class MetricsExporter:
+    """render_fn() → exposition text 를 GET /metrics 로 제공 (daemon thread)"""
+
+    def __init__(self, render_fn, port, addr="0.0.0.0"):
+        self.render_fn = render_fn
+        self.port = port
+        self.addr = addr
+        self._server = None
+        self.scrapes = 0
+        self.errors = 0
+
+    def start(self):
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                try:
+                    body = exporter.render_fn().encode("utf-8")
+                    exporter.scrapes += 1
+                except Exception as e:
+                    exporter.errors += 1
+                    self.send_error(500, explain=str(e))
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.addr, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]  # port=0이면 OS가 할당한 port
+        threading.Thread(target=self._server.serve_forever, name="prom-exporter", daemon=True).start()
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
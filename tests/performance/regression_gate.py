@@ -0,0 +1,354 @@
+"""
+성능 회귀 판정 (baseline run 묶음 vs candidate run 묶음, bootstrap 신뢰구간)
+
+- 입력: results store(RESULTS_DB)의 run — OBSERVE latency histogram, 요청/실패 수, 스칼라 지표
+- bootstrap 1회 = 각 묶음에서 run을 복원추출 → 각 run의 histogram bucket/성공·실패 수를 Poisson 재표본
+  (run 간 편차 + run 내 표본 오차를 모두 반영, histogram 크기에만 비례하므로 요청 수와 무관)
+- delta = candidate - baseline 의 신뢰구간이 허용치(tolerance)를 '완전히' 넘을 때만 회귀로 판정 → exit 1
+- run-level 지표(outage_max_sec, recovery_sec 등)는 양쪽 모두 run 2개 이상일 때만 판정
+- numpy가 있으면 재표본을 vector 연산으로 수행 (없으면 순수 Python, 수 배 느림)
+
+사용 예:
+    python tests/performance/regression_gate.py tests/results/results.db --scenario locust \\
+        --baseline-commit 1a2b3c --candidate-commit 4d5e6f
+    python tests/performance/regression_gate.py tests/results/results.db --scenario test_app_fault_recovery \\
+        --candidate-last 3 --baseline-last 10 --metric recovery_sec --metric detect_sec
+"""
+import argparse
+import math
+import random
+import sys
+
+from latency_histogram import LatencyHistogram
+from results_store import ResultsStore
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+# ---- Constants
+DEFAULT_ITERATIONS = 2000
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_TOLERANCE_PCT = 5.0          # latency / run-level 지표: baseline 대비 상대 허용치
+DEFAULT_SUCCESS_TOLERANCE_PCT = 0.1  # 성공률: 절대 허용치 (%p)
+DEFAULT_OUTAGE_TOLERANCE_SEC = 1.0   # 최대 outage: 절대 허용치 (초)
+HIST_NAME = "obs"
+PERCENTILES = (("p50_ms", 0.50), ("p95_ms", 0.95), ("p99_ms", 0.99))
+POISSON_NORMAL_MIN = 30              # 이 이상이면 Poisson을 정규근사로 생성
+
+EXIT_OK = 0
+EXIT_REGRESSION = 1
+EXIT_NO_DATA = 2
+
+
+# ==========================================
+# Run loading
+# ==========================================
+
+class RunSample:
+    """bootstrap 입력 1개 run: histogram bucket / 성공·실패 수 / 스칼라 지표"""
+
+    def __init__(self, run_id, buckets, successes, failures, metrics):
+        self.run_id = run_id
+        self.buckets = buckets      # [(idx, value_ms, count)]
+        self.successes = successes
+        self.failures = failures
+        self.metrics = metrics      # {name: value}
+
+
+def load_run(store, run_id):
+    metrics = store.run_metrics(run_id)
+    data = store.histogram(run_id, HIST_NAME)
+    buckets = LatencyHistogram.from_dict(data).buckets() if data else []
+    total = metrics.get("obs_requests")
+    failures = metrics.get("obs_failures")
+    successes = None if total is None or failures is None else total - failures
+    return RunSample(run_id, buckets, successes, failures, metrics)
+
+
+def select_runs(store, scenario=None, run_ids=None, commit=None, last=None, skip=0):
+    """run id 목록 / commit prefix / 최근 N개(skip개 건너뜀) 중 하나로 선택 (진행 중 run 제외)"""
+    if run_ids:
+        marks = ",".join("?" for _ in run_ids)
+        rows = store.query(f"SELECT id FROM runs WHERE id IN ({marks}) ORDER BY started_at", run_ids)
+        return [r[0] for r in rows]
+
+    sql = "SELECT id FROM runs WHERE status != 'running'"
+    params = []
+    if scenario:
+        sql += " AND scenario = ?"
+        params.append(scenario)
+    if commit:
+        sql += " AND git_commit LIKE ?"
+        params.append(commit + "%")
+    sql += " ORDER BY started_at DESC"
+    if last:
+        sql += " LIMIT ? OFFSET ?"
+        params += [last, skip]
+    return [r[0] for r in reversed(store.query(sql, params))]
+
+
+# ==========================================
+# Bootstrap
+# ==========================================
+
+def _poisson(rng, lam):
+    if lam <= 0:
+        return 0
+    if np is not None and isinstance(rng, np.random.Generator):
+        return int(rng.poisson(lam))
+    if lam >= POISSON_NORMAL_MIN:
+        return max(0, int(round(rng.gauss(lam, math.sqrt(lam)))))
+    # Knuth (작은 lam 전용)
+    limit = math.exp(-lam)
+    k = 0
+    p = rng.random()
+    while p > limit:
+        k += 1
+        p *= rng.random()
+    return k
+
+
+def _np_layout(runs):
+    """numpy 경로용: 전체 run bucket idx의 합집합 기준 위치/값 배열 준비"""
+    union = sorted({idx for run in runs for idx, _, _ in run.buckets})
+    pos = {idx: i for i, idx in enumerate(union)}
+    values = [0.0] * len(union)
+    for run in runs:
+        for idx, value, _ in run.buckets:
+            values[pos[idx]] = value
+        run.np_pos = np.array([pos[idx] for idx, _, _ in run.buckets], dtype=np.int64)
+        run.np_counts = np.array([c for _, _, c in run.buckets], dtype=np.float64)
+    return np.array(values)
+
+
+def _pooled_percentiles_np(runs, gen, qs, values):
+    pooled = np.zeros(len(values))
+    for run in runs:
+        pooled[run.np_pos] += gen.poisson(run.np_counts)  # run 내 idx는 중복 없음
+    cum = np.cumsum(pooled)
+    total = cum[-1] if len(cum) else 0
+    if total == 0:
+        return [None for _ in qs]
+    ranks = np.maximum(1, np.ceil(np.array(qs) * total))
+    return [float(v) for v in values[np.searchsorted(cum, ranks)]]
+
+
+def _pooled_percentiles(runs, rng, qs):
+    """run들의 bucket을 Poisson 재표본해 합친 뒤 percentile (rng=None이면 원본 그대로)"""
+    pooled = {}
+    for run in runs:
+        for idx, value, count in run.buckets:
+            c = _poisson(rng, count) if rng is not None else count
+            if c:
+                prev = pooled.get(idx)
+                pooled[idx] = (value, c + (prev[1] if prev else 0))
+    total = sum(c for _, c in pooled.values())
+    if total == 0:
+        return [None for _ in qs]
+    ranks = [max(1, math.ceil(q * total)) for q in qs]
+    out = [None] * len(qs)
+    seen = 0
+    j = 0
+    for idx in sorted(pooled):
+        value, c = pooled[idx]
+        seen += c
+        while j < len(ranks) and ranks[j] <= seen:
+            out[j] = value
+            j += 1
+        if j == len(ranks):
+            break
+    return out
+
+
+def _success_rate(runs, rng):
+    ok = fail = 0
+    for run in runs:
+        if run.successes is None:
+            continue
+        ok += _poisson(rng, run.successes) if rng is not None else run.successes
+        fail += _poisson(rng, run.failures) if rng is not None else run.failures
+    return (ok / (ok + fail) * 100.0) if ok + fail else None
+
+
+def _mean_metric(runs, name):
+    vals = [r.metrics[name] for r in runs if r.metrics.get(name) is not None]
+    return (sum(vals) / len(vals)) if vals else None
+
+
+def set_estimates(runs, rng=None, metrics=(), np_values=None):
+    """run 묶음 1개의 지표 추정치 {name: value} (rng 지정 시 run 내부 재표본 포함)"""
+    qs = [q for _, q in PERCENTILES]
+    if np_values is not None:
+        pcts = _pooled_percentiles_np(runs, rng, qs, np_values)
+    else:
+        pcts = _pooled_percentiles(runs, rng, qs)
+    out = dict(zip((n for n, _ in PERCENTILES), pcts))
+    out["success_rate_pct"] = _success_rate(runs, rng)
+    for name in metrics:
+        out[name] = _mean_metric(runs, name)
+    return out
+
+
+def bootstrap_deltas(baseline, candidate, metrics=(), iterations=DEFAULT_ITERATIONS, seed=None):
+    """{name: [delta, ...]} — 각 반복에서 양쪽 run을 복원추출 + run 내부 Poisson 재표본"""
+    rng = random.Random(seed)
+    np_values = None
+    if np is not None:
+        gen = np.random.default_rng(seed)
+        np_values = _np_layout(list(baseline) + list(candidate))
+    else:
+        gen = rng
+    deltas = {}
+    for _ in range(iterations):
+        b = set_estimates([rng.choice(baseline) for _ in baseline], gen, metrics, np_values)
+        c = set_estimates([rng.choice(candidate) for _ in candidate], gen, metrics, np_values)
+        for name, bv in b.items():
+            cv = c.get(name)
+            if bv is not None and cv is not None:
+                deltas.setdefault(name, []).append(cv - bv)
+    return deltas
+
+
+def percentile_interval(values, confidence):
+    vals = sorted(values)
+    alpha = (1.0 - confidence) / 2.0
+    lo = vals[max(0, int(math.floor(alpha * len(vals))))]
+    hi = vals[min(len(vals) - 1, int(math.ceil((1.0 - alpha) * len(vals))) - 1)]
+    return lo, hi
+
+
+# ==========================================
+# Gate
+# ==========================================
+
+def gate_specs(extra_metrics, tolerance_pct, success_tolerance, outage_tolerance):
+    """[(name, direction, tolerance_fn(baseline) , run_level)] — direction +1: 클수록 나쁨, -1: 작을수록 나쁨"""
+    rel = lambda b: abs(b) * tolerance_pct / 100.0
+    specs = [(name, +1, rel, False) for name, _ in PERCENTILES]
+    specs.append(("success_rate_pct", -1, lambda b: success_tolerance, False))
+    specs.append(("outage_max_sec", +1, lambda b: outage_tolerance, True))
+    specs += [(name, +1, rel, True) for name in extra_metrics if name != "outage_max_sec"]
+    return specs
+
+
+def evaluate(baseline, candidate, extra_metrics=(), iterations=DEFAULT_ITERATIONS,
+             confidence=DEFAULT_CONFIDENCE, tolerance_pct=DEFAULT_TOLERANCE_PCT,
+             success_tolerance=DEFAULT_SUCCESS_TOLERANCE_PCT, outage_tolerance=DEFAULT_OUTAGE_TOLERANCE_SEC,
+             seed=None):
+    """
+    지표별 판정 결과 목록
+    verdict: REGRESSION / IMPROVED / OK / INSUFFICIENT(run 부족) / NO DATA
+    """
+    specs = gate_specs(extra_metrics, tolerance_pct, success_tolerance, outage_tolerance)
+    run_metrics = [name for name, _, _, run_level in specs if run_level]
+    base_point = set_estimates(baseline, metrics=run_metrics)
+    cand_point = set_estimates(candidate, metrics=run_metrics)
+    deltas = bootstrap_deltas(baseline, candidate, run_metrics, iterations, seed)
+
+    results = []
+    for name, direction, tol_fn, run_level in specs:
+        b, c = base_point.get(name), cand_point.get(name)
+        row = {"name": name, "baseline": b, "candidate": c, "delta": None, "ci": None, "tolerance": None}
+        if b is None or c is None or len(deltas.get(name, ())) < iterations // 2:
+            row["verdict"] = "NO DATA"
+        elif run_level and (len(baseline) < 2 or len(candidate) < 2):
+            row["delta"] = c - b
+            row["verdict"] = "INSUFFICIENT"
+        else:
+            lo, hi = percentile_interval(deltas[name], confidence)
+            tol = tol_fn(b)
+            row.update(delta=c - b, ci=(lo, hi), tolerance=tol)
+            worse_lo, better_hi = (lo, hi) if direction > 0 else (-hi, -lo)
+            if worse_lo > tol:
+                row["verdict"] = "REGRESSION"
+            elif better_hi < 0:
+                row["verdict"] = "IMPROVED"
+            else:
+                row["verdict"] = "OK"
+        results.append(row)
+    return results
+
+
+def _fmt(v):
+    return "-" if v is None else f"{v:.3f}"
+
+
+def report_lines(results, confidence):
+    lines = [f"{'metric':<20} {'baseline':>10} {'candidate':>10} {'delta':>10}  {int(confidence * 100)}% CI{'':<14} verdict"]
+    for r in results:
+        ci = "-" if r["ci"] is None else f"[{r['ci'][0]:+.3f}, {r['ci'][1]:+.3f}]"
+        delta = "-" if r["delta"] is None else f"{r['delta']:+.3f}"
+        tol = "" if r["tolerance"] is None else f" (tol {r['tolerance']:.3f})"
+        lines.append(
+            f"{r['name']:<20} {_fmt(r['baseline']):>10} {_fmt(r['candidate']):>10} {delta:>10}  "
+            f"{ci:<20} {r['verdict']}{tol}"
+        )
+    return lines
+
+
+def _ids(text):
+    return [int(x) for x in text.split(",") if x.strip()] if text else None
+
+
+def _main():
+    parser = argparse.ArgumentParser(description="baseline vs candidate 성능 회귀 판정 (bootstrap CI)")
+    parser.add_argument("db", help="results store 경로 (RESULTS_DB)")
+    parser.add_argument("--scenario", help="run scenario (Locust RUN_SCENARIO 또는 pytest 테스트 이름)")
+    for side in ("baseline", "candidate"):
+        parser.add_argument(f"--{side}-runs", help="run id 목록 (쉼표 구분)")
+        parser.add_argument(f"--{side}-commit", help="git commit prefix")
+        parser.add_argument(f"--{side}-last", type=int, help="최근 N개 run (baseline은 candidate 이전 run에서 선택)")
+    parser.add_argument("--metric", action="append", default=[], help="추가 run-level 지표 (클수록 나쁨, 반복 가능)")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument("--confidence", type=float, default=DEFAULT_CONFIDENCE)
+    parser.add_argument("--tolerance-pct", type=float, default=DEFAULT_TOLERANCE_PCT)
+    parser.add_argument("--success-tolerance", type=float, default=DEFAULT_SUCCESS_TOLERANCE_PCT)
+    parser.add_argument("--outage-tolerance", type=float, default=DEFAULT_OUTAGE_TOLERANCE_SEC)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    store = ResultsStore(args.db)
+    candidate_ids = select_runs(
+        store, args.scenario, _ids(args.candidate_runs), args.candidate_commit, args.candidate_last
+    )
+    # --baseline-last만 지정하면 candidate 바로 이전 run들을 baseline으로 사용
+    skip = len(candidate_ids) if (args.baseline_last and args.candidate_last and not args.baseline_commit) else 0
+    baseline_ids = select_runs(
+        store, args.scenario, _ids(args.baseline_runs), args.baseline_commit, args.baseline_last, skip
+    )
+    overlap = set(baseline_ids) & set(candidate_ids)
+    baseline_ids = [i for i in baseline_ids if i not in overlap]
+
+    print(f"baseline runs : {baseline_ids}")
+    print(f"candidate runs: {candidate_ids}")
+    if not baseline_ids or not candidate_ids:
+        print("[ERROR] baseline/candidate run이 비어 있습니다.")
+        return EXIT_NO_DATA
+
+    baseline = [load_run(store, i) for i in baseline_ids]
+    candidate = [load_run(store, i) for i in candidate_ids]
+    results = evaluate(
+        baseline, candidate,
+        extra_metrics=args.metric,
+        iterations=args.iterations,
+        confidence=args.confidence,
+        tolerance_pct=args.tolerance_pct,
+        success_tolerance=args.success_tolerance,
+        outage_tolerance=args.outage_tolerance,
+        seed=args.seed,
+    )
+    for line in report_lines(results, args.confidence):
+        print(line)
+
+    regressions = [r["name"] for r in results if r["verdict"] == "REGRESSION"]
+    if regressions:
+        print(f"[FAIL] Significant regression: {', '.join(regressions)}")
+        return EXIT_REGRESSION
+    print("[PASS] No significant regression.")
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(_main())
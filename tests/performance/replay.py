@@ -0,0 +1,235 @@
+"""
+ALB access log trace replay (운영 트래픽의 path / 도착 간격을 그대로 재현)
+
+- alb_logs의 generator pipeline으로 로그를 한 줄씩 읽음 (gzip, 수 GB도 메모리 일정)
+- request_creation_time 기준으로 도착 간격 유지, speed > 1이면 시간 압축 (2.0 = 2배 빠르게)
+- ALB 로그는 응답 완료(time) 순서라 creation time 기준으로는 약간 뒤섞여 있음
+  → reorder_sec 구간의 heap buffer로 재정렬 (buffer 크기 = reorder_sec × trace rate)
+- distributed 모드: client IP hash로 worker별 partition (같은 client의 요청 순서 유지)
+- replay lag: 예정 시각에 요청을 보낼 수 있는 user가 없어서 늦어진 시간 → 클라이언트 한계 판단
+  (lag은 버리지 않고 늦게라도 발송, open model의 dropped와 다름)
+"""
+import heapq
+import time
+import zlib
+
+from alb_logs import F, client_ip, iter_log_paths, iter_rows, iter_time_ordered, parse_ts, split_request, window_key
+from latency_histogram import LatencyHistogram
+
+# gevent (Locust 내부에서 사용)
+try:
+    from gevent import sleep
+except Exception:
+    def sleep(x):  # fallback
+        time.sleep(x)
+
+# ---- Constants
+IDLE_POLL_SEC = 0.1
+
+
+def partition_of(ip, partitions):
+    """client IP → partition 번호 (프로세스 간 동일해야 하므로 hash() 대신 crc32)"""
+    return zlib.crc32(ip.encode()) % partitions
+
+
+def reorder(records, window_sec):
+    """
+    대략 시간순인 stream → window_sec 안의 뒤섞임을 정렬해 내보냄.
+    buffer에는 가장 최근 record 기준 window_sec 이내의 record만 보관.
+    """
+    heap = []
+    seq = 0  # 같은 시각 record의 비교 회피 (tuple 뒤쪽 필드 비교 방지)
+    for rec in records:
+        heapq.heappush(heap, (rec[0], seq, rec))
+        seq += 1
+        horizon = rec[0] - window_sec
+        while heap[0][0] <= horizon:
+            yield heapq.heappop(heap)[2]
+    while heap:
+        yield heapq.heappop(heap)[2]
+
+
+class TraceReplayer:
+    """
+    프로세스 내 ReplayUser들이 공유하는 replay schedule (gevent 단일 스레드 전제, lock 없음).
+    acquire() → (method, path, intended wall ts) 또는 trace 종료 시 None
+    """
+
+    def __init__(self, sources, speed=1.0, methods=("GET", "HEAD"), partition=0, partitions=1,
+                 reorder_sec=30.0, late_sec=0.05):
+        if speed <= 0:
+            raise ValueError("speed must be > 0")
+        self.sources = list(sources)
+        self.paths = None         # start()에서 탐색 (distributed master에는 로그 파일이 없어도 됨)
+        self.speed = speed
+        self.methods = frozenset(m.upper() for m in methods)
+        self.partition = partition
+        self.partitions = max(1, partitions)
+        self.reorder_sec = reorder_sec
+        self.late_sec = late_sec
+        self.lag_hist = LatencyHistogram()
+        self.reset()
+
+    def reset(self):
+        self._stream = None
+        self._t0 = None           # replay 시작 (monotonic)
+        self._origin = None       # trace 시작 시각 (log epoch)
+        self._last_slot = None
+        self._wall_offset = time.time() - time.monotonic()
+        self.exhausted = False
+        self._waiting = 0         # slot 시각까지 대기 중인 user 수 (0이 되어야 partition 종료)
+        self._done_marked = False
+        self.done = 0             # 종료된 partition 수 (master에서는 worker 합계)
+        self.replayed = 0
+        self.late = 0
+        self.out_of_order = 0     # reorder 후에도 역순 → lag 대신 직전 slot에 맞춰 발송
+        self.skipped = 0          # methods 외 / request 파싱 불가
+        self.malformed = 0
+        self.trace_last = None    # 마지막으로 replay한 record의 log 시각
+        self.lag_hist.reset()
+
+    # ---- stream
+    def _records(self, path):
+        """파일 1개 → (ts, method, path) (이 partition 몫만)"""
+        for row in iter_rows(path):
+            try:
+                if self.partitions > 1 and partition_of(client_ip(row[F["client"]]), self.partitions) != self.partition:
+                    continue
+                method, url = split_request(row[F["request"]])
+                if method is None or method not in self.methods:
+                    self.skipped += 1
+                    continue
+                yield parse_ts(row[F["request_creation_time"]]), method, url
+            except ValueError:
+                self.malformed += 1
+
+    def _trace_origin(self):
+        """
+        모든 worker가 같은 기준 시각을 쓰도록 partition 필터 전의 첫 구간 파일들에서 최소 시각을 구함
+        (worker마다 첫 record가 달라도 도착 간격이 어긋나지 않음)
+        """
+        first_window = window_key(self.paths[0])
+        origin = None
+        for path in self.paths:
+            if window_key(path) != first_window:
+                break
+            for row in iter_rows(path):
+                try:
+                    ts = parse_ts(row[F["request_creation_time"]])
+                except ValueError:
+                    continue
+                origin = ts if origin is None else min(origin, ts)
+                break
+        return origin
+
+    def start(self):
+        """replay 시작 (이미 시작했으면 무시). 로그 파일이 없으면 False"""
+        if self._t0 is not None:
+            return True
+        if not 0 <= self.partition < self.partitions:
+            # partitions == 1 이면 필터를 건너뛰므로 범위 밖 partition이 전체 trace를 replay하게 됨
+            raise ValueError(f"partition {self.partition} out of range (partitions={self.partitions})")
+        self.paths = iter_log_paths(self.sources)
+        if not self.paths:
+            self.exhausted = True
+            self._mark_done()
+            return False
+        self._origin = self._trace_origin()
+        self._stream = reorder(iter_time_ordered(self.paths, self._records), self.reorder_sec)
+        self._t0 = time.monotonic()
+        self._wall_offset = time.time() - self._t0
+        return True
+
+    @property
+    def started(self):
+        return self._t0 is not None
+
+    @property
+    def finished(self):
+        """모든 partition의 trace 종료 (master에서는 worker들이 보낸 done 합계 기준)"""
+        return self.done >= self.partitions
+
+    def acquire(self):
+        """다음 record의 예정 시각까지 대기 후 (method, path, intended wall ts) 반환"""
+        while not (self.started or self.exhausted):
+            sleep(IDLE_POLL_SEC)
+        rec = None if self.exhausted else next(self._stream, None)
+        if rec is None:
+            self.exhausted = True
+            if self._waiting == 0:
+                self._mark_done()
+            return None
+
+        ts, method, url = rec
+        slot = self._t0 + (ts - self._origin) / self.speed
+        if self._last_slot is not None and slot < self._last_slot:
+            self.out_of_order += 1
+            slot = self._last_slot
+        self._last_slot = slot
+        self.trace_last = ts
+
+        delay = slot - time.monotonic()
+        if delay > 0:
+            self._waiting += 1
+            try:
+                sleep(delay)
+            finally:
+                self._waiting -= 1
+            self.lag_hist.record(0.0)
+        else:
+            self.lag_hist.record(-delay * 1000.0)
+            if -delay > self.late_sec:
+                self.late += 1
+        self.replayed += 1
+        return method, url, slot + self._wall_offset
+
+    def _mark_done(self):
+        if not self._done_marked:
+            self._done_marked = True
+            self.done += 1
+
+    # ---- distributed: worker delta → master merge
+    def export_delta(self):
+        delta = {
+            "replayed": self.replayed,
+            "late": self.late,
+            "out_of_order": self.out_of_order,
+            "skipped": self.skipped,
+            "malformed": self.malformed,
+            "lag": self.lag_hist.to_dict() if self.lag_hist.count else None,
+            "trace_last": self.trace_last,
+            "done": self.done,
+        }
+        self.replayed = self.late = self.out_of_order = self.skipped = self.malformed = self.done = 0
+        self.lag_hist.reset()
+        return delta
+
+    def merge_delta(self, delta):
+        self.replayed += delta["replayed"]
+        self.late += delta["late"]
+        self.out_of_order += delta["out_of_order"]
+        self.skipped += delta["skipped"]
+        self.malformed += delta["malformed"]
+        self.done += delta["done"]
+        if delta["lag"]:
+            self.lag_hist.merge(LatencyHistogram.from_dict(delta["lag"]))
+        if delta["trace_last"] is not None:
+            self.trace_last = max(self.trace_last or delta["trace_last"], delta["trace_last"])
+
+    def summary(self):
+        p50 = p95 = p99 = None
+        if self.lag_hist.count:
+            p50, p95, p99 = self.lag_hist.percentiles([0.50, 0.95, 0.99])
+        return {
+            "replayed": self.replayed,
+            "late": self.late,
+            "late_pct": (self.late / self.replayed * 100.0) if self.replayed else 0.0,
+            "out_of_order": self.out_of_order,
+            "skipped": self.skipped,
+            "malformed": self.malformed,
+            "lag_p50_ms": p50,
+            "lag_p95_ms": p95,
+            "lag_p99_ms": p99,
+            "lag_max_ms": self.lag_hist.max_ms,
+            "finished": self.finished,
+        }
@@ -0,0 +1,316 @@
+"""
+테스트 결과 누적 저장소 (SQLite)
+
+- run 1회 = runs 1행 (scenario / 시작·종료 시각 / git commit / 상태) + config snapshot
+- 실행 중 증분 기록: 시계열(series, node_series)은 flush마다, host별 통계/outage/지표(metrics)는 종료 시
+- scenario / 날짜 / commit 인덱스 → 수백 run의 추세를 빠르게 조회
+- pytest(conftest)와 Locust 양쪽에서 공용 (이 모듈은 sibling import 없이 독립적으로 유지)
+
+사용 예 (추세 조회):
+    python tests/performance/results_store.py tests/results/results.db trend obs_p95_ms --scenario locust
+"""
+import argparse
+import json
+import os
+import sqlite3
+import subprocess
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    scenario    TEXT NOT NULL,
+    source      TEXT NOT NULL,          -- locust | pytest
+    started_at  REAL NOT NULL,          -- epoch sec
+    ended_at    REAL,
+    git_commit  TEXT,
+    status      TEXT NOT NULL DEFAULT 'running',
+    target      TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_scenario_started ON runs (scenario, started_at);
+CREATE INDEX IF NOT EXISTS idx_runs_started ON runs (started_at);
+CREATE INDEX IF NOT EXISTS idx_runs_commit ON runs (git_commit);
+
+CREATE TABLE IF NOT EXISTS run_config (
+    run_id  INTEGER NOT NULL REFERENCES runs (id),
+    key     TEXT NOT NULL,
+    value   TEXT,
+    PRIMARY KEY (run_id, key)
+);
+
+CREATE TABLE IF NOT EXISTS series (
+    run_id    INTEGER NOT NULL REFERENCES runs (id),
+    ts        REAL NOT NULL,
+    requests  INTEGER NOT NULL,
+    failures  INTEGER NOT NULL,
+    p50_ms    REAL,
+    p95_ms    REAL,
+    p99_ms    REAL,
+    PRIMARY KEY (run_id, ts)
+);
+
+CREATE TABLE IF NOT EXISTS host_stats (
+    run_id      INTEGER NOT NULL REFERENCES runs (id),
+    host        TEXT NOT NULL,
+    hits        INTEGER NOT NULL,
+    first_seen  REAL,
+    PRIMARY KEY (run_id, host)
+);
+
+-- node_exporter sample (ts = rate 구간 시작, series.ts와 같은 시간축)
+CREATE TABLE IF NOT EXISTS node_series (
+    run_id   INTEGER NOT NULL REFERENCES runs (id),
+    ts       REAL NOT NULL,
+    host     TEXT NOT NULL,
+    cpu_pct  REAL,
+    load1    REAL,
+    rx_bps   REAL,
+    tx_bps   REAL,
+    PRIMARY KEY (run_id, ts, host)
+);
+
+CREATE TABLE IF NOT EXISTS outages (
+    run_id        INTEGER NOT NULL REFERENCES runs (id),
+    start_ts      REAL NOT NULL,
+    end_ts        REAL NOT NULL,
+    duration_sec  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_outages_run ON outages (run_id);
+
+-- 스칼라 지표: 복구 시간, 가용성, P95 등 (name 기준 추세 조회)
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id  INTEGER NOT NULL REFERENCES runs (id),
+    name    TEXT NOT NULL,
+    value   REAL,
+    PRIMARY KEY (run_id, name)
+);
+CREATE INDEX IF NOT EXISTS idx_metrics_name ON metrics (name, run_id);
+
+-- latency histogram 원본 (LatencyHistogram.to_dict() JSON) — regression gate의 bootstrap 입력
+CREATE TABLE IF NOT EXISTS histograms (
+    run_id  INTEGER NOT NULL REFERENCES runs (id),
+    name    TEXT NOT NULL,
+    data    TEXT NOT NULL,
+    PRIMARY KEY (run_id, name)
+);
+"""
+
+
+def current_git_commit(cwd=None):
+    """GIT_COMMIT 환경 변수 > git rev-parse HEAD > None"""
+    commit = os.getenv("GIT_COMMIT")
+    if commit:
+        return commit.strip()
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=cwd or os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, timeout=5,
+        )
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def config_snapshot(config):
+    """Config 클래스의 대문자 속성 → {key: str(value)}"""
+    return {
+        k: json.dumps(v) if isinstance(v, (list, tuple, dict)) else str(v)
+        for k, v in vars(config).items()
+        if k.isupper()
+    }
+
+
+class ResultsStore:
+    """SQLite 저장소 (thread-safe: 단일 connection + lock, WAL로 조회와 동시 기록 가능)"""
+
+    def __init__(self, path):
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _write(self, sql, rows=None, many=False):
+        with self._lock:
+            cur = self._conn.executemany(sql, rows) if many else self._conn.execute(sql, rows or ())
+            self._conn.commit()
+            return cur.lastrowid
+
+    # ---- run lifecycle
+    def start_run(self, scenario, source, config=None, target=None, git_commit=None, started_at=None):
+        run_id = self._write(
+            "INSERT INTO runs (scenario, source, started_at, git_commit, target) VALUES (?, ?, ?, ?, ?)",
+            (scenario, source, started_at or time.time(), git_commit or current_git_commit(), target),
+        )
+        if config:
+            self._write(
+                "INSERT OR REPLACE INTO run_config (run_id, key, value) VALUES (?, ?, ?)",
+                [(run_id, k, v) for k, v in config.items()],
+                many=True,
+            )
+        return RunRecorder(self, run_id)
+
+    # ---- queries
+    def query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def trend(self, metric, scenario=None, limit=100):
+        """[(started_at, git_commit, scenario, value)] 최근 limit개 (오래된 순)"""
+        sql = (
+            "SELECT r.started_at, r.git_commit, r.scenario, m.value FROM metrics m "
+            "JOIN runs r ON r.id = m.run_id WHERE m.name = ?"
+        )
+        params = [metric]
+        if scenario:
+            sql += " AND r.scenario = ?"
+            params.append(scenario)
+        sql += " ORDER BY r.started_at DESC LIMIT ?"
+        params.append(limit)
+        return list(reversed(self.query(sql, params)))
+
+    def run_metrics(self, run_id):
+        return dict(self.query("SELECT name, value FROM metrics WHERE run_id = ?", (run_id,)))
+
+    def histogram(self, run_id, name):
+        """저장된 histogram dict (없으면 None)"""
+        rows = self.query("SELECT data FROM histograms WHERE run_id = ? AND name = ?", (run_id, name))
+        return json.loads(rows[0][0]) if rows else None
+
+
+class RunRecorder:
+    """run 1회분 기록 handle (series writer 인터페이스 write(rows)/close()도 제공)"""
+
+    def __init__(self, store, run_id):
+        self.store = store
+        self.run_id = run_id
+        self.series_path = f"{store.path}#run={run_id}"
+
+    # ---- 시계열 (TimeSeriesRecorder row 형식)
+    def write(self, rows):
+        if not rows:
+            return
+        self.store._write(
+            "INSERT OR REPLACE INTO series (run_id, ts, requests, failures, p50_ms, p95_ms, p99_ms) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (self.run_id, r["ts"], r["requests"], r["failures"], r["p50_ms"], r["p95_ms"], r["p99_ms"])
+                for r in rows
+            ],
+            many=True,
+        )
+
+    def close(self):
+        pass
+
+    def record_node_series(self, rows):
+        """node_scraper.NodeScraper row 형식"""
+        if not rows:
+            return
+        self.store._write(
+            "INSERT OR REPLACE INTO node_series (run_id, ts, host, cpu_pct, load1, rx_bps, tx_bps) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (self.run_id, r["ts"], r["host"], r["cpu_pct"], r["load1"], r["rx_bps"], r["tx_bps"])
+                for r in rows
+            ],
+            many=True,
+        )
+
+    # ---- 종료 시 기록
+    def record_hosts(self, hits, first_seen=None):
+        first_seen = first_seen or {}
+        hosts = set(hits) | set(first_seen)
+        self.store._write(
+            "INSERT OR REPLACE INTO host_stats (run_id, host, hits, first_seen) VALUES (?, ?, ?, ?)",
+            [(self.run_id, h, hits.get(h, 0), first_seen.get(h)) for h in sorted(hosts)],
+            many=True,
+        )
+
+    def record_outages(self, intervals):
+        self.store._write(
+            "INSERT INTO outages (run_id, start_ts, end_ts, duration_sec) VALUES (?, ?, ?, ?)",
+            [(self.run_id, s, e, e - s) for s, e in intervals],
+            many=True,
+        )
+
+    def record_metrics(self, **metrics):
+        """record_metrics(detect_sec=12.3, availability_pct=99.1, ...) — None 값은 건너뜀"""
+        rows = [(self.run_id, k, float(v)) for k, v in metrics.items() if v is not None]
+        self.store._write(
+            "INSERT OR REPLACE INTO metrics (run_id, name, value) VALUES (?, ?, ?)", rows, many=True
+        )
+
+    def record_histogram(self, name, data):
+        """data: LatencyHistogram.to_dict() 형식"""
+        self.store._write(
+            "INSERT OR REPLACE INTO histograms (run_id, name, data) VALUES (?, ?, ?)",
+            (self.run_id, name, json.dumps(data)),
+        )
+
+    def finish(self, status="passed", ended_at=None):
+        self.store._write(
+            "UPDATE runs SET ended_at = ?, status = ? WHERE id = ?",
+            (ended_at or time.time(), status, self.run_id),
+        )
+
+
+class NodeSeriesWriter:
+    """RunRecorder.record_node_series를 series writer 인터페이스(write(rows)/close())로 제공"""
+
+    def __init__(self, run):
+        self.run = run
+        self.series_path = f"{run.series_path}&table=node_series"
+
+    def write(self, rows):
+        self.run.record_node_series(rows)
+
+    def close(self):
+        pass
+
+
+def _main():
+    parser = argparse.ArgumentParser(description="results store 조회")
+    parser.add_argument("db")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_runs = sub.add_parser("runs", help="최근 run 목록")
+    p_runs.add_argument("--scenario")
+    p_runs.add_argument("--limit", type=int, default=20)
+    p_trend = sub.add_parser("trend", help="지표 추세")
+    p_trend.add_argument("metric")
+    p_trend.add_argument("--scenario")
+    p_trend.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    store = ResultsStore(args.db)
+    if args.cmd == "runs":
+        sql = "SELECT id, scenario, source, started_at, ended_at, git_commit, status FROM runs"
+        params = []
+        if args.scenario:
+            sql += " WHERE scenario = ?"
+            params.append(args.scenario)
+        sql += " ORDER BY started_at DESC LIMIT ?"
+        params.append(args.limit)
+        for rid, scenario, source, started, ended, commit, status in store.query(sql, params):
+            dur = f"{ended - started:.0f}s" if ended else "-"
+            print(f"{rid:>5} {time.strftime('%Y-%m-%d %H:%M', time.localtime(started))} "
+                  f"{scenario:<32} {source:<7} {status:<8} {dur:>7} {(commit or '-')[:10]}")
+    else:
+        for started, commit, scenario, value in store.trend(args.metric, args.scenario, args.limit):
+            print(f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(started))} "
+                  f"{(commit or '-')[:10]:<10} {scenario:<32} {value:.3f}")
+
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,56 @@
+import math
+import random
+from bisect import bisect_left
+from itertools import accumulate
+
+import pytest
+
+from breach import SequentialBreachTest
+
+STEP_SEC = 180   # 1초마다 update, step 1개 = 180초
+ALPHA = 0.001
+
+
+def _binomial_sampler(n, p, rng):
+    """Binomial(n, p) 샘플러 (CDF table + 역변환, 결정적)"""
+    cdf = list(accumulate(math.comb(n, k) * p ** k * (1 - p) ** (n - k) for k in range(n + 1)))
+    return lambda: min(bisect_left(cdf, rng.random()), n)
+
+
+def _run_step(rate, p, draw):
+    """step 1개 동안 초당 update → breach 확정 시각(초) 또는 None"""
+    test = SequentialBreachTest(alpha=ALPHA)
+    for sec in range(STEP_SEC):
+        if test.update(draw(), rate):
+            return sec + 1
+    return None
+
+
+@pytest.mark.parametrize("rate", [20, 100])
+def test_false_stop_rate_within_alpha(rate):
+    """초과 비율이 정확히 p0(=p95 == SLA, 준수 step)일 때 오탐 비율 <= alpha"""
+    rng = random.Random(1234)
+    draw = _binomial_sampler(rate, 0.05, rng)
+    trials = 5000
+    stops = sum(_run_step(rate, 0.05, draw) is not None for _ in range(trials))
+    # 기대값 <= 5건 (alpha=0.1%). 반사 CUSUM은 같은 조건에서 2~4% (100~180건)
+    assert stops / trials <= 3 * ALPHA
+
+
+@pytest.mark.parametrize("rate", [20, 100])
+def test_breach_detected_mid_step(rate):
+    """초과 비율 15% (p95가 SLA를 명확히 넘는 step)는 step 초반에 확정"""
+    rng = random.Random(99)
+    draw = _binomial_sampler(rate, 0.15, rng)
+    times = [_run_step(rate, 0.15, draw) for _ in range(200)]
+    assert all(t is not None for t in times)
+    assert sorted(times)[len(times) // 2] <= 30
+
+
+def test_breach_is_sticky_and_reset_per_step():
+    test = SequentialBreachTest(alpha=ALPHA)
+    assert test.update(40, 100)
+    assert test.update(0, 10000)   # 확정 이후 정상 샘플이 와도 유지
+    test.reset()
+    assert not test.breached
+    assert not test.update(0, 0)
@@ -0,0 +1,102 @@
+import pytest
+
+import node_scraper
+from node_scraper import NodeScraper, parse_node_metrics
+
+# node_exporter /metrics 출력 발췌 (family 이름순, collect[] 없이 전체 collector가 켜진 경우)
+FIXTURE = """\
+# HELP go_goroutines Number of goroutines that currently exist.
+# TYPE go_goroutines gauge
+go_goroutines 8
+# HELP node_cpu_seconds_total Seconds the CPUs spent in each mode.
+# TYPE node_cpu_seconds_total counter
+node_cpu_seconds_total{cpu="0",mode="idle"} 1000
+node_cpu_seconds_total{cpu="0",mode="iowait"} 10
+node_cpu_seconds_total{cpu="0",mode="system"} 40
+node_cpu_seconds_total{cpu="0",mode="user"} 150
+node_cpu_seconds_total{cpu="1",mode="idle"} 900
+node_cpu_seconds_total{cpu="1",mode="iowait"} 20
+node_cpu_seconds_total{cpu="1",mode="system"} 30
+node_cpu_seconds_total{cpu="1",mode="user"} 250
+# HELP node_disk_read_bytes_total The total number of bytes read successfully.
+# TYPE node_disk_read_bytes_total counter
+node_disk_read_bytes_total{device="nvme0n1"} 1.2e+08
+# HELP node_load1 1m load average.
+# TYPE node_load1 gauge
+node_load1 0.75
+# HELP node_load15 15m load average.
+# TYPE node_load15 gauge
+node_load15 0.5
+# HELP node_memory_MemFree_bytes Memory information field MemFree_bytes.
+# TYPE node_memory_MemFree_bytes gauge
+node_memory_MemFree_bytes 1.5e+08
+# HELP node_network_receive_bytes_total Network device statistic receive_bytes.
+# TYPE node_network_receive_bytes_total counter
+node_network_receive_bytes_total{device="ens5"} 5000
+node_network_receive_bytes_total{device="lo"} 999999
+node_network_receive_bytes_total{device="docker0"} 300
+# HELP node_network_receive_drop_total Network device statistic receive_drop.
+# TYPE node_network_receive_drop_total counter
+node_network_receive_drop_total{device="ens5"} 0
+# HELP node_network_transmit_bytes_total Network device statistic transmit_bytes.
+# TYPE node_network_transmit_bytes_total counter
+node_network_transmit_bytes_total{device="ens5"} 7000
+node_network_transmit_bytes_total{device="lo"} 999999
+node_network_transmit_bytes_total{device="docker0"} 100
+# HELP node_network_transmit_colls_total Network device statistic transmit_colls.
+# TYPE node_network_transmit_colls_total counter
+node_network_transmit_colls_total{device="ens5"} 0
+# HELP process_cpu_seconds_total Total user and system CPU time spent in seconds.
+# TYPE process_cpu_seconds_total counter
+process_cpu_seconds_total 12.5
+"""
+
+
+def test_parse_fixture_values():
+    m = parse_node_metrics(FIXTURE.splitlines())
+    assert m["cpu_total"] == pytest.approx(2400)
+    assert m["cpu_idle"] == pytest.approx(1930)     # idle + iowait
+    assert m["load1"] == pytest.approx(0.75)         # node_load15/5는 무시
+    assert m["rx"] == pytest.approx(5300)            # lo 제외
+    assert m["tx"] == pytest.approx(7100)
+
+
+def test_parse_stops_after_last_family():
+    """마지막 필요 family(transmit_bytes) 이후 첫 family에서 중단 — 그 전의 network series는 모두 읽음"""
+    consumed = []
+
+    def lines():
+        for line in FIXTURE.splitlines():
+            consumed.append(line)
+            yield line
+
+    m = parse_node_metrics(lines())
+    assert m["tx"] == pytest.approx(7100)
+    assert consumed[-1].startswith("node_network_transmit_colls_total")
+    assert not any(line.startswith("process_") for line in consumed)
+
+
+def test_wanted_families_sort_before_last_family():
+    """
+    early break 전제: 필요한 family가 모두 _LAST_FAMILY 이하로 정렬되어야 함
+    (새 family를 _WANTED에 추가하면서 _LAST_FAMILY를 갱신하지 않으면 그 series가 조용히 빠짐)
+    """
+    names = [w.rstrip("{ ") for w in node_scraper._WANTED]
+    assert max(names) == node_scraper._LAST_FAMILY
+
+
+def test_parse_missing_families_are_none():
+    m = parse_node_metrics(["# HELP x", "node_load1 1.5", "process_open_fds 9"])
+    assert m == {"cpu_idle": None, "cpu_total": None, "load1": 1.5, "rx": None, "tx": None}
+
+
+def test_rate_row_from_fixture_pair():
+    prev = parse_node_metrics(FIXTURE.splitlines())
+    later = FIXTURE.replace('{cpu="0",mode="user"} 150', '{cpu="0",mode="user"} 170') \
+                   .replace('{device="ens5"} 5000', '{device="ens5"} 15000')
+    cur = parse_node_metrics(later.splitlines())
+    row = NodeScraper._rate_row("i-1", 100.0, prev, 105.0, cur)
+    assert row["ts"] == 100.0
+    assert row["cpu_pct"] == pytest.approx(100.0)    # 증가분 20초가 모두 user
+    assert row["rx_bps"] == pytest.approx(2000.0)
+    assert row["tx_bps"] == pytest.approx(0.0)
@@ -0,0 +1,138 @@
+import pytest
+
+from outage import IntervalIndex, OutageTracker
+
+
+# ---- IntervalIndex
+
+def test_index_merges_overlapping_and_touching():
+    idx = IntervalIndex()
+    idx.add(10, 12)
+    idx.add(20, 21)
+    idx.add(11, 13)      # 겹침
+    idx.add(13, 14)      # 맞닿음
+    idx.add(5, 6)
+    idx.add(15, 15)      # 길이 0은 무시
+    assert idx.intervals() == [(5, 6), (10, 14), (20, 21)]
+
+    idx.add(6, 20)       # 여러 구간을 한 번에 병합
+    assert idx.intervals() == [(5, 21)]
+    assert idx.total() == pytest.approx(16)
+
+
+def test_index_coalesces_shortest_gap():
+    idx = IntervalIndex(max_intervals=3)
+    idx.add(0, 1)
+    idx.add(5, 6)
+    idx.add(6.5, 7)     # 간격 0.5 (가장 짧음)
+    idx.add(20, 21)
+    assert len(idx) == 3
+    assert idx.intervals() == [(0, 1), (5, 7), (20, 21)]
+    assert idx.coalesced_sec == pytest.approx(0.5)
+    assert idx.total() == pytest.approx(4.0)
+
+
+def test_index_downtime_clips_window():
+    idx = IntervalIndex()
+    idx.add(10, 20)
+    idx.add(30, 40)
+    assert idx.downtime(0, 100) == pytest.approx(20)
+    assert idx.downtime(15, 35) == pytest.approx(10)
+    assert idx.downtime(12, 18) == pytest.approx(6)
+    assert idx.downtime(20, 30) == 0.0
+    assert idx.downtime(40, 10) == 0.0
+    assert idx.durations(15, 35) == pytest.approx([5, 5])
+
+    # intervals(t1, t2)의 합은 downtime(t1, t2)와 같음 (summary / Availability 일치)
+    for t1, t2 in ((0, 100), (15, 35), (12, 18), (25, 45), (35, 36)):
+        assert sum(e - s for s, e in idx.intervals(t1, t2)) == pytest.approx(idx.downtime(t1, t2))
+    assert idx.intervals(15) == [(15, 20), (30, 40)]
+
+
+def test_index_downtime_after_add_invalidates_prefix_sums():
+    idx = IntervalIndex()
+    idx.add(0, 1)
+    assert idx.downtime(0, 10) == pytest.approx(1)
+    idx.add(5, 7)
+    assert idx.downtime(0, 10) == pytest.approx(3)
+
+
+# ---- OutageTracker
+
+def _feed(tracker, t, success, failure):
+    for _ in range(success):
+        tracker.record(t, True)
+    for _ in range(failure):
+        tracker.record(t, False)
+
+
+def test_tracker_judges_by_bucket_failure_ratio():
+    tr = OutageTracker(bucket_sec=1.0, failure_ratio=0.5)
+    _feed(tr, 100.5, 9, 1)     # 10% → up
+    _feed(tr, 101.5, 4, 6)     # 60% → down
+    _feed(tr, 102.5, 5, 5)     # 50% → down (경계 포함)
+    # 103: 요청 없음 → 직전 상태(down) 유지
+    _feed(tr, 104.5, 10, 0)    # up → 104에서 닫힘
+    tr.close_ready(110.0)
+    assert tr.intervals() == [(101.0, 104.0)]
+    assert tr.closed == 1
+    assert not tr.active
+
+
+def test_tracker_flush_closes_active_outage():
+    tr = OutageTracker(bucket_sec=1.0)
+    _feed(tr, 200.2, 0, 3)
+    assert tr.downtime(199, 300, now=200.9) == 0.0   # 아직 finalize lag 안 (bucket 미확정)
+    tr.close_ready(202.0)
+    assert tr.active
+    assert tr.downtime(199, 300, now=203.0) == pytest.approx(3.0)
+    tr.flush(203.5)
+    assert tr.intervals() == [(200.0, 203.5)]
+    assert tr.closed == 1
+    assert not tr.active
+
+
+def test_tracker_distributed_merge_sums_workers():
+    master = OutageTracker(bucket_sec=1.0, finalize_lag_sec=3.0)
+    master.auto_close = False
+    w1, w2 = OutageTracker(bucket_sec=1.0), OutageTracker(bucket_sec=1.0)
+    w1.auto_close = w2.auto_close = False
+    _feed(w1, 100.5, 0, 3)      # worker 1만 보면 down
+    _feed(w2, 100.5, 97, 0)     # 합계 3% → up
+    _feed(w1, 101.5, 0, 8)
+    _feed(w2, 101.5, 2, 0)      # 합계 80% → down
+    _feed(w2, 102.5, 10, 0)
+    master.merge_delta(w1.export_delta(), 103.0)
+    master.merge_delta(w2.export_delta(), 106.0)
+    assert master.intervals() == [(101.0, 102.0)]
+    assert master.late_buckets == 0
+
+
+def test_tracker_late_bucket_is_counted_not_judged():
+    master = OutageTracker(bucket_sec=0.25, finalize_lag_sec=1.0)
+    master.auto_close = False
+    master.merge_delta([[400, 300, 0], [401, 300, 0]], 101.0)   # bucket 400 (100.0~100.25) 확정
+    assert master._next_idx == 400
+    master.merge_delta([[402, 300, 0]], 101.5)
+    assert master._next_idx > 400
+
+    # 느린 worker의 bucket 400: 실패 2/3만으로 판정하면 가짜 0.25s outage
+    master.merge_delta([[400, 1, 2]], 101.6)
+    assert master.late_buckets == 1
+    master.flush(102.0)
+    assert master.intervals() == []
+    assert master.closed == 0
+
+
+def test_tracker_closed_is_monotonic_under_coalescing():
+    tr = OutageTracker(bucket_sec=1.0, max_intervals=2)
+    counts = []
+    for k in range(6):
+        base = 100 + k * 3.0
+        _feed(tr, base + 0.5, 0, 1)
+        _feed(tr, base + 1.5, 1, 0)
+        tr.close_ready(base + 3.0)
+        counts.append(tr.closed)
+    assert counts == sorted(counts) and counts[-1] == 6
+    assert len(tr.index) == 2
+    assert tr.index.coalesced_sec > 0
@@ -0,0 +1,124 @@
+import random
+import statistics
+import sys
+
+import pytest
+
+import regression_gate
+from latency_histogram import LatencyHistogram
+from regression_gate import EXIT_OK, EXIT_REGRESSION, RunSample, _poisson, _pooled_percentiles
+from results_store import ResultsStore
+
+ITERATIONS = 200
+
+
+def _latencies(rng, n, scale=1.0):
+    return [rng.lognormvariate(3.5, 0.4) * scale for _ in range(n)]
+
+
+def _store_run(store, commit, latencies, failures=0):
+    run = store.start_run("locust", "locust", git_commit=commit)
+    hist = LatencyHistogram()
+    for v in latencies:
+        hist.record(v)
+    run.record_histogram("obs", hist.to_dict())
+    run.record_metrics(obs_requests=len(latencies) + failures, obs_failures=failures, outage_max_sec=0.0)
+    run.finish()
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    """numpy 재표본 경로와 순수 Python 경로 모두 확인"""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(regression_gate, "np", None)
+    return request.param
+
+
+def _gate(monkeypatch, db, *extra):
+    argv = ["regression_gate.py", db, "--scenario", "locust", "--baseline-commit", "aaaa",
+            "--candidate-commit", "bbbb", "--iterations", str(ITERATIONS), "--seed", "7", *extra]
+    monkeypatch.setattr(sys, "argv", argv)
+    return regression_gate._main()
+
+
+def _make_db(tmp_path, candidate_scale):
+    db = str(tmp_path / "results.db")
+    store = ResultsStore(db)
+    rng = random.Random(42)
+    for _ in range(3):
+        _store_run(store, "aaaa", _latencies(rng, 2000))
+    for _ in range(3):
+        _store_run(store, "bbbb", _latencies(rng, 2000, candidate_scale))
+    store.close()
+    return db
+
+
+def test_gate_equal_pair_passes(tmp_path, monkeypatch, backend):
+    db = _make_db(tmp_path, 1.0)
+    assert _gate(monkeypatch, db) == EXIT_OK
+
+
+def test_gate_slower_candidate_fails(tmp_path, monkeypatch, capsys, backend):
+    db = _make_db(tmp_path, 1.3)   # 모든 요청 30% 느림 (허용치 5%)
+    assert _gate(monkeypatch, db) == EXIT_REGRESSION
+    out = capsys.readouterr().out
+    assert "p50_ms" in out.split("[FAIL]")[1]
+
+
+def test_evaluate_is_deterministic_with_seed(backend):
+    rng = random.Random(3)
+
+    def sample(i, scale):
+        hist = LatencyHistogram()
+        for v in _latencies(rng, 500, scale):
+            hist.record(v)
+        return RunSample(i, hist.buckets(), 500, 0, {})
+
+    base = [sample(i, 1.0) for i in range(2)]
+    cand = [sample(i + 2, 1.0) for i in range(2)]
+    a = regression_gate.evaluate(base, cand, iterations=100, seed=11)
+    b = regression_gate.evaluate(base, cand, iterations=100, seed=11)
+    assert [r["ci"] for r in a] == [r["ci"] for r in b]
+
+
+# ---- histogram Poisson 재표본
+
+@pytest.mark.parametrize("lam", [0.5, 4.0, 25.0, 80.0, 1000.0])
+def test_poisson_moments(lam):
+    """Knuth(작은 lam) / 정규근사(lam >= POISSON_NORMAL_MIN) 모두 평균 ≈ 분산 ≈ lam"""
+    rng = random.Random(5)
+    xs = [_poisson(rng, lam) for _ in range(20000)]
+    assert min(xs) >= 0
+    assert statistics.fmean(xs) == pytest.approx(lam, rel=0.05, abs=0.02)
+    assert statistics.pvariance(xs) == pytest.approx(lam, rel=0.08, abs=0.05)
+
+
+def test_poisson_zero_rate():
+    rng = random.Random(1)
+    assert _poisson(rng, 0) == 0
+    assert _poisson(rng, -1) == 0
+
+
+def test_pooled_percentiles_resampling():
+    rng = random.Random(8)
+    hist = LatencyHistogram()
+    for v in _latencies(rng, 5000):
+        hist.record(v)
+    run = RunSample(1, hist.buckets(), 5000, 0, {})
+    qs = [0.5, 0.95, 0.99]
+
+    # rng 없음 → 원본 histogram percentile과 동일
+    assert _pooled_percentiles([run], None, qs) == pytest.approx(hist.percentiles(qs))
+
+    # Poisson 재표본: bucket 값은 원본 bucket 중 하나, 분포 중심은 원본 근처
+    values = {value for _, value, _ in run.buckets}
+    draws = [_pooled_percentiles([run], random.Random(s), qs) for s in range(200)]
+    assert all(v in values for d in draws for v in d)
+    p50 = sorted(d[0] for d in draws)
+    assert p50[len(p50) // 2] == pytest.approx(hist.percentiles([0.5])[0], rel=0.03)
+    assert p50[0] < p50[-1]   # 실제로 흔들림 (재표본이 원본 그대로가 아님)
+
+    # 빈 histogram
+    assert _pooled_percentiles([RunSample(2, [], 0, 0, {})], random.Random(0), qs) == [None, None, None]
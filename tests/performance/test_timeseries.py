@@ -0,0 +1,76 @@
+import pytest
+
+from timeseries import HOST_COLUMNS, SERIES_COLUMNS, TimeSeriesRecorder, make_series_writer
+
+
+def _flush(recorder, writer, now):
+    recorder.close_ready(now)
+    writer.write(recorder.take_pending())
+
+
+def test_parquet_first_flush_only_failures(tmp_path):
+    """run이 outage 중에 시작되어 첫 flush의 p*_ms가 모두 None이어도 이후 flush가 같은 파일에 이어서 기록됨"""
+    pq = pytest.importorskip("pyarrow.parquet")
+    rec = TimeSeriesRecorder(bucket_sec=1.0)
+    writer = make_series_writer(str(tmp_path / "obs"), "parquet")
+
+    # 1) 실패만 있는 bucket (latency 없음, host 없음)
+    rec.record(100.2, None, False)
+    rec.record(100.7, None, False)
+    _flush(rec, writer, 102.0)
+
+    # 2) 정상 응답 bucket
+    rec.record(102.1, 12.5, True, host="ip-10-0-1-5")
+    rec.record(102.4, 20.0, True, host="ip-10-0-1-6")
+    _flush(rec, writer, 104.0)
+    writer.close()
+
+    series = pq.read_table(writer.series_path)
+    assert series.column_names == list(SERIES_COLUMNS)
+    assert series.column("ts").to_pylist() == [100.0, 102.0]
+    assert series.column("failures").to_pylist() == [2, 0]
+    p95 = series.column("p95_ms").to_pylist()
+    assert p95[0] is None and p95[1] == pytest.approx(20.0, rel=0.01)
+
+    hosts = pq.read_table(writer.hosts_path)
+    assert hosts.column_names == list(HOST_COLUMNS)
+    assert sorted(hosts.column("host").to_pylist()) == ["ip-10-0-1-5", "ip-10-0-1-6"]
+
+
+def _delta(idx, requests, failures=0, hosts=None):
+    worker = TimeSeriesRecorder(bucket_sec=1.0)
+    for i in range(requests):
+        ok = i >= failures
+        worker.record(idx + 0.1, 10.0 if ok else None, ok, host=(hosts or [None])[i % len(hosts or [None])])
+    return worker.export_delta()
+
+
+def test_merge_delta_late_bucket_is_dropped():
+    """확정된 bucket에 늦게 도착한 worker delta는 같은 ts의 두 번째 row를 만들지 않고 late로 집계"""
+    master = TimeSeriesRecorder(bucket_sec=1.0, finalize_lag_sec=2.0)
+    master.merge_delta(_delta(100, 50, hosts=["a", "b"]))
+    master.merge_delta(_delta(101, 20))
+    assert [r["ts"] for r in master.close_ready(103.0)] == [100.0]
+
+    # bucket 100은 확정됨 → 버림, bucket 101은 아직 열려 있음 → 합산
+    master.merge_delta(_delta(100, 3, failures=2) + _delta(101, 5))
+    assert master.late_buckets == 1
+    assert master.late_requests == 3
+
+    rows = master.close_ready(110.0, force=True)
+    assert [r["ts"] for r in rows] == [101.0]
+    assert rows[0]["requests"] == 25
+
+    series = [r["ts"] for r in master.rows]
+    assert series == [100.0, 101.0]
+    assert master.rows[0]["requests"] == 50 and master.rows[0]["failures"] == 0
+
+    # force flush 이후 도착한 delta도 late
+    master.merge_delta(_delta(101, 1))
+    assert master.late_buckets == 2
+    assert master.close_ready(120.0, force=True) == []
+
+    master.reset()
+    assert master.late_buckets == 0
+    master.merge_delta(_delta(100, 1))
+    assert [r["ts"] for r in master.close_ready(103.0)] == [100.0]
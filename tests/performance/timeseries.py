@@ -0,0 +1,273 @@
+"""
+OBSERVE 시계열 기록기 (bucket_sec 단위, 기본 1초)
+
+- record(): request callback에서 O(1)로 현재 bucket에 누적
+- 완료된 bucket은 row(throughput/failures/p50/p95/p99/host별 hit)로 확정되어 bounded ring에 보관
+- 확정된 row는 주기적으로 파일에 append (Parquet → NumPy .npz → CSV 순으로 사용 가능한 형식)
+"""
+import csv
+import os
+from collections import deque, defaultdict
+
+from latency_histogram import LatencyHistogram
+
+# optional: columnar writer
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except Exception:
+    pa = None
+    pq = None
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+SERIES_COLUMNS = ("ts", "requests", "failures", "p50_ms", "p95_ms", "p99_ms")
+HOST_COLUMNS = ("ts", "host", "hits")
+
+# Parquet schema는 고정 (첫 flush가 전부 실패 bucket이면 p*_ms가 null 타입으로 추론되어 이후 write가 실패함)
+if pa is not None:
+    SERIES_SCHEMA = pa.schema([
+        ("ts", pa.float64()),
+        ("requests", pa.int64()),
+        ("failures", pa.int64()),
+        ("p50_ms", pa.float64()),
+        ("p95_ms", pa.float64()),
+        ("p99_ms", pa.float64()),
+    ])
+    HOST_SCHEMA = pa.schema([
+        ("ts", pa.float64()),
+        ("host", pa.string()),
+        ("hits", pa.int64()),
+    ])
+
+
+class _Bucket:
+    __slots__ = ("requests", "failures", "hist", "hosts")
+
+    def __init__(self):
+        self.requests = 0
+        self.failures = 0
+        self.hist = LatencyHistogram()
+        self.hosts = defaultdict(int)
+
+
+class TimeSeriesRecorder:
+    """bucket 단위 OBSERVE 시계열 (bounded ring + 증분 flush)"""
+
+    def __init__(self, bucket_sec=1.0, max_buckets=3600, finalize_lag_sec=None):
+        self.bucket_sec = float(bucket_sec)
+        # 이 시간보다 오래된 bucket만 확정 (distributed master는 worker report 지연만큼 크게)
+        self.finalize_lag_sec = self.bucket_sec if finalize_lag_sec is None else float(finalize_lag_sec)
+        self.rows = deque(maxlen=max_buckets)
+        self._pending = deque(maxlen=max_buckets)  # 아직 파일에 쓰지 않은 row
+        self.reset()
+
+    def reset(self):
+        self.rows.clear()
+        self._open = {}          # {bucket_idx: _Bucket}
+        self._pending.clear()
+        self._next_idx = None    # 이보다 작은 bucket은 확정됨 (row로 기록)
+        self.late_buckets = 0    # 확정 이후 도착한 bucket (worker report 지연) → 버림
+        self.late_requests = 0
+
+    def _bucket(self, idx):
+        b = self._open.get(idx)
+        if b is None:
+            b = self._open[idx] = _Bucket()
+        return b
+
+    def record(self, now, latency_ms, ok, host=None):
+        """OBSERVE 1건 기록 (ok=False면 latency 무시)."""
+        b = self._bucket(int(now // self.bucket_sec))
+        b.requests += 1
+        if not ok:
+            b.failures += 1
+            return
+        b.hist.record(latency_ms)
+        if host:
+            b.hosts[host] += 1
+
+    # ---- distributed mode (worker → master)
+    def export_delta(self):
+        """열린 bucket 전체를 compact dict로 내보내고 비움 (worker 전용)."""
+        out = [
+            [idx, b.requests, b.failures, b.hist.to_dict() if b.hist.count else None, dict(b.hosts)]
+            for idx, b in self._open.items()
+        ]
+        self._open = {}
+        return out
+
+    def merge_delta(self, delta):
+        for idx, requests, failures, hist, hosts in delta:
+            if self._next_idx is not None and idx < self._next_idx:
+                # 이미 row로 확정된 bucket: 다시 열면 같은 ts의 부분 row가 생겨 확정 row를 덮어씀
+                self.late_buckets += 1
+                self.late_requests += requests
+                continue
+            b = self._bucket(idx)
+            b.requests += requests
+            b.failures += failures
+            if hist:
+                b.hist.merge(LatencyHistogram.from_dict(hist))
+            for host, cnt in hosts.items():
+                b.hosts[host] += cnt
+
+    # ---- finalize / flush
+    def close_ready(self, now, force=False):
+        """finalize_lag_sec 보다 오래된 bucket을 row로 확정. 확정된 row 목록 반환."""
+        limit = int((now - self.finalize_lag_sec) // self.bucket_sec)
+        if force:
+            limit = max([limit] + [idx + 1 for idx in self._open])
+        if self._next_idx is None or limit > self._next_idx:
+            self._next_idx = limit
+        ready = sorted(idx for idx in self._open if idx < self._next_idx)
+        closed = []
+        for idx in ready:
+            b = self._open.pop(idx)
+            p50, p95, p99 = b.hist.percentiles([0.50, 0.95, 0.99])
+            row = {
+                "ts": idx * self.bucket_sec,
+                "requests": b.requests,
+                "failures": b.failures,
+                "p50_ms": p50,
+                "p95_ms": p95,
+                "p99_ms": p99,
+                "hosts": dict(b.hosts),
+            }
+            self.rows.append(row)
+            self._pending.append(row)
+            closed.append(row)
+        return closed
+
+    def take_pending(self):
+        rows = list(self._pending)
+        self._pending.clear()
+        return rows
+
+
+# ==========================================
+# Writers (columnar 우선, 없으면 fallback)
+# ==========================================
+
+def _nan(v):
+    return float("nan") if v is None else v
+
+
+def _host_rows(rows):
+    return [(r["ts"], host, hits) for r in rows for host, hits in r["hosts"].items()]
+
+
+class ParquetSeriesWriter:
+    """pyarrow ParquetWriter로 flush마다 row group append"""
+    ext = ".parquet"
+
+    def __init__(self, base_path):
+        self.series_path = base_path + self.ext
+        self.hosts_path = base_path + "_hosts" + self.ext
+        self._series = None
+        self._hosts = None
+
+    def write(self, rows):
+        if not rows:
+            return
+        series = pa.table({c: [r[c] for r in rows] for c in SERIES_COLUMNS}, schema=SERIES_SCHEMA)
+        if self._series is None:
+            self._series = pq.ParquetWriter(self.series_path, SERIES_SCHEMA)
+        self._series.write_table(series)
+
+        hrows = _host_rows(rows)
+        if hrows:
+            hosts = pa.table({c: [h[i] for h in hrows] for i, c in enumerate(HOST_COLUMNS)}, schema=HOST_SCHEMA)
+            if self._hosts is None:
+                self._hosts = pq.ParquetWriter(self.hosts_path, HOST_SCHEMA)
+            self._hosts.write_table(hosts)
+
+    def close(self):
+        for w in (self._series, self._hosts):
+            if w is not None:
+                w.close()
+
+
+class NpzSeriesWriter:
+    """NumPy: flush마다 <base>.partNNNN.npz 한 개씩 (npz는 append 불가)"""
+    ext = ".npz"
+
+    def __init__(self, base_path):
+        self.base_path = base_path
+        self.series_path = base_path + ".partNNNN" + self.ext
+        self._seq = 0
+
+    def write(self, rows):
+        if not rows:
+            return
+        hrows = _host_rows(rows)
+        path = f"{self.base_path}.part{self._seq:04d}{self.ext}"
+        self._seq += 1
+        np.savez(
+            path,
+            ts=np.array([r["ts"] for r in rows], dtype=np.float64),
+            requests=np.array([r["requests"] for r in rows], dtype=np.int64),
+            failures=np.array([r["failures"] for r in rows], dtype=np.int64),
+            p50_ms=np.array([_nan(r["p50_ms"]) for r in rows], dtype=np.float64),
+            p95_ms=np.array([_nan(r["p95_ms"]) for r in rows], dtype=np.float64),
+            p99_ms=np.array([_nan(r["p99_ms"]) for r in rows], dtype=np.float64),
+            host_ts=np.array([h[0] for h in hrows], dtype=np.float64),
+            host_name=np.array([h[1] for h in hrows], dtype=str),
+            host_hits=np.array([h[2] for h in hrows], dtype=np.int64),
+        )
+
+    def close(self):
+        pass
+
+
+class CsvSeriesWriter:
+    """의존성 없는 fallback: <base>.csv / <base>_hosts.csv append"""
+    ext = ".csv"
+
+    def __init__(self, base_path):
+        self.series_path = base_path + self.ext
+        self.hosts_path = base_path + "_hosts" + self.ext
+        for path, cols in ((self.series_path, SERIES_COLUMNS), (self.hosts_path, HOST_COLUMNS)):
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                csv.writer(f).writerow(cols)
+
+    def write(self, rows):
+        if not rows:
+            return
+        with open(self.series_path, "a", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            for r in rows:
+                w.writerow([r["ts"], r["requests"], r["failures"], r["p50_ms"], r["p95_ms"], r["p99_ms"]])
+        hrows = _host_rows(rows)
+        if hrows:
+            with open(self.hosts_path, "a", newline="", encoding="utf-8") as f:
+                csv.writer(f).writerows(hrows)
+
+    def close(self):
+        pass
+
+
+def make_series_writer(base_path, fmt="auto"):
+    """fmt: auto | parquet | npz | csv (auto는 설치된 라이브러리 기준으로 선택)"""
+    fmt = (fmt or "auto").lower()
+    if fmt == "auto":
+        fmt = "parquet" if pq is not None else ("npz" if np is not None else "csv")
+    if fmt == "parquet" and pq is None:
+        raise RuntimeError("TIMESERIES_FORMAT=parquet requires pyarrow")
+    if fmt == "npz" and np is None:
+        raise RuntimeError("TIMESERIES_FORMAT=npz requires numpy")
+
+    d = os.path.dirname(base_path)
+    if d:
+        os.makedirs(d, exist_ok=True)
+
+    if fmt == "parquet":
+        return ParquetSeriesWriter(base_path)
+    if fmt == "npz":
+        return NpzSeriesWriter(base_path)
+    if fmt == "csv":
+        return CsvSeriesWriter(base_path)
+    raise ValueError(f"unknown TIMESERIES_FORMAT: {fmt}")
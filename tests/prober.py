@@ -0,0 +1,171 @@
+import math
+import threading
+import time
+
+from tests.utils import HttpClient, response_host
+
+# ---- Constants
+DEFAULT_RATE_HZ = 20          # 초당 probe 수 (10~100 권장)
+DEFAULT_CONCURRENCY = 8       # 동시 probe thread 수 (= connection pool 크기)
+DEFAULT_PROBE_TIMEOUT = 1.0   # 요청 timeout (초) — 짧게 잡아야 outage 중에도 rate 유지
+
+
+def _percentile(sorted_vals, q):
+    """nearest-rank percentile (q: 0~1)"""
+    if not sorted_vals:
+        return None
+    k = max(0, min(len(sorted_vals) - 1, math.ceil(q * len(sorted_vals)) - 1))
+    return sorted_vals[k]
+
+
+class AvailabilityProber:
+    """
+    background에서 고빈도(rate_hz)로 url을 호출해 가용성 측정.
+    - pooled session(keep-alive)으로 TCP 연결 비용 없이 요청
+    - 결과는 (monotonic 송신 시각, ok, latency_ms)로 기록
+    - report(t_start, t_end): 구간별 availability / outage 구간 / latency percentile
+      (t_start/t_end는 time.time() 기준 → watcher 이벤트 시각을 그대로 사용 가능)
+    """
+
+    def __init__(self, url, rate_hz=DEFAULT_RATE_HZ, concurrency=DEFAULT_CONCURRENCY,
+                 timeout=DEFAULT_PROBE_TIMEOUT, client=None):
+        self.url = url
+        self.rate_hz = float(rate_hz)
+        self.concurrency = max(1, int(concurrency))
+        self.timeout = timeout
+
+        # 재시도 없음: 재시도가 실패를 가리면 outage 측정이 틀어짐
+        self.client = client or HttpClient(pool_size=self.concurrency, timeout=timeout, retries=0)
+
+        self.samples = []  # [(t_mono, ok, latency_ms)]
+        self.first_seen = {}  # {hostname: 첫 성공 응답 시각 (time.time() 기준)}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+        # wall clock ↔ monotonic 변환 (시작 시 1회 고정)
+        self._wall_offset = time.time() - time.monotonic()
+
+    # ---- lifecycle
+    def start(self):
+        self._stop.clear()
+        t0 = time.monotonic()
+        period = self.concurrency / self.rate_hz  # thread당 송신 주기
+        for k in range(self.concurrency):
+            th = threading.Thread(
+                target=self._run,
+                args=(t0 + k / self.rate_hz, period),
+                daemon=True,
+                name=f"prober-{k}",
+            )
+            th.start()
+            self._threads.append(th)
+        return self
+
+    def stop(self):
+        self._stop.set()
+        for th in self._threads:
+            th.join()
+        self._threads = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run(self, next_at, period):
+        while not self._stop.is_set():
+            delay = next_at - time.monotonic()
+            if delay > 0 and self._stop.wait(delay):
+                break
+            self._probe_once()
+            # 응답이 늦어 놓친 slot은 몰아서 보내지 않고 건너뜀
+            now = time.monotonic()
+            next_at += period
+            if next_at < now:
+                next_at += ((now - next_at) // period + 1) * period
+
+    def _probe_once(self):
+        t_send = time.monotonic()
+        host = None
+        try:
+            resp = self.client.get(self.url, timeout=self.timeout)
+            ok = resp.status_code == 200
+            # 배포된 ASG 앱은 header 없이 본문에 Hostname만 있음 → header 우선, 없으면 본문
+            host = response_host(resp) if ok else None
+        except Exception:
+            ok = False
+        t_recv = time.monotonic()
+        with self._lock:
+            self.samples.append((t_send, ok, (t_recv - t_send) * 1000.0))
+            if host and host not in self.first_seen:
+                self.first_seen[host] = t_recv + self._wall_offset
+
+    # ---- analysis
+    def to_mono(self, wall_ts):
+        return wall_ts - self._wall_offset
+
+    def _window(self, t_start=None, t_end=None):
+        lo = self.to_mono(t_start) if t_start is not None else float("-inf")
+        hi = self.to_mono(t_end) if t_end is not None else float("inf")
+        with self._lock:
+            rows = list(self.samples)
+        rows.sort()
+        return [r for r in rows if lo <= r[0] < hi]
+
+    @staticmethod
+    def _outages(rows):
+        """연속 실패 구간 → [(start, end)] (end = 다음 성공 probe 송신 시각, 없으면 마지막 실패 응답 시각)"""
+        out = []
+        start = last_fail_end = None
+        for t, ok, lat in rows:
+            if not ok:
+                if start is None:
+                    start = t
+                last_fail_end = t + lat / 1000.0
+            elif start is not None:
+                out.append((start, t))
+                start = None
+        if start is not None:
+            out.append((start, last_fail_end))
+        return out
+
+    def report(self, t_start=None, t_end=None):
+        """[t_start, t_end) 구간 요약 (time.time() 기준, None이면 전체)"""
+        rows = self._window(t_start, t_end)
+        total = len(rows)
+        ok_lat = sorted(lat for _, ok, lat in rows if ok)
+        outages = self._outages(rows)
+        return {
+            "requests": total,
+            "successes": len(ok_lat),
+            "availability": (len(ok_lat) / total * 100.0) if total else None,
+            "outages": [(s + self._wall_offset, e + self._wall_offset) for s, e in outages],
+            "outage_sec": sum(e - s for s, e in outages),
+            "longest_outage_sec": max((e - s for s, e in outages), default=0.0),
+            "p50_ms": _percentile(ok_lat, 0.50),
+            "p95_ms": _percentile(ok_lat, 0.95),
+            "p99_ms": _percentile(ok_lat, 0.99),
+        }
+
+
+def format_probe_report(label, rep, origin=None):
+    """report() 결과를 한 줄 요약 + outage 목록으로"""
+    if not rep["requests"]:
+        return [f"   {label}: no probes"]
+
+    def _ms(v):
+        return "-" if v is None else f"{v:.0f}ms"
+
+    lines = [
+        f"   {label}: availability {rep['availability']:.2f}% "
+        f"({rep['successes']}/{rep['requests']}), "
+        f"outages={len(rep['outages'])} total={rep['outage_sec']:.1f}s longest={rep['longest_outage_sec']:.1f}s, "
+        f"p50={_ms(rep['p50_ms'])} p95={_ms(rep['p95_ms'])} p99={_ms(rep['p99_ms'])}"
+    ]
+    for s, e in rep["outages"][:10]:
+        if origin is not None:
+            lines.append(f"     - outage +{s - origin:.2f}s ~ +{e - origin:.2f}s ({e - s:.2f}s)")
+        else:
+            lines.append(f"     - outage {e - s:.2f}s")
+    return lines
@@ -0,0 +1,235 @@
+"""
+Scale-out 지연 분해 (인스턴스별 timeline)
+
+alarm → desired → launch → in_service → tg_healthy → first_hit
+- alarm      : scale-out alarm(ASG 차원 CPU alarm)이 ALARM으로 바뀐 시각 (CloudWatch alarm history)
+- desired    : ASG가 scaling activity를 시작한 시각 (= desired capacity 반영, activity StartTime)
+- launch     : EC2 LaunchTime
+- in_service : ASG lifecycle InService 최초 관측 (watcher, 없으면 activity EndTime)
+- tg_healthy : Target Group healthy 최초 관측 (watcher)
+- first_hit  : 해당 인스턴스가 처음 OBSERVE 응답한 시각 (prober / Locust server_first_seen)
+
+run 단위로 JSONL에 누적 → phase별 소요 시간 percentile (cooldown / grace period / warmup 튜닝용)
+"""
+import csv
+import json
+import math
+import os
+import re
+from datetime import datetime, timezone
+
+# ---- Constants
+EVENTS = ("alarm", "desired", "launch", "in_service", "tg_healthy", "first_hit")
+PHASES = tuple(zip(EVENTS, EVENTS[1:]))
+ALARM_LOOKBACK_SEC = 600  # scaling 시작 전 이 시간 안의 ALARM 전환만 원인으로 간주
+
+_LAUNCH_RE = re.compile(r"Launching a new EC2 instance:\s*(i-[0-9a-f]+)")
+
+
+# ==========================================
+# Sources
+# ==========================================
+
+def _utc(ts):
+    return datetime.fromtimestamp(ts, tz=timezone.utc)
+
+
+def find_scale_out_alarms(cw_client, asg_name):
+    """ASG 차원의 '초과' 비교 alarm (step policy의 cpu_high, target tracking의 AlarmHigh 모두 해당)"""
+    names = []
+    for page in cw_client.get_paginator("describe_alarms").paginate(AlarmTypes=["MetricAlarm"]):
+        for a in page["MetricAlarms"]:
+            dims = {d["Name"]: d["Value"] for d in a.get("Dimensions", [])}
+            if dims.get("AutoScalingGroupName") == asg_name and a["ComparisonOperator"].startswith("GreaterThan"):
+                names.append(a["AlarmName"])
+    return names
+
+
+def alarm_transitions(cw_client, alarm_names, since_ts):
+    """since_ts 이후 ALARM 상태로 바뀐 시각 목록 (정렬)"""
+    out = []
+    for name in alarm_names:
+        pages = cw_client.get_paginator("describe_alarm_history").paginate(
+            AlarmName=name,
+            HistoryItemType="StateUpdate",
+            StartDate=_utc(since_ts),
+            EndDate=datetime.now(timezone.utc),
+        )
+        for page in pages:
+            for item in page["AlarmHistoryItems"]:
+                try:
+                    state = json.loads(item["HistoryData"])["newState"]["stateValue"]
+                except Exception:
+                    continue
+                if state == "ALARM":
+                    out.append(item["Timestamp"].timestamp())
+    return sorted(out)
+
+
+def launch_activities(asg_client, asg_name, since_ts):
+    """since_ts 이후 시작된 인스턴스 launch activity → [{instance_id, start, end, status}]"""
+    out = []
+    pages = asg_client.get_paginator("describe_scaling_activities").paginate(AutoScalingGroupName=asg_name)
+    for page in pages:
+        done = False
+        for a in page["Activities"]:  # 최신순
+            start = a["StartTime"].timestamp()
+            if start < since_ts:
+                done = True
+                break
+            m = _LAUNCH_RE.search(a.get("Description", ""))
+            if m:
+                out.append({
+                    "instance_id": m.group(1),
+                    "start": start,
+                    "end": a["EndTime"].timestamp() if a.get("EndTime") else None,
+                    "status": a.get("StatusCode"),
+                })
+        if done:
+            break
+    return sorted(out, key=lambda a: a["start"])
+
+
+def load_first_seen(path):
+    """
+    Locust 결과에서 인스턴스별 첫 OBSERVE 응답 시각 로드
+    - <TIMESERIES_PATH>_first_seen.json : {host: ts}
+    - <TIMESERIES_PATH>_hosts.csv       : 시계열 host 파일 (bucket 단위라 정밀도는 bucket_sec)
+    """
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            return {h: float(ts) for h, ts in json.load(f).items()}
+
+    first = {}
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            ts = float(row["ts"])
+            if row["host"] not in first or ts < first[row["host"]]:
+                first[row["host"]] = ts
+    return first
+
+
+# ==========================================
+# Collector
+# ==========================================
+
+def _first_event_ts(events, kind, key, instance_id):
+    for e in events:
+        if e.kind == kind and instance_id in (e.data.get(key) or ()):
+            return e.ts
+    return None
+
+
+class ScaleOutTimelineCollector:
+    """ASG activity / EC2 / alarm history / watcher 이벤트 / first-seen을 합쳐 인스턴스별 timeline 생성"""
+
+    def __init__(self, asg_client, ec2_client, cloudwatch_client, asg_name, watcher=None):
+        self.asg_client = asg_client
+        self.ec2_client = ec2_client
+        self.cloudwatch_client = cloudwatch_client
+        self.asg_name = asg_name
+        self.watcher = watcher
+
+    def collect(self, since_ts, first_seen=None):
+        first_seen = first_seen or {}
+        launches = launch_activities(self.asg_client, self.asg_name, since_ts)
+        if not launches:
+            return []
+
+        ids = [a["instance_id"] for a in launches]
+        resp = self.ec2_client.describe_instances(InstanceIds=ids)
+        ec2 = {i["InstanceId"]: i for r in resp["Reservations"] for i in r["Instances"]}
+
+        try:
+            alarms = alarm_transitions(
+                self.cloudwatch_client,
+                find_scale_out_alarms(self.cloudwatch_client, self.asg_name),
+                since_ts - ALARM_LOOKBACK_SEC,
+            )
+        except Exception:
+            alarms = []
+
+        events = self.watcher.events_since(since_ts) if self.watcher is not None else []
+
+        timelines = []
+        for act in launches:
+            iid = act["instance_id"]
+            inst = ec2.get(iid, {})
+            hostname = (inst.get("PrivateDnsName") or "").split(".")[0] or None
+            desired = act["start"]
+            causes = [t for t in alarms if desired - ALARM_LOOKBACK_SEC <= t <= desired]
+            in_service = _first_event_ts(events, "asg_capacity", "in_service", iid) or act["end"]
+
+            timelines.append({
+                "instance_id": iid,
+                "hostname": hostname,
+                "activity_status": act["status"],
+                "alarm": causes[-1] if causes else None,
+                "desired": desired,
+                "launch": inst["LaunchTime"].timestamp() if inst.get("LaunchTime") else None,
+                "in_service": in_service,
+                "tg_healthy": _first_event_ts(events, "tg_health", "healthy", iid),
+                "first_hit": first_seen.get(hostname) if hostname else None,
+            })
+        return timelines
+
+
+# ==========================================
+# Persistence / report
+# ==========================================
+
+def append_run(path, timelines, **meta):
+    """run 1회 결과를 JSONL에 추가"""
+    d = os.path.dirname(path)
+    if d:
+        os.makedirs(d, exist_ok=True)
+    record = dict(meta, recorded_at=datetime.now(timezone.utc).timestamp(), instances=timelines)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, sort_keys=True) + "\n")
+
+
+def load_runs(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def phase_durations(timelines):
+    """{(from, to): [sec, ...]} — 두 시각이 모두 있는 인스턴스만"""
+    out = {p: [] for p in PHASES}
+    for t in timelines:
+        for a, b in PHASES:
+            if t.get(a) is not None and t.get(b) is not None:
+                out[(a, b)].append(t[b] - t[a])
+    return out
+
+
+def _pct(sorted_vals, q):
+    return sorted_vals[max(0, math.ceil(q * len(sorted_vals)) - 1)]
+
+
+def phase_report_lines(runs):
+    """여러 run의 phase별 소요 시간 percentile"""
+    durations = phase_durations([t for r in runs for t in r["instances"]])
+    lines = [f"[Scale-out phases] runs={len(runs)}"]
+    for (a, b), vals in durations.items():
+        if not vals:
+            lines.append(f"   {a:>10} → {b:<10}: -")
+            continue
+        vals.sort()
+        lines.append(
+            f"   {a:>10} → {b:<10}: n={len(vals)} p50={_pct(vals, 0.5):.1f}s "
+            f"p90={_pct(vals, 0.9):.1f}s max={vals[-1]:.1f}s"
+        )
+    return lines
+
+
+def timeline_lines(timelines):
+    """이번 run의 인스턴스별 timeline (첫 이벤트 기준 상대 시각)"""
+    lines = []
+    for t in timelines:
+        origin = min(t[e] for e in EVENTS if t.get(e) is not None)
+        parts = [f"{e}=+{t[e] - origin:.0f}s" if t.get(e) is not None else f"{e}=-" for e in EVENTS]
+        lines.append(f"   {t['instance_id']} ({t['hostname'] or '?'}): " + " ".join(parts))
+    return lines
@@ -0,0 +1,94 @@
+"""
+LB 분산 검증용 통계 helper (외부 의존성 없음)
+
+- chi_square_uniform(): 관측 count가 균등 분포(1/k)와 맞는지 적합도 검정 (p-value 포함)
+- wilson_interval(): host별 점유율의 신뢰구간 (표본이 작거나 비율이 0/1에 가까워도 안정적)
+- required_sample_size(): 점유율 오차 ±margin을 원하는 신뢰수준으로 얻기 위한 총 요청 수
+"""
+import math
+from statistics import NormalDist
+
+
+def _z(confidence):
+    return NormalDist().inv_cdf(0.5 + confidence / 2.0)
+
+
+def _gamma_q(a, x):
+    """정규화 상위 불완전 감마 Q(a, x) (Numerical Recipes: x<a+1은 급수, 그 외 연분수)"""
+    if x <= 0:
+        return 1.0
+    log_pre = -x + a * math.log(x) - math.lgamma(a)
+    if x < a + 1:
+        term = total = 1.0 / a
+        ap = a
+        for _ in range(1000):
+            ap += 1
+            term *= x / ap
+            total += term
+            if abs(term) < abs(total) * 1e-15:
+                break
+        return max(0.0, 1.0 - total * math.exp(log_pre))
+
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, 1000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return math.exp(log_pre) * h
+
+
+def chi2_sf(stat, dof):
+    """chi-square 분포의 생존함수 P(X >= stat)"""
+    if dof <= 0:
+        return 1.0
+    return _gamma_q(dof / 2.0, stat / 2.0)
+
+
+def chi_square_uniform(counts):
+    """
+    counts: host별 관측 수 (관측 0인 healthy target도 포함해야 함)
+    반환: (chi2 통계량, 자유도, p-value) — p-value가 작을수록 '균등 분배'와 맞지 않음
+    """
+    k = len(counts)
+    n = sum(counts)
+    if k < 2 or n == 0:
+        return 0.0, max(0, k - 1), 1.0
+    expected = n / k
+    stat = sum((c - expected) ** 2 / expected for c in counts)
+    return stat, k - 1, chi2_sf(stat, k - 1)
+
+
+def wilson_interval(successes, n, confidence=0.95):
+    """비율 successes/n 의 Wilson score 신뢰구간 (lo, hi)"""
+    if n == 0:
+        return 0.0, 1.0
+    z = _z(confidence)
+    p = successes / n
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+def required_sample_size(k, margin, confidence=0.95):
+    """
+    target k개 균등 분배 가정 시, 각 host 점유율의 신뢰구간 반폭이 margin 이하가 되는 총 요청 수
+    (정규근사: n = z^2 * p(1-p) / margin^2, p = 1/k)
+    """
+    if k < 1 or margin <= 0:
+        raise ValueError("k >= 1 and margin > 0 required")
+    p = 1.0 / k
+    z = _z(confidence)
+    return math.ceil(z * z * p * (1 - p) / (margin * margin))
@@ -1,9 +1,24 @@
+import math
+import random
 import re
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
 
 # ---- Constants
 DEFAULT_REQUEST_TIMEOUT = 2
+DEFAULT_POOL_SIZE = 10
+INSTANCE_ID_HEADER = "X-Instance-Id"  # fixtures 웹서버가 모든 응답에 hostname을 넣어줌
+
+MODE_KEEPALIVE = "keepalive"  # connection 재사용 (처리량/가용성 측정용)
+MODE_FRESH = "fresh"          # 요청마다 새 connection (LB 분산 확인용)
 
 # --- Helpers
 def now_str():
@@ -17,13 +32,353 @@ def extract_response_host(response_text):
     match = re.search(r"(?:Host|Hostname):\s*(.*?)(?:<|\s|$)", response_text)
     return match.group(1).strip() if match else None
 
-def is_service_available(url, timeout=DEFAULT_REQUEST_TIMEOUT):
+# ---- HTTP client
+class _CountingAdapter(HTTPAdapter):
+    """
+    실제 TCP connect 횟수 / 전송 시도 수를 세는 adapter (connection subclass에서 직접 집계).
+    (urllib3 pool의 num_connections는 connection 객체 수라서, 같은 객체의 재연결은 세지 않음)
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._count_lock = threading.Lock()
+        self.connections_opened = 0
+        self.requests_attempted = 0  # 재시도 포함 실제 전송 수
+        super().__init__(*args, **kwargs)
+
+    def _on_connect(self):
+        with self._count_lock:
+            self.connections_opened += 1
+
+    def _on_request(self):
+        with self._count_lock:
+            self.requests_attempted += 1
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        adapter = self
+
+        class _Conn(HTTPConnection):
+            def connect(self):
+                adapter._on_connect()
+                super().connect()
+
+            def request(self, *args, **kwargs):
+                adapter._on_request()
+                return super().request(*args, **kwargs)
+
+        class _SConn(HTTPSConnection):
+            def connect(self):
+                adapter._on_connect()
+                super().connect()
+
+            def request(self, *args, **kwargs):
+                adapter._on_request()
+                return super().request(*args, **kwargs)
+
+        class _Pool(HTTPConnectionPool):
+            ConnectionCls = _Conn
+
+        class _SPool(HTTPSConnectionPool):
+            ConnectionCls = _SConn
+
+        self.poolmanager.pool_classes_by_scheme = {"http": _Pool, "https": _SPool}
+
+
+class HttpClient:
+    """
+    connection pool을 명시적으로 관리하는 공용 HTTP client (thread-safe)
+    - mode=keepalive: pool 내 connection 재사용
+    - mode=fresh: 매 요청 `Connection: close` → 요청마다 새 TCP 연결 (ALB가 매번 target 선택)
+    - retries: connect 실패 / 502·503·504 재시도 횟수 (가용성 측정에는 0 유지 — 재시도가 장애를 가림)
+    - stats(): 보낸 요청 수 vs 실제로 연 connection 수
+    """
+
+    def __init__(self, mode=MODE_KEEPALIVE, pool_size=DEFAULT_POOL_SIZE,
+                 timeout=DEFAULT_REQUEST_TIMEOUT, retries=0, backoff=0.2):
+        if mode not in (MODE_KEEPALIVE, MODE_FRESH):
+            raise ValueError(f"unknown mode: {mode}")
+        self.mode = mode
+        self.timeout = timeout
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=0,
+            status=retries,
+            backoff_factor=backoff,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=("GET", "HEAD"),
+            raise_on_status=False,
+        )
+        self._adapter = _CountingAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", self._adapter)
+        self.session.mount("https://", self._adapter)
+        if mode == MODE_FRESH:
+            self.session.headers["Connection"] = "close"
+
+        self._lock = threading.Lock()
+        self.requests_sent = 0
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        with self._lock:
+            self.requests_sent += 1
+        return self.session.get(url, **kwargs)
+
+    def stats(self):
+        """{"requests": 논리 요청 수, "attempts": 재시도 포함 전송 수, "connections": 연 connection 수}"""
+        return {
+            "requests": self.requests_sent,
+            "attempts": self._adapter.requests_attempted,
+            "connections": self._adapter.connections_opened,
+        }
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def response_host(resp):
+    """응답한 인스턴스 hostname: X-Instance-Id header 우선, 없으면 본문에서 추출"""
+    return resp.headers.get(INSTANCE_ID_HEADER) or extract_response_host(resp.text)
+
+
+def sample_response_hosts(url, n, concurrency=32, timeout=DEFAULT_REQUEST_TIMEOUT):
+    """
+    요청마다 새 connection으로 n회 동시 호출하여 응답 host 분포 수집
+    반환: (Counter{host: count}, 실패 수, client.stats())
+    """
+    def _one(_):
+        try:
+            return response_host(client.get(url))
+        except Exception:
+            return None
+
+    with HttpClient(MODE_FRESH, pool_size=concurrency, timeout=timeout) as client:
+        with ThreadPoolExecutor(max_workers=concurrency) as ex:
+            hosts = list(ex.map(_one, range(n)))
+        stats = client.stats()
+
+    counts = Counter(h for h in hosts if h)
+    return counts, n - sum(counts.values()), stats
+
+
+def get_http_client():
+    """모듈 공용 keep-alive client (lazy)"""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = HttpClient(MODE_KEEPALIVE)
+        return _default_client
+
+
+def is_service_available(url, timeout=DEFAULT_REQUEST_TIMEOUT, client=None):
     """ALB 주소로 요청시 정상 응답(HTTP 200)하는지 확인"""
+    client = client or get_http_client()
     try:
-        return requests.get(url, timeout=timeout).status_code == 200
+        return client.get(url, timeout=timeout).status_code == 200
     except Exception:
         return False
 
+# ---- Adaptive polling
+THROTTLING_ERROR_CODES = {
+    "Throttling",
+    "ThrottlingException",
+    "ThrottledException",
+    "RequestLimitExceeded",
+    "RequestThrottled",
+    "TooManyRequestsException",
+    "SlowDown",
+}
+
+
+def is_throttling_error(exc):
+    """botocore ClientError가 throttling 계열인지"""
+    code = getattr(exc, "response", {}).get("Error", {}).get("Code")
+    return code in THROTTLING_ERROR_CODES
+
+
+class BackoffSchedule:
+    """
+    poll 간격 계산기
+    - 값이 바뀐 직후(fast_window 동안) 또는 expect()로 지정한 구간: min_interval로 촘촘히
+    - 변화가 없으면 factor배씩 늘려 max_interval까지 (jitter ±ratio로 여러 poller의 동기화 방지)
+    - throttling 응답: fast 구간과 무관하게 throttle_interval 이상으로 물러남 (연속 시 계속 증가)
+    """
+
+    def __init__(self, min_interval=2.0, max_interval=30.0, factor=1.5, jitter=0.2,
+                 fast_window=60.0, throttle_interval=10.0, max_throttle_interval=120.0, rng=None):
+        self.min_interval = float(min_interval)
+        self.max_interval = max(float(max_interval), self.min_interval)
+        self.factor = factor
+        self.jitter = jitter
+        self.fast_window = fast_window
+        self.throttle_interval = throttle_interval
+        self.max_throttle_interval = max_throttle_interval
+        self._rng = rng or random.Random()
+        self._current = self.min_interval
+        self._throttle = 0.0
+        self._fast_until = 0.0
+
+    def expect(self, within_sec, now=None):
+        """앞으로 within_sec 동안 상태 변화가 예상됨 → 빠르게 poll"""
+        now = time.time() if now is None else now
+        self._fast_until = max(self._fast_until, now + within_sec)
+
+    def next_delay(self, changed=False, throttled=False, now=None):
+        now = time.time() if now is None else now
+        if throttled:
+            self._throttle = min(max(self._throttle * 2, self.throttle_interval), self.max_throttle_interval)
+            base = self._throttle
+        else:
+            self._throttle = 0.0
+            if changed:
+                self._current = self.min_interval
+                self.expect(self.fast_window, now)
+            if now < self._fast_until:
+                base = self.min_interval
+            else:
+                self._current = min(self._current * self.factor, self.max_interval)
+                base = self._current
+        return base * self._rng.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+def wait_until(fetch, predicate, timeout, schedule=None, on_poll=None):
+    """
+    fetch() 결과가 predicate를 만족할 때까지 adaptive polling.
+    반환: (ts, prev_ts, value) — 만족한 poll 시각/직전 poll 시각/값. timeout이면 None.
+    - 값이 바뀌면 빠르게, 그대로면 점점 느리게 (BackoffSchedule)
+    - throttling 에러는 물러난 뒤 재시도, 그 외 예외는 그대로 raise
+    """
+    schedule = schedule or BackoffSchedule()
+    deadline = time.time() + timeout
+    prev_ts = None
+    last = _UNSET = object()
+    while True:
+        t_req = time.time()
+        try:
+            value = fetch()
+        except Exception as e:
+            if not is_throttling_error(e):
+                raise
+            delay = schedule.next_delay(throttled=True)
+        else:
+            ts = (t_req + time.time()) / 2.0
+            if predicate(value):
+                return ts, prev_ts, value
+            changed = last is not _UNSET and value != last
+            last, prev_ts = value, ts
+            delay = schedule.next_delay(changed=changed)
+        if on_poll is not None:
+            on_poll()
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return None
+        time.sleep(min(delay, remaining))
+
+
+# ---- AWS API call accounting
+class ApiCallStats:
+    """
+    boto3 client event hook으로 operation별 API 호출 집계
+    - calls: 논리 호출 수 / attempts: 재시도 포함 HTTP 전송 수
+    - throttled: throttling 응답 수 / errors: 최종 실패 수
+    - latency: 재시도 포함 호출 전체 소요 시간(ms)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.ops = defaultdict(lambda: {"calls": 0, "attempts": 0, "throttled": 0, "errors": 0, "latencies": []})
+
+    def instrument(self, client):
+        if getattr(client, "_api_call_stats", None) is self:
+            return client
+        events = client.meta.events
+        events.register("before-call.*.*", self._before_call)
+        events.register("response-received.*.*", self._response_received)
+        events.register("after-call.*.*", self._after_call)
+        events.register("after-call-error.*.*", self._after_call_error)
+        client._api_call_stats = self
+        return client
+
+    @staticmethod
+    def _op_name(event_name):
+        # "<event>.<service-id>.<Operation>"
+        _, service, op = event_name.split(".", 2)
+        return f"{service}.{op}"
+
+    def _before_call(self, event_name, context, **kwargs):
+        context["_api_stats"] = (self._op_name(event_name), time.perf_counter())
+
+    def _response_received(self, context, parsed_response=None, **kwargs):
+        info = context.get("_api_stats")
+        if info is None:
+            return
+        code = (parsed_response or {}).get("Error", {}).get("Code")
+        with self._lock:
+            st = self.ops[info[0]]
+            st["attempts"] += 1
+            if code in THROTTLING_ERROR_CODES:
+                st["throttled"] += 1
+
+    def _finish(self, context, error):
+        info = context.pop("_api_stats", None)
+        if info is None:
+            return
+        op, t0 = info
+        with self._lock:
+            st = self.ops[op]
+            st["calls"] += 1
+            st["latencies"].append((time.perf_counter() - t0) * 1000.0)
+            if error:
+                st["errors"] += 1
+
+    def _after_call(self, context, http_response=None, **kwargs):
+        self._finish(context, error=http_response is not None and http_response.status_code >= 300)
+
+    def _after_call_error(self, context, **kwargs):
+        self._finish(context, error=True)
+
+    def summary(self):
+        out = {}
+        with self._lock:
+            items = [(op, dict(st, latencies=sorted(st["latencies"]))) for op, st in self.ops.items()]
+        for op, st in items:
+            lat = st.pop("latencies")
+            st["p50_ms"] = lat[max(0, math.ceil(0.50 * len(lat)) - 1)] if lat else None
+            st["p95_ms"] = lat[max(0, math.ceil(0.95 * len(lat)) - 1)] if lat else None
+            out[op] = st
+        return out
+
+    def report_lines(self):
+        summary = self.summary()
+        if not summary:
+            return []
+        lines = ["[AWS API] calls per operation"]
+        for op, st in sorted(summary.items(), key=lambda kv: -kv[1]["calls"]):
+            p50 = "-" if st["p50_ms"] is None else f"{st['p50_ms']:.0f}ms"
+            p95 = "-" if st["p95_ms"] is None else f"{st['p95_ms']:.0f}ms"
+            lines.append(
+                f"  {op}: calls={st['calls']} attempts={st['attempts']} "
+                f"throttled={st['throttled']} errors={st['errors']} p50={p50} p95={p95}"
+            )
+        return lines
+
+
+# 세션 전체 공용 (conftest의 client fixture가 instrument, 종료 시 report)
+API_CALL_STATS = ApiCallStats()
+
+
 # ---- Helpers on AWS
 def get_healthy_instance_ids(elbv2_client, tg_arn):
     """Target Group 내 Healthy 상태인 인스턴스 ID 목록 반환"""
@@ -35,6 +390,54 @@ def get_healthy_instance_ids(elbv2_client, tg_arn):
     ]
 
 
+def get_instance_hostnames(ec2_client, instance_ids):
+    """
+    instance id → OS hostname 매핑 (Ubuntu 기본 hostname = PrivateDnsName의 첫 label, 예: ip-10-0-1-23)
+    """
+    if not instance_ids:
+        return {}
+    resp = ec2_client.describe_instances(InstanceIds=list(instance_ids))
+    return {
+        i["InstanceId"]: i["PrivateDnsName"].split(".")[0]
+        for r in resp["Reservations"]
+        for i in r["Instances"]
+        if i.get("PrivateDnsName")
+    }
+
+
+def get_instance_vcpus(ec2_client, instance_ids):
+    """인스턴스들의 instance type 기준 vCPU 수 (여러 type이면 최솟값)"""
+    if not instance_ids:
+        return None
+    resp = ec2_client.describe_instances(InstanceIds=list(instance_ids))
+    types = {i["InstanceType"] for r in resp["Reservations"] for i in r["Instances"]}
+    if not types:
+        return None
+    info = ec2_client.describe_instance_types(InstanceTypes=sorted(types))
+    return min(t["VCpuInfo"]["DefaultVCpus"] for t in info["InstanceTypes"])
+
+
+def get_asg_private_ips(asg_client, ec2_client, asg_name):
+    """ASG 내 InService 인스턴스의 private IP 목록"""
+    resp = asg_client.describe_auto_scaling_groups(AutoScalingGroupNames=[asg_name])
+    if not resp["AutoScalingGroups"]:
+        return []
+    ids = [
+        i["InstanceId"]
+        for i in resp["AutoScalingGroups"][0].get("Instances", [])
+        if i.get("LifecycleState") == "InService"
+    ]
+    if not ids:
+        return []
+    ec2_resp = ec2_client.describe_instances(InstanceIds=ids)
+    return [
+        i["PrivateIpAddress"]
+        for r in ec2_resp["Reservations"]
+        for i in r["Instances"]
+        if i.get("PrivateIpAddress")
+    ]
+
+
 def get_asg_desired_capacity(asg_client, asg_name):
     """ASG의 Desired Capacity 조회"""
     resp = asg_client.describe_auto_scaling_groups(